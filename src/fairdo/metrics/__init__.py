@@ -26,10 +26,18 @@ and :math:`y` can be the true label or a prediction.
 machine learning model. This submodule requires the true label :math:`y_{true}`,
 the predicted label :math:`y_{pred}`.
 
+The statistical parity metrics of the `dataset` submodule also accept a `GroupContingency`,
+i.e., the number of samples and positive labels per group, instead of :math:`y` and :math:`z`.
+This allows evaluating many subsets of a dataset without materializing them.
+Likewise, the consistency score of the `individual` submodule evaluates subsets of a dataset on a
+`ConsistencyGraph`, i.e., the nearest neighbors of all rows computed once, and the randomized dependence coefficient
+of the `independence` submodule on a `RandomizedDependence`, i.e., the ranks and random projections computed once.
+
 Each submodule provides a different perspective on fairness, and together they provide a comprehensive toolkit
 for measuring fairness in datasets.
 """
 
+from fairdo.metrics.contingency import *
 from fairdo.metrics.dataset import *
 from fairdo.metrics.independence import *
 from fairdo.metrics.individual import *
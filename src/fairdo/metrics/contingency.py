@@ -0,0 +1,255 @@
+"""
+Group Contingency
+=================
+
+Statistical parity and its relatives only depend on how many samples and how many positive labels
+each group of a protected attribute contains.
+The class `GroupContingency` holds exactly these counts and can be passed to the metrics in the
+`dataset` module via the keyword `contingency` instead of the label `y` and the protected attributes `z`.
+
+A contingency can describe a single dataset or a batch of subsets of a dataset.
+In the latter case, the counts have a leading batch dimension and the metrics return one value per subset.
+Subsets are given as binary masks over the rows of the dataset, e.g., the population of a genetic algorithm.
+
+Example
+-------
+>>> from fairdo.metrics import GroupContingency, statistical_parity_abs_diff_max
+>>> contingency = GroupContingency.from_arrays(y, z)
+>>> statistical_parity_abs_diff_max(contingency=contingency)
+>>> # one value per binary mask
+>>> statistical_parity_abs_diff_max(contingency=GroupContingency.from_masks(masks, y, z))
+"""
+import numpy as np
+
+
+class GroupContingency:
+    """
+    Number of samples and positive labels per group of each protected attribute.
+
+    The groups of all protected attributes are stored side by side in `totals` and `positives`.
+    The groups of the `k`-th protected attribute are `groups[k]`.
+
+    Attributes
+    ----------
+    totals: ndarray, shape (n_groups,) or (n_subsets, n_groups)
+        Number of samples per group.
+    positives: ndarray, shape (n_groups,) or (n_subsets, n_groups)
+        Number of samples with label 1 per group.
+    groups: list of ndarray
+        Sorted values of the groups of each protected attribute.
+    """
+
+    def __init__(self, totals, positives, groups):
+        """
+        Parameters
+        ----------
+        totals: ndarray, shape (n_groups,) or (n_subsets, n_groups)
+            Number of samples per group.
+        positives: ndarray, shape (n_groups,) or (n_subsets, n_groups)
+            Number of samples with label 1 per group.
+        groups: list of ndarray
+            Sorted values of the groups of each protected attribute.
+        """
+        self.totals = np.asarray(totals)
+        self.positives = np.asarray(positives)
+        self.groups = [np.asarray(g) for g in groups]
+        offsets = np.cumsum([0] + [len(g) for g in self.groups])
+        self._slices = [slice(offsets[k], offsets[k + 1]) for k in range(len(self.groups))]
+        if self.totals.shape != self.positives.shape or self.totals.shape[-1] != offsets[-1]:
+            raise ValueError('totals and positives must have one entry per group.')
+
+    @classmethod
+    def from_arrays(cls, y, z, groups=None):
+        """
+        Count the samples and positive labels per group of a dataset.
+
+        Parameters
+        ----------
+        y: np.array
+            Flattened binary array of shape (n_samples,), can be the prediction or the truth label.
+        z: np.array
+            Array of shape (n_samples, n_protected_attributes) or (n_samples,) representing the protected attributes.
+        groups: list of ndarray, optional
+            Sorted values of the groups of each protected attribute.
+            Default is the groups present in `z`.
+
+        Returns
+        -------
+        GroupContingency
+        """
+        y, codes, groups = _encode_groups(y, z, groups)
+        totals = [np.bincount(codes[:, k], minlength=len(g)) for k, g in enumerate(groups)]
+        positives = [np.bincount(codes[y == 1, k], minlength=len(g)) for k, g in enumerate(groups)]
+        return cls(np.concatenate(totals), np.concatenate(positives), groups)
+
+    @classmethod
+    def from_masks(cls, masks, y, z, groups=None):
+        """
+        Count the samples and positive labels per group of the subsets of a dataset.
+
+        Parameters
+        ----------
+        masks: ndarray, shape (n_subsets, n_samples) or (n_samples,)
+            Binary masks selecting the rows of each subset.
+        y: np.array
+            Flattened binary array of shape (n_samples,), can be the prediction or the truth label.
+        z: np.array
+            Array of shape (n_samples, n_protected_attributes) or (n_samples,) representing the protected attributes.
+        groups: list of ndarray, optional
+            Sorted values of the groups of each protected attribute.
+            Default is the groups present in `z`.
+
+        Returns
+        -------
+        GroupContingency
+            Batched contingency if `masks` is 2-dimensional.
+        """
+        encoding, groups = group_encoding(y, z, groups)
+        masks = np.asarray(masks, dtype=encoding.dtype)
+        return cls.from_counts(masks @ encoding, groups)
+
+    @classmethod
+    def from_counts(cls, counts, groups):
+        """
+        Split counts obtained with an encoding of `group_encoding` into totals and positives.
+
+        Parameters
+        ----------
+        counts: ndarray, shape (2 * n_groups,) or (n_subsets, 2 * n_groups)
+            Sum of the rows of the encoding.
+        groups: list of ndarray
+            The groups of the encoding.
+
+        Returns
+        -------
+        GroupContingency
+        """
+        # counts of a float32 encoding are exact, the parities are computed in float64
+        counts = np.asarray(counts, dtype=np.float64)
+        n_groups = counts.shape[-1] // 2
+        return cls(counts[..., :n_groups], counts[..., n_groups:], groups)
+
+    @property
+    def batched(self):
+        """
+        Whether the contingency holds the counts of multiple subsets.
+        """
+        return self.totals.ndim == 2
+
+    @property
+    def n_attributes(self):
+        """
+        Number of protected attributes.
+        """
+        return len(self.groups)
+
+    @property
+    def size(self):
+        """
+        Number of samples. One value per subset if batched.
+        """
+        # every sample belongs to exactly one group of the first protected attribute
+        return self.totals[..., self._slices[0]].sum(axis=-1)
+
+    def attribute(self, k, positive_label=1):
+        """
+        Counts of the groups of the `k`-th protected attribute.
+
+        Parameters
+        ----------
+        k: int
+            Index of the protected attribute.
+        positive_label: int, optional
+            Label considered as positive. Default is 1.
+
+        Returns
+        -------
+        totals: ndarray, shape (n_groups_k,) or (n_subsets, n_groups_k)
+        positives: ndarray, shape (n_groups_k,) or (n_subsets, n_groups_k)
+        """
+        totals = self.totals[..., self._slices[k]]
+        positives = self.positives[..., self._slices[k]]
+        if positive_label == 0:
+            positives = totals - positives
+        return totals, positives
+
+    def group(self, k, value, positive_label=1):
+        """
+        Counts of the group `value` of the `k`-th protected attribute. Groups without samples have zero counts.
+
+        Parameters
+        ----------
+        k: int
+            Index of the protected attribute.
+        value: int
+            Value of the group.
+        positive_label: int, optional
+            Label considered as positive. Default is 1.
+
+        Returns
+        -------
+        totals: int or ndarray, shape (n_subsets,)
+        positives: int or ndarray, shape (n_subsets,)
+        """
+        totals, positives = self.attribute(k, positive_label)
+        idx = np.searchsorted(self.groups[k], value)
+        if idx < len(self.groups[k]) and self.groups[k][idx] == value:
+            return totals[..., idx], positives[..., idx]
+        zeros = np.zeros(totals.shape[:-1], dtype=totals.dtype)
+        return zeros, zeros
+
+
+def group_encoding(y, z, groups=None, dtype=np.float32):
+    """
+    One-hot encoding of the groups and the positive labels per group of each sample.
+
+    Each row holds one indicator per group of every protected attribute,
+    followed by the same indicators multiplied with the sample's label.
+    The sum of the rows selected by a binary mask are the counts of
+    :meth:`GroupContingency.from_counts`, hence a matrix product of a population of masks
+    with the encoding counts all subsets at once.
+
+    Parameters
+    ----------
+    y: np.array
+        Flattened binary array of shape (n_samples,), can be the prediction or the truth label.
+    z: np.array
+        Array of shape (n_samples, n_protected_attributes) or (n_samples,) representing the protected attributes.
+    groups: list of ndarray, optional
+        Sorted values of the groups of each protected attribute.
+        Default is the groups present in `z`.
+    dtype: data-type, optional
+        Data type of the encoding. Default is float32 which is exact for up to 2**24 samples.
+
+    Returns
+    -------
+    encoding: ndarray, shape (n_samples, 2 * n_groups)
+    groups: list of ndarray
+    """
+    y, codes, groups = _encode_groups(y, z, groups)
+    n_groups = sum(len(g) for g in groups)
+    offsets = np.cumsum([0] + [len(g) for g in groups])
+    encoding = np.zeros((len(y), 2 * n_groups), dtype=dtype)
+    rows = np.arange(len(y))
+    for k in range(len(groups)):
+        encoding[rows, codes[:, k] + offsets[k]] = 1
+        encoding[rows, codes[:, k] + offsets[k] + n_groups] = y == 1
+    return encoding, groups
+
+
+def _encode_groups(y, z, groups=None):
+    """
+    Integer codes of the groups of each protected attribute.
+    """
+    y = np.asarray(y).astype(int).flatten()
+    z = np.asarray(z).astype(int)
+    if z.ndim < 2:
+        z = z.reshape(-1, 1)
+    if groups is None:
+        uniques = [np.unique(z[:, k], return_inverse=True) for k in range(z.shape[1])]
+        groups = [u[0] for u in uniques]
+        codes = np.column_stack([u[1].reshape(-1) for u in uniques]) if uniques else np.empty((len(z), 0), int)
+    else:
+        groups = [np.asarray(g) for g in groups]
+        codes = np.column_stack([np.searchsorted(g, z[:, k]) for k, g in enumerate(groups)])
+    return y, codes, groups
@@ -2,13 +2,14 @@ import numpy as np
 import warnings
 from itertools import product
 
-from fairdo.utils.helper import generate_pairs
+from fairdo.metrics.contingency import GroupContingency
 
 
-def statistical_parity_abs_diff_multi(y: np.array, z: np.array,
+def statistical_parity_abs_diff_multi(y: np.array = None, z: np.array = None,
                                       agg_attribute=np.max,
                                       agg_group=np.max,
                                       positive_label=1,
+                                      contingency: GroupContingency = None,
                                       **kwargs) -> float:
     """
     Calculate the absolute difference in statistical parity for multiple non-binary protected attributes.
@@ -26,46 +27,36 @@ def statistical_parity_abs_diff_multi(y: np.array, z: np.array,
         Aggregation function for the group. Default is np.sum.
     positive_label: int, optional
         Label considered as positive. Default is 1.
+    contingency: GroupContingency, optional
+        Counts of samples and positive labels per group. If given, `y` and `z` are ignored.
+        If the contingency is batched, one disparity per subset is returned.
 
     Returns
     -------
     float
         Aggregated attribute disparity.
     """
-    # check input
-    if len(z.shape) < 2:
-        z = z.reshape(-1, 1)
-    # invert privileged and positive label if required
-    if positive_label == 0:
-        y = 1 - y
-
-    y = y.astype(int)
-    z = z.astype(int)
+    if contingency is None:
+        contingency = GroupContingency.from_arrays(y, z)
 
-    # get unique values for each attribute
-    groups = [np.unique(z[:, i]) for i in range(z.shape[1])]
-    # print(groups)
     # get statistical parity for each attribute
     attributes_disparity = []
-    for k, zk in enumerate(groups):
-        # calculate statistical parities for all groups in one pass
-        parities = {i: np.sum(y & (z[:, k] == i)) / np.sum(z[:, k] == i) for i in zk}
-        # generate all possible pairs of values for the attribute
-        pairs = generate_pairs(zk)
-        group_disparity = [np.abs(parities[i] - parities[j]) for i, j in pairs]
-        # print(group_disparity)
-        try:
-            attributes_disparity.append(agg_group(group_disparity))
-        except ValueError:
-            warnings.warn(f"Could not aggregate disparity for attribute {k} with aggregation function {agg_group}. "
-                          f"The disparity for this attribute is {group_disparity}. "
-                          f"Returning disparity of 0.")
-            attributes_disparity.append(0)
-    return agg_attribute(attributes_disparity)
+    for k in range(contingency.n_attributes):
+        totals, positives = _atleast_2d(*contingency.attribute(k, positive_label=positive_label))
+        # statistical parities of all groups, groups without samples are ignored
+        with np.errstate(divide='ignore', invalid='ignore'):
+            parities = positives / totals
+        present = totals > 0
+        # aggregate the disparities of all pairs of groups of the attribute
+        attributes_disparity.append(_aggregate_pairs(parities, present, agg_group, attribute=k))
+    attributes_disparity = np.column_stack(attributes_disparity)
+    disparity = _aggregate(attributes_disparity, agg_attribute, np.ones(attributes_disparity.shape, dtype=bool))
+    return disparity if contingency.batched else disparity[0]
 
 
 def statistical_parity_abs_diff_intersectionality(y: np.array, z: np.array,
                                                   agg_group=np.max,
+                                                  positive_label=1,
                                                   **kwargs) -> float:
     """
     Calculate the absolute difference in statistical parity for multiple non-binary protected attributes.
@@ -80,19 +71,75 @@ def statistical_parity_abs_diff_intersectionality(y: np.array, z: np.array,
         Array of shape (n_samples, n_protected_attributes) representing the protected attribute.
     agg_group: callable, optional
         Aggregation function for the group. Default is np.sum.
+    positive_label: int, optional
+        Label considered as positive. Default is 1.
     **kwargs: dict
         Additional keyword arguments.
     """
-    z_subgroups = np.apply_along_axis(lambda x: ''.join(map(str, x)), axis=1, arr=z)
-    all_subgroups = list(set(z_subgroups))
-    parities = {i: np.sum(y & (z_subgroups == i)) / np.sum(z_subgroups == i) for i in all_subgroups}
-    pairs = generate_pairs(list(all_subgroups))
-    group_disparity = [np.abs(parities[i] - parities[j]) for i, j in pairs]
+    return statistical_parity_abs_diff_multi(contingency=intersectional_contingency(y, z), agg_group=agg_group,
+                                             positive_label=positive_label)
 
-    return agg_group(group_disparity)
 
+def intersectional_contingency(y: np.array, z: np.array) -> GroupContingency:
+    """
+    Count the samples and positive labels of each intersection of the protected attributes, i.e., of each
+    subgroup. The subgroups are treated as the groups of a single protected attribute.
 
-def statistical_parity_abs_diff(y: np.array, z: np.array, agg_group=np.sum, **kwargs) -> float:
+    Parameters
+    ----------
+    y: np.array
+        Flattened binary array of shape (n_samples,), can be the prediction or the truth label.
+    z: np.array
+        Array of shape (n_samples, n_protected_attributes) or (n_samples,) representing the protected attributes.
+
+    Returns
+    -------
+    GroupContingency
+        The counts of the subgroups that have samples.
+    """
+    codes, n_codes = intersectional_codes(z)
+    y = np.asarray(y).flatten()
+    totals = np.bincount(codes, minlength=n_codes)
+    positives = np.bincount(codes, weights=y == 1, minlength=n_codes).astype(totals.dtype)
+    present = np.flatnonzero(totals)
+    return GroupContingency(totals[present], positives[present], [present])
+
+
+def intersectional_codes(z: np.array):
+    """
+    Integer code of the subgroup, i.e., of the combination of protected attributes, of each sample.
+    The values of each protected attribute are replaced by their rank and combined in mixed radix.
+
+    Parameters
+    ----------
+    z: np.array
+        Array of shape (n_samples, n_protected_attributes) or (n_samples,) representing the protected attributes.
+
+    Returns
+    -------
+    codes: np.array
+        The subgroup of each sample, shape (n_samples,).
+    n_codes: int
+        The number of possible codes. Codes of subgroups without samples are not used.
+    """
+    z = np.asarray(z)
+    if z.ndim < 2:
+        z = z.reshape(-1, 1)
+    columns = [np.unique(z[:, k], return_inverse=True) for k in range(z.shape[1])]
+    n_codes = int(np.prod([len(values) for values, _ in columns], dtype=object))
+    if n_codes > max(4 * len(z), 2 ** 16):
+        # too many combinations to count all of them, only the present ones are numbered
+        _, codes = np.unique(z, axis=0, return_inverse=True)
+        codes = codes.reshape(-1)
+        return codes, int(codes.max(initial=-1)) + 1
+    codes = np.zeros(len(z), dtype=np.int64)
+    for values, inverse in columns:
+        codes = codes * len(values) + inverse.reshape(-1)
+    return codes, n_codes
+
+
+def statistical_parity_abs_diff(y: np.array = None, z: np.array = None, agg_group=np.sum,
+                                contingency: GroupContingency = None, **kwargs) -> float:
     """
     Calculate the absolute value of the statistical parity difference between all groups inside a protected attribute.
     The protected attribute `z` can be binary or non-binary.
@@ -111,18 +158,21 @@ def statistical_parity_abs_diff(y: np.array, z: np.array, agg_group=np.sum, **kw
         Label considered as positive. Default is 1.
     privileged_group: int, optional
         Label considered as privileged. Default is 1.
+    contingency: GroupContingency, optional
+        Counts of samples and positive labels per group. If given, `y` and `z` are ignored.
 
     Returns
     -------
     float
         The absolute value of the statistical parity difference.
     """
-    if z.ndim > 1:
+    if (z.ndim if contingency is None else contingency.n_attributes) > 1:
         raise ValueError("z must be a 1D array")
-    return statistical_parity_abs_diff_multi(y=y, z=z, agg_group=agg_group, **kwargs)
+    return statistical_parity_abs_diff_multi(y=y, z=z, agg_group=agg_group, contingency=contingency, **kwargs)
 
 
-def statistical_parity_abs_diff_sum(y: np.array, z: np.array,
+def statistical_parity_abs_diff_sum(y: np.array = None, z: np.array = None,
+                                    contingency: GroupContingency = None,
                                     **kwargs) -> float:
     """
     Calculate the maximum of statistical parity absolute differences between all groups in a protected attribute.
@@ -139,16 +189,19 @@ def statistical_parity_abs_diff_sum(y: np.array, z: np.array,
         Label considered as positive. Default is 1.
     privileged_group: int, optional
         Label considered as privileged. Default is 1.
+    contingency: GroupContingency, optional
+        Counts of samples and positive labels per group. If given, `y` and `z` are ignored.
 
     Returns
     -------
     float
         Average of the absolute value of the statistical parity differences between all groups.
     """
-    return statistical_parity_abs_diff(y=y, z=z, agg_group=np.sum, **kwargs)
+    return statistical_parity_abs_diff(y=y, z=z, agg_group=np.sum, contingency=contingency, **kwargs)
 
 
-def statistical_parity_abs_diff_mean(y: np.array, z: np.array,
+def statistical_parity_abs_diff_mean(y: np.array = None, z: np.array = None,
+                                     contingency: GroupContingency = None,
                                      **kwargs) -> float:
     """
     Calculate the sum of statistical parity absolute differences between all groups and return the average score.
@@ -165,16 +218,19 @@ def statistical_parity_abs_diff_mean(y: np.array, z: np.array,
         Label considered as positive. Default is 1.
     privileged_group: int, optional
         Label considered as privileged. Default is 1.
+    contingency: GroupContingency, optional
+        Counts of samples and positive labels per group. If given, `y` and `z` are ignored.
 
     Returns
     -------
     float
         Average of the absolute value of the statistical parity differences between all groups.
     """
-    return statistical_parity_abs_diff(y=y, z=z, agg_group=np.mean, **kwargs)
+    return statistical_parity_abs_diff(y=y, z=z, agg_group=np.mean, contingency=contingency, **kwargs)
 
 
-def statistical_parity_abs_diff_max(y: np.array, z: np.array,
+def statistical_parity_abs_diff_max(y: np.array = None, z: np.array = None,
+                                    contingency: GroupContingency = None,
                                     **kwargs) -> float:
     """
     Calculate the maximum of statistical parity absolute differences between all groups in a protected attribute.
@@ -191,17 +247,20 @@ def statistical_parity_abs_diff_max(y: np.array, z: np.array,
         Label considered as positive. Default is 1.
     privileged_group: int, optional
         Label considered as privileged. Default is 1.
+    contingency: GroupContingency, optional
+        Counts of samples and positive labels per group. If given, `y` and `z` are ignored.
 
     Returns
     -------
     float
         Average of the absolute value of the statistical parity differences between all groups.
     """
-    return statistical_parity_abs_diff(y=y, z=z, agg_group=np.max, **kwargs)
+    return statistical_parity_abs_diff(y=y, z=z, agg_group=np.max, contingency=contingency, **kwargs)
 
 
-def statistical_parity_difference(y: np.array, z: np.array,
-                                  positive_label=1, privileged_group=1, **kwargs) -> float:
+def statistical_parity_difference(y: np.array = None, z: np.array = None,
+                                  positive_label=1, privileged_group=1,
+                                  contingency: GroupContingency = None, **kwargs) -> float:
     """
     Calculate the difference in statistical parity according to [1].
     The protected attribute `z` must be binary. Returned value can be negative.
@@ -218,30 +277,20 @@ def statistical_parity_difference(y: np.array, z: np.array,
         Label considered as positive. Default is 1.
     privileged_group: int, optional
         Label considered as privileged. Default is 1.
+    contingency: GroupContingency, optional
+        Counts of samples and positive labels per group. If given, `y` and `z` are ignored.
 
     Returns
     -------
     float
         The difference in statistical parity between unprivileged and privileged groups.
     """
-    if z.ndim > 1:
-        raise ValueError("z must be a 1D array")
-
-    # invert privileged and positive label if required
-    if privileged_group == 0:
-        z = 1 - z
-    if positive_label == 0:
-        y = 1 - y
-
-    y = y.astype(int)
-    z = z.astype(int)
-    priv = np.sum(y & z) / np.sum(z)
-    unpriv = np.sum(y & (1 - z)) / np.sum(1 - z)
+    unpriv, priv = _binary_parities(y, z, positive_label, privileged_group, contingency)
 
     return unpriv - priv
 
 
-def mean_difference(*args, **kwargs) -> float:
+def mean_difference(*args, contingency: GroupContingency = None, **kwargs) -> float:
     """
     Alias for the `statistical_parity_difference` function.
 
@@ -255,17 +304,20 @@ def mean_difference(*args, **kwargs) -> float:
         Label considered as positive. Default is 1.
     privileged_group: int, optional
         Label considered as privileged. Default is 1.
+    contingency: GroupContingency, optional
+        Counts of samples and positive labels per group. If given, `y` and `z` are ignored.
 
     Returns
     -------
     float
         The difference in statistical parity between unprivileged and privileged groups.
     """
-    return statistical_parity_difference(*args, **kwargs)
+    return statistical_parity_difference(*args, contingency=contingency, **kwargs)
 
 
-def disparate_impact_ratio(y: np.array, z: np.array,
-                           positive_label=1, privileged_group=1, **kwargs) -> float:
+def disparate_impact_ratio(y: np.array = None, z: np.array = None,
+                           positive_label=1, privileged_group=1,
+                           contingency: GroupContingency = None, **kwargs) -> float:
     """
     Calculate the Disparate Impact ratio.
     The protected attribute `z` must be binary.
@@ -286,34 +338,28 @@ def disparate_impact_ratio(y: np.array, z: np.array,
         Label considered as positive. Default is 1.
     privileged_group: int, optional
         Label considered as privileged. Default is 1.
+    contingency: GroupContingency, optional
+        Counts of samples and positive labels per group. If given, `y` and `z` are ignored.
 
     Returns
     -------
     float
         The Disparate Impact ratio.
     """
-    # invert privileged and positive label if required
-    if privileged_group == 0:
-        z = 1 - z
-    if positive_label == 0:
-        y = 1 - y
-
-    y = y.astype(int)
-    z = z.astype(int)
-    priv = np.sum(y & z) / np.sum(z)
-    unpriv = np.sum(y & (1 - z)) / np.sum(1 - z)
+    unpriv, priv = _binary_parities(y, z, positive_label, privileged_group, contingency)
 
-    if priv == 0:
+    if np.any(priv == 0):
         warnings.warn("Disparate impact cannot be calculated. y=1 and z=1 are not apparent in the dataset.")
         warnings.warn("Return 1 (fair).")
 
-        return 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(priv == 0, 1, unpriv / priv)
+    return ratio if ratio.ndim else ratio.item()
 
-    return unpriv / priv
 
-
-def disparate_impact_ratio_objective(y: np.array, z: np.array,
-                                     positive_label=1, privileged_group=1, **kwargs) -> float:
+def disparate_impact_ratio_objective(y: np.array = None, z: np.array = None,
+                                     positive_label=1, privileged_group=1,
+                                     contingency: GroupContingency = None, **kwargs) -> float:
     """
     Calculate the objective Disparate Impact ratio.
     The protected attribute `z` must be binary.
@@ -333,17 +379,20 @@ def disparate_impact_ratio_objective(y: np.array, z: np.array,
         Label considered as positive. Default is 1.
     privileged_group: int, optional
         Label considered as privileged. Default is 1.
+    contingency: GroupContingency, optional
+        Counts of samples and positive labels per group. If given, `y` and `z` are ignored.
 
     Returns
     -------
     float
         The objective Disparate Impact ratio.
     """
-    return np.abs(1 - disparate_impact_ratio(y, z, positive_label, privileged_group, **kwargs))
+    return np.abs(1 - disparate_impact_ratio(y, z, positive_label, privileged_group, contingency=contingency, **kwargs))
 
 
-def disparate_impact_ratio_deviation(y: np.array, z: np.array,
-                                     positive_label=1, privileged_group=1, **kwargs) -> float:
+def disparate_impact_ratio_deviation(y: np.array = None, z: np.array = None,
+                                     positive_label=1, privileged_group=1,
+                                     contingency: GroupContingency = None, **kwargs) -> float:
     """
     Calculate the difference in objective Disparate Impact ratio.
     The protected attribute `z` must be binary.
@@ -364,10 +413,137 @@ def disparate_impact_ratio_deviation(y: np.array, z: np.array,
         Label considered as positive. Default is 1.
     privileged_group: int, optional
         Label considered as privileged. Default is 1.
+    contingency: GroupContingency, optional
+        Counts of samples and positive labels per group. If given, `y` and `z` are ignored.
 
     Returns
     -------
     float
         The difference in objective Disparate Impact ratio.
     """
-    return 1 - disparate_impact_ratio(y, z, positive_label, privileged_group, **kwargs)
+    return 1 - disparate_impact_ratio(y, z, positive_label, privileged_group, contingency=contingency, **kwargs)
+
+
+def _binary_parities(y, z, positive_label, privileged_group, contingency):
+    """
+    Statistical parities of the unprivileged and the privileged group of a binary protected attribute.
+    """
+    if contingency is None:
+        if z.ndim > 1:
+            raise ValueError("z must be a 1D array")
+        contingency = GroupContingency.from_arrays(y, z)
+    elif contingency.n_attributes > 1:
+        raise ValueError("z must be a 1D array")
+
+    priv_totals, priv_positives = contingency.group(0, privileged_group, positive_label=positive_label)
+    unpriv_totals, unpriv_positives = contingency.group(0, 1 - privileged_group, positive_label=positive_label)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.true_divide(unpriv_positives, unpriv_totals), np.true_divide(priv_positives, priv_totals)
+
+
+def _atleast_2d(*arrays):
+    return [np.atleast_2d(a) for a in arrays]
+
+
+# numpy aggregations and their counterparts that ignore missing groups
+_NAN_AGGREGATIONS = {np.max: np.nanmax, np.min: np.nanmin, np.sum: np.nansum,
+                     np.mean: np.nanmean, np.median: np.nanmedian}
+
+
+def _aggregate_pairs(parities, present, agg, attribute=None):
+    """
+    Aggregate the absolute differences of the parities of all pairs of present groups of each row with `agg`.
+
+    The aggregations in `_PAIR_AGGREGATIONS` are computed from the sorted parities in O(k log k) for k groups
+    without materializing the k * (k - 1) / 2 pairs:
+    the maximum is the largest minus the smallest parity, the minimum is the smallest gap between neighbors,
+    and the sum of the i-th smallest of m parities is weighted with `2 * i - (m - 1)`.
+    Other aggregations are applied to all pairs.
+
+    Parameters
+    ----------
+    parities: ndarray, shape (n_subsets, n_groups)
+    present: ndarray, shape (n_subsets, n_groups)
+        Boolean mask of the groups with samples.
+    agg: callable
+        Aggregation function that takes a list of values.
+    attribute: int, optional
+        Index of the protected attribute. Only used for warnings.
+
+    Returns
+    -------
+    ndarray, shape (n_subsets,)
+    """
+    if agg not in _PAIR_AGGREGATIONS:
+        i, j = np.triu_indices(parities.shape[1], k=1)
+        return _aggregate(np.abs(parities[:, i] - parities[:, j]), agg, present[:, i] & present[:, j],
+                          attribute=attribute)
+    n_present = present.sum(axis=1)
+    # parities of the present groups in ascending order, followed by the missing groups
+    ranks = np.arange(parities.shape[1])
+    valid = ranks < n_present[:, np.newaxis]
+    p = np.where(valid, np.sort(np.where(present, parities, np.inf), axis=1), 0)
+
+    result = np.empty(parities.shape[0])
+    pairs = n_present >= 2
+    if np.any(pairs):
+        p, valid, m = p[pairs], valid[pairs], n_present[pairs]
+        if agg is np.max:
+            result[pairs] = p[np.arange(len(p)), m - 1] - p[:, 0]
+        elif agg is np.min:
+            gaps = np.where(valid[:, 1:], np.diff(p, axis=1), np.inf)
+            result[pairs] = gaps.min(axis=1)
+        else:
+            total = np.sum(p * (2 * ranks - (m[:, np.newaxis] - 1)), axis=1)
+            result[pairs] = total if agg is np.sum else total / (m * (m - 1) / 2)
+    if not np.all(pairs):
+        # less than two groups have no pairs, which is aggregated like an empty list
+        empty = np.empty(((~pairs).sum(), 0))
+        result[~pairs] = _aggregate(empty, agg, empty.astype(bool), attribute=attribute)
+    return result
+
+
+# aggregations of the pairwise disparities that are computed from the sorted parities
+_PAIR_AGGREGATIONS = (np.max, np.min, np.sum, np.mean)
+
+
+def _aggregate(values, agg, valid, attribute=None):
+    """
+    Aggregate the valid entries of each row of `values` with `agg`.
+
+    Parameters
+    ----------
+    values: ndarray, shape (n_subsets, n_values)
+    agg: callable
+        Aggregation function that takes a list of values.
+    valid: ndarray, shape (n_subsets, n_values)
+        Boolean mask of the values to aggregate.
+    attribute: int, optional
+        Index of the protected attribute. Only used for warnings.
+
+    Returns
+    -------
+    ndarray, shape (n_subsets,)
+    """
+    result = np.empty(values.shape[0])
+    fallback = np.ones(values.shape[0], dtype=bool)
+    if agg in _NAN_AGGREGATIONS:
+        # rows without valid values are aggregated like empty lists below
+        fallback = ~valid.any(axis=1)
+    if np.all(valid) and agg in _NAN_AGGREGATIONS and values.shape[1] > 0:
+        # nothing to ignore, undefined disparities propagate like in `agg`
+        return agg(values, axis=1)
+    if not np.all(fallback):
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            result[~fallback] = _NAN_AGGREGATIONS[agg](np.where(valid, values, np.nan)[~fallback], axis=1)
+    for i in np.flatnonzero(fallback):
+        disparity = list(values[i, valid[i]])
+        try:
+            result[i] = agg(disparity)
+        except ValueError:
+            warnings.warn(f"Could not aggregate disparity for attribute {attribute} with aggregation function {agg}. "
+                          f"The disparity for this attribute is {disparity}. "
+                          f"Returning disparity of 0.")
+            result[i] = 0
+    return result
@@ -1,9 +1,10 @@
 import numpy as np
-from scipy.stats import rankdata
 from sklearn.metrics import mutual_info_score, normalized_mutual_info_score
 
 import warnings
 
+from fairdo.utils.helper import check_random_state
+
 
 def dependency_multi(y: np.array, z: np.array,
                      dependency_function=normalized_mutual_info_score,
@@ -202,7 +203,7 @@ def pearsonr_abs(y: np.array, z: np.array, **kwargs) -> float:
     return np.abs(pearsonr(y, z))
 
 
-def rdc(y: np.array, z: np.array, f=np.sin, k=20, s=1 / 6., n=1, **kwargs):
+def rdc(y: np.array, z: np.array, f=np.sin, k=20, s=1 / 6., n=1, random_state=None, **kwargs):
     """
     Implements the Randomized Dependence Coefficient
     David Lopez-Paz, Philipp Hennig, Bernhard Schoelkopf
@@ -213,6 +214,9 @@ def rdc(y: np.array, z: np.array, f=np.sin, k=20, s=1 / 6., n=1, **kwargs):
     According to the paper, the coefficient should be relatively insensitive to
     the settings of the f, k, and s parameters.
 
+    Tied values get the same rank, the number of values less than or equal to them, so the coefficient
+    does not depend on the order of the rows, and independent discrete inputs have a coefficient close to zero.
+
     Parameters
     ----------
     y, z: numpy arrays 1-D or 2-D
@@ -223,76 +227,232 @@ def rdc(y: np.array, z: np.array, f=np.sin, k=20, s=1 / 6., n=1, **kwargs):
     s:   scale parameter
     n:   number of times to compute the RDC and
          return the median (for stability)
+    random_state: None, int or np.random.Generator, optional
+         The random state of the projections, see :func:`fairdo.utils.helper.check_random_state`.
 
     Returns
     -------
     float
         The RDC between X and Y
     """
-    if n > 1:
-        values = []
-        for i in range(n):
-            try:
-                values.append(rdc(y, z, f, k, s, 1))
-            except np.linalg.linalg.LinAlgError:
-                pass
-        return np.median(values)
-
-    if len(y.shape) == 1: y = y.reshape((-1, 1))
-    if len(z.shape) == 1: z = z.reshape((-1, 1))
-
-    # Copula Transformation
-    cx = np.column_stack([rankdata(xc, method='ordinal') for xc in y.T]) / float(y.size)
-    cy = np.column_stack([rankdata(yc, method='ordinal') for yc in z.T]) / float(z.size)
-
-    # Add a vector of ones so that w.x + b is just a dot product
-    O = np.ones(cx.shape[0])
-    X = np.column_stack([cx, O])
-    Y = np.column_stack([cy, O])
-
-    # Random linear projections
-    Rx = (s / X.shape[1]) * np.random.randn(X.shape[1], k)
-    Ry = (s / Y.shape[1]) * np.random.randn(Y.shape[1], k)
-    X = np.dot(X, Rx)
-    Y = np.dot(Y, Ry)
-
-    # Apply non-linear function to random projections
-    fX = f(X)
-    fY = f(Y)
-
-    # Compute full covariance matrix
-    C = np.cov(np.hstack([fX, fY]).T)
-
-    # Due to numerical issues, if k is too large,
-    # then rank(fX) < k or rank(fY) < k, so we need
-    # to find the largest k such that the eigenvalues
-    # (canonical correlations) are real-valued
-    k0 = k
-    lb = 1
-    ub = k
-    while True:
-
-        # Compute canonical correlations
-        Cxx = C[:k, :k]
-        Cyy = C[k0:k0 + k, k0:k0 + k]
-        Cxy = C[:k, k0:k0 + k]
-        Cyx = C[k0:k0 + k, :k]
-
-        eigs = np.linalg.eigvals(np.dot(np.dot(np.linalg.pinv(Cxx), Cxy),
-                                        np.dot(np.linalg.pinv(Cyy), Cyx)))
-
-        # Binary search if k is too large
-        if not (np.all(np.isreal(eigs)) and
-                0 <= np.min(eigs) and
-                np.max(eigs) <= 1):
-            ub -= 1
-            k = (ub + lb) // 2
-            continue
-        if lb == ub: break
-        lb = k
-        if ub == lb + 1:
-            k = ub
-        else:
-            k = (ub + lb) // 2
-
-    return np.sqrt(np.max(eigs))
+    return RandomizedDependence(y, z, f=f, k=k, s=s, n=n, random_state=random_state).score()
+
+
+class RandomizedDependence:
+    """
+    Randomized Dependence Coefficient of subsets of a dataset.
+
+    The random projections are drawn once, and the copula of a subset follows from the sort order of the whole
+    dataset, i.e., the rank of a row within a subset is the number of selected rows with a value less than or
+    equal to its value.
+    The covariance matrices of many subsets are computed at once as weighted matrix products over all rows.
+    The canonical correlations are the singular values of the whitened cross-covariance, so no binary search
+    over the number of projections is needed if the random features are rank deficient.
+
+    Attributes
+    ----------
+    f: callable
+        The non-linear function applied to the random projections.
+    k: int
+        The number of random projections.
+    n: int
+        The number of repetitions, the median of which is the coefficient.
+    """
+
+    def __init__(self, y, z, f=np.sin, k=20, s=1 / 6., n=1, random_state=None):
+        """
+        Parameters
+        ----------
+        y, z: np.array
+            Arrays of shape (n_samples,) or (n_samples, n_variables).
+        f: callable, optional
+            The non-linear function applied to the random projections. Default is np.sin.
+        k: int, optional
+            The number of random projections. Default is 20.
+        s: float, optional
+            The scale of the random projections. Default is 1/6.
+        n: int, optional
+            The number of repetitions with different projections. Default is 1.
+        random_state: None, int or np.random.Generator, optional
+            The random state of the projections, see :func:`fairdo.utils.helper.check_random_state`.
+            Default is None.
+        """
+        rng = check_random_state(random_state)
+        self.f = f
+        self.k = k
+        self.n = n
+        self._variables = []
+        for values in (y, z):
+            values = np.asarray(values)
+            if values.ndim == 1:
+                values = values.reshape(-1, 1)
+            order = np.argsort(values, axis=0, kind='stable')
+            # tied values share the rank of the last row of their tie block in the sort order
+            sorted_values = np.take_along_axis(values, order, axis=0)
+            last = np.ones(sorted_values.shape, dtype=bool)
+            last[:-1] = sorted_values[1:] != sorted_values[:-1]
+            tie_ends = np.empty(order.shape, dtype=np.int64)
+            for j in range(values.shape[1]):
+                ends = np.flatnonzero(last[:, j])
+                tie_ends[:, j] = np.repeat(ends, np.diff(ends, prepend=-1))
+            # projections of all repetitions side by side, the last row is the offset
+            dims = values.shape[1] + 1
+            projections = (s / dims) * rng.standard_normal((dims, n * k))
+            self._variables.append((order, tie_ends, projections))
+
+    def score(self, mask=None):
+        """
+        Randomized Dependence Coefficient of a subset.
+
+        Parameters
+        ----------
+        mask: np.array, optional
+            Binary mask over the rows of the dataset. Default is None, i.e., all rows.
+
+        Returns
+        -------
+        float
+        """
+        if mask is None:
+            mask = np.ones(len(self._variables[0][0]))
+        return self.score_population(np.asarray(mask).reshape(1, -1))[0]
+
+    def score_population(self, masks, batch_size=2 ** 24):
+        """
+        Randomized Dependence Coefficient of several subsets.
+
+        Parameters
+        ----------
+        masks: np.array
+            Binary masks of shape (n_masks, n_samples).
+        batch_size: int, optional
+            The maximum number of random features held in memory at once. Default is 2**24.
+
+        Returns
+        -------
+        ndarray, shape (n_masks,)
+        """
+        masks = np.asarray(masks) == 1
+        n_masks, n_samples = masks.shape
+        chunk = max(1, batch_size // max(2 * self.n * self.k * n_samples, 1))
+        return np.concatenate([self._score(masks[start:start + chunk]) for start in range(0, n_masks, chunk)])
+
+    def _score(self, masks):
+        """
+        Randomized Dependence Coefficient of a batch of subsets.
+        """
+        weights = masks.astype(float)
+        sizes = np.maximum(weights.sum(axis=1), 1)[:, np.newaxis]
+        features = [self._features(masks, sizes, *variable) for variable in self._variables]
+        # shape (n_masks, n, n_samples, 2k) with the features of y and z of each repetition side by side
+        features = np.concatenate([feature.reshape(*masks.shape, self.n, self.k) for feature in features], axis=-1)
+        features = features.transpose(0, 2, 1, 3)
+        weighted = features * weights[:, np.newaxis, :, np.newaxis]
+        means = weighted.sum(axis=2) / sizes[:, np.newaxis]
+        cov = np.swapaxes(features, -1, -2) @ weighted / sizes[..., np.newaxis, np.newaxis]
+        cov -= means[..., :, np.newaxis] * means[..., np.newaxis, :]
+        return np.median(_canonical_correlation(cov, self.k), axis=1)
+
+    def _features(self, masks, sizes, order, tie_ends, projections):
+        """
+        Random non-linear features of the copula of each subset, shape (n_masks, n_samples, n * k).
+        Rows outside a subset get arbitrary values.
+        """
+        n_masks, n_samples = masks.shape
+        dims = order.shape[1]
+        copula = np.empty((n_masks, n_samples, dims))
+        for j in range(dims):
+            copula[:, order[:, j], j] = np.cumsum(masks[:, order[:, j]], axis=1)[:, tie_ends[:, j]]
+        # the ranks are scaled by the number of values like in the original implementation
+        copula /= sizes[..., np.newaxis] * dims
+        return self.f(copula @ projections[:-1] + projections[-1])
+
+
+class RDCObjective:
+    """
+    `rdc` of the labels and protected attributes that precomputes a `RandomizedDependence` of the whole dataset.
+
+    A :class:`fairdo.preprocessing.objective.DatasetObjective` fits the objective once on all rows that may be
+    part of a solution, and then evaluates whole populations of binary masks at once.
+
+    Example
+    -------
+    >>> from fairdo.preprocessing import HeuristicWrapper
+    >>> preprocessor = HeuristicWrapper(heuristic=ga, protected_attribute='race', label='y',
+    ...                                 disc_measure=RDCObjective(random_state=0))
+
+    Attributes
+    ----------
+    dependence: RandomizedDependence or None
+        The coefficient of the dataset. None before `fit`.
+    """
+
+    def __init__(self, f=np.sin, k=20, s=1 / 6., n=1, random_state=None):
+        """
+        Parameters
+        ----------
+        f, k, s, n, random_state
+            See `rdc`.
+        """
+        self.f = f
+        self.k = k
+        self.s = s
+        self.n = n
+        self.random_state = random_state
+        self.dependence = None
+
+    def fit(self, y, z, **kwargs):
+        """
+        Rank the whole dataset and draw the random projections.
+
+        Parameters
+        ----------
+        y: np.array
+            Flattened array, can be a prediction or the truth label.
+        z: np.array
+            The protected attributes.
+
+        Returns
+        -------
+        self
+        """
+        self.dependence = RandomizedDependence(y, z, f=self.f, k=self.k, s=self.s, n=self.n,
+                                               random_state=self.random_state)
+        return self
+
+    def __call__(self, y=None, z=None, mask=None, **kwargs):
+        """
+        `rdc` of the subset `mask` of the fitted dataset, or one value per row if `mask` is 2-D.
+        Without a fit or a mask, the `rdc` of `y` and `z`.
+        """
+        if mask is None or self.dependence is None:
+            return rdc(y, z, f=self.f, k=self.k, s=self.s, n=self.n, random_state=self.random_state)
+        mask = np.asarray(mask)
+        if mask.ndim == 2:
+            return self.dependence.score_population(mask)
+        return self.dependence.score(mask)
+
+
+def _canonical_correlation(cov, k):
+    """
+    Largest canonical correlation between the first `k` and the remaining variables of batched covariance
+    matrices. Directions of zero variance are ignored.
+    """
+    wx = _whitening(cov[..., :k, :k])
+    wy = _whitening(cov[..., k:, k:])
+    cross = np.swapaxes(wx, -1, -2) @ cov[..., :k, k:] @ wy
+    return np.clip(np.linalg.svd(cross, compute_uv=False)[..., 0], 0, 1)
+
+
+def _whitening(cov, rtol=1e-10):
+    """
+    Matrices `w` with ``w.T @ cov @ w`` the identity on the range of the batched covariance matrices `cov`.
+    Directions with a variance below `rtol` times the largest variance are dropped. The random features of a
+    smooth copula are nearly collinear, so a larger `rtol`, e.g., the square root of the machine epsilon, drops
+    directions that carry the dependence, and a smaller one amplifies rounding errors.
+    """
+    u, values, _ = np.linalg.svd(cov, hermitian=True)
+    valid = values > values[..., :1] * rtol
+    scale = np.zeros_like(values)
+    np.divide(1, np.sqrt(values, where=valid, out=np.zeros_like(values)), where=valid, out=scale)
+    return u * scale[..., np.newaxis, :]
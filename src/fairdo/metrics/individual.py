@@ -2,7 +2,8 @@ import numpy as np
 from sklearn.neighbors import NearestNeighbors
 
 
-def consistency_score(x: np.array, y: np.array, n_neighbors=5, **kwargs) -> float:
+def consistency_score(x: np.array = None, y: np.array = None, n_neighbors=5, graph=None, mask=None,
+                      **kwargs) -> float:
     """
     Compute the Consistency Score as defined in Learning Fair Representations (Zemel et al. 2013).
 
@@ -17,6 +18,11 @@ def consistency_score(x: np.array, y: np.array, n_neighbors=5, **kwargs) -> floa
         Array of the same length as x, representing the output data.
     n_neighbors: int, optional
         Number of neighbors to consider. Default is 5.
+    graph: ConsistencyGraph, optional
+        Nearest neighbor graph of a dataset. If given, the score of the subset `mask` of that dataset is computed
+        from the graph, and `x`, `y` and `n_neighbors` are ignored.
+    mask: np.array, optional
+        Binary mask over the rows of the dataset of `graph`.
     **kwargs
         Additional keyword arguments. These are not currently used.
 
@@ -25,6 +31,8 @@ def consistency_score(x: np.array, y: np.array, n_neighbors=5, **kwargs) -> floa
     float
         The consistency score. Higher values indicate more fairness.
     """
+    if graph is not None:
+        return graph.score(mask)
 
     # fit the KNN model
     nbrs = NearestNeighbors(n_neighbors=n_neighbors + 1, algorithm='ball_tree').fit(x)
@@ -41,7 +49,7 @@ def consistency_score(x: np.array, y: np.array, n_neighbors=5, **kwargs) -> floa
     return 1 - np.mean(differences)
 
 
-def consistency_score_objective(x: np.array, y: np.array, n_neighbors=5, **kwargs) -> float:
+def consistency_score_objective(x: np.array = None, y: np.array = None, n_neighbors=5, **kwargs) -> float:
     """
     Compute the inverse of the Consistency Score to use as an objective function.
 
@@ -56,7 +64,7 @@ def consistency_score_objective(x: np.array, y: np.array, n_neighbors=5, **kwarg
     n_neighbors: int, optional
         Number of neighbors to consider. Default is 5.
     **kwargs
-        Additional keyword arguments. These are not currently used.
+        Additional keyword arguments, e.g., `graph` and `mask`, see `consistency_score`.
 
     Returns
     -------
@@ -64,3 +72,157 @@ def consistency_score_objective(x: np.array, y: np.array, n_neighbors=5, **kwarg
         The inverse of the consistency score. Lower values indicate more fairness.
     """
     return 1 - consistency_score(x, y, n_neighbors, **kwargs)
+
+
+class ConsistencyGraph:
+    """
+    Nearest neighbor graph of a dataset to compute the consistency score of its subsets.
+
+    The nearest neighbors of a row within a subset are the nearest rows of the whole dataset that belong to
+    the subset. The graph stores `n_neighbors + n_spare` neighbors of each row, so the score of a subset is
+    computed by looking up the first `n_neighbors` selected neighbors of each selected row.
+    Only rows that lost more than `n_spare` of their neighbors are queried against the subset.
+
+    Attributes
+    ----------
+    x: np.array
+        The input data of the dataset.
+    y: np.array
+        The output data of the dataset.
+    n_neighbors: int
+        Number of neighbors to consider.
+    indices: np.array
+        Array of shape (n_samples, n_neighbors + n_spare) of the nearest neighbors of each row in ascending
+        distance, excluding the row itself.
+    """
+
+    def __init__(self, x, y, n_neighbors=5, n_spare=None):
+        """
+        Parameters
+        ----------
+        x: np.array
+            Array representing the input data.
+        y: np.array
+            Array of the same length as x, representing the output data.
+        n_neighbors: int, optional
+            Number of neighbors to consider. Default is 5.
+        n_spare: int, optional
+            Number of extra neighbors per row. Default is `2 * n_neighbors`.
+        """
+        if n_spare is None:
+            n_spare = 2 * n_neighbors
+        self.x = np.asarray(x)
+        self.y = np.asarray(y).flatten()
+        self.n_neighbors = n_neighbors
+        nbrs = NearestNeighbors(n_neighbors=min(n_neighbors + n_spare + 1, len(self.x)), algorithm='ball_tree')
+        self.indices = _neighbors(nbrs.fit(self.x), self.x, np.arange(len(self.x)))
+
+    def score(self, mask):
+        """
+        Consistency score of a subset of the dataset.
+
+        Parameters
+        ----------
+        mask: np.array
+            Binary mask over the rows of the dataset.
+
+        Returns
+        -------
+        float
+            The consistency score of the subset, see `consistency_score`.
+        """
+        mask = np.asarray(mask) == 1
+        rows = np.flatnonzero(mask)
+        # the first n_neighbors selected neighbors of each selected row
+        selected = mask[self.indices[rows]]
+        rank = np.cumsum(selected, axis=1)
+        nearest = selected & (rank <= self.n_neighbors)
+        differences = np.sum(np.abs(self.y[rows, np.newaxis] - self.y[self.indices[rows]]) * nearest, axis=1)
+
+        # rows with too few selected neighbors in the graph
+        lost = np.count_nonzero(nearest, axis=1) < self.n_neighbors
+        if np.any(lost):
+            nbrs = NearestNeighbors(n_neighbors=self.n_neighbors + 1, algorithm='brute').fit(self.x[rows])
+            indices = rows[_neighbors(nbrs, self.x[rows[lost]], np.flatnonzero(lost))]
+            differences[lost] = np.sum(np.abs(self.y[rows[lost], np.newaxis] - self.y[indices]), axis=1)
+        return 1 - np.sum(differences) / (len(rows) * self.n_neighbors)
+
+
+class ConsistencyScoreObjective:
+    """
+    `consistency_score_objective` that precomputes a `ConsistencyGraph` of the whole dataset.
+
+    A :class:`fairdo.preprocessing.objective.DatasetObjective` fits the objective once on all rows that may be
+    part of a solution, and then evaluates subsets by their binary `mask` without building a nearest neighbor
+    index per subset.
+
+    Example
+    -------
+    >>> from fairdo.preprocessing import HeuristicWrapper
+    >>> preprocessor = HeuristicWrapper(heuristic=ga, protected_attribute='race', label='y',
+    ...                                 disc_measure=ConsistencyScoreObjective(n_neighbors=5))
+
+    Attributes
+    ----------
+    n_neighbors: int
+        Number of neighbors to consider.
+    n_spare: int or None
+        Number of extra neighbors per row of the graph.
+    graph: ConsistencyGraph or None
+        The graph of the dataset. None before `fit`.
+    """
+
+    def __init__(self, n_neighbors=5, n_spare=None):
+        """
+        Parameters
+        ----------
+        n_neighbors: int, optional
+            Number of neighbors to consider. Default is 5.
+        n_spare: int, optional
+            Number of extra neighbors per row, see `ConsistencyGraph`. Default is `2 * n_neighbors`.
+        """
+        self.n_neighbors = n_neighbors
+        self.n_spare = n_spare
+        self.graph = None
+
+    def fit(self, x, y, **kwargs):
+        """
+        Build the nearest neighbor graph of the whole dataset.
+
+        Parameters
+        ----------
+        x: np.array
+            Array representing the input data.
+        y: np.array
+            Array of the same length as x, representing the output data.
+
+        Returns
+        -------
+        self
+        """
+        self.graph = ConsistencyGraph(x, y, n_neighbors=self.n_neighbors, n_spare=self.n_spare)
+        return self
+
+    def __call__(self, x=None, y=None, mask=None, **kwargs) -> float:
+        """
+        Inverse of the consistency score of the subset `mask` of the fitted dataset, or one value per row if `mask`
+        is 2-D. Without a fit or a mask, the inverse consistency score of `x` and `y`.
+        """
+        if mask is None or self.graph is None:
+            return consistency_score_objective(x, y, self.n_neighbors)
+        mask = np.asarray(mask)
+        if mask.ndim == 2:
+            return np.array([consistency_score_objective(graph=self.graph, mask=row) for row in mask])
+        return consistency_score_objective(graph=self.graph, mask=mask)
+
+
+def _neighbors(nbrs, x, rows):
+    """
+    Nearest neighbors of the rows `rows` of the fitted data, which are queried with their values `x`,
+    without the row itself. If duplicates push a row out of its own neighbors, the farthest neighbor is dropped.
+    """
+    _, indices = nbrs.kneighbors(x)
+    other = indices != np.asarray(rows)[:, np.newaxis]
+    own = ~np.all(other, axis=1)
+    other[~own, -1] = False
+    return indices[other].reshape(len(indices), -1)
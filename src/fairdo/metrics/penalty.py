@@ -10,11 +10,13 @@ penalties are applied to the solutions.
 """
 import numpy as np
 from fairdo.utils.helper import nunique
+from fairdo.metrics.contingency import GroupContingency
 
 
-def group_missing_penalty(z: np.array, n_groups: np.array,
+def group_missing_penalty(z: np.array = None, n_groups: np.array = None,
                           agg_attribute='max',
-                          agg_group='max', **kwargs) -> float:
+                          agg_group='max',
+                          contingency: GroupContingency = None, **kwargs) -> float:
     """
     Calculate the penalty for missing groups in a protected attribute.
     The number of groups `n_groups` is used to calculate the penalty.
@@ -35,32 +37,112 @@ def group_missing_penalty(z: np.array, n_groups: np.array,
         Number of groups for each protected attribute.
     agg_group: str, optional
         Aggregation function for the group. Default is 'sum'.
+    contingency: GroupContingency, optional
+        Counts of samples per group. If given, `z` is ignored and the available groups are those with samples.
+        If the contingency is batched, one penalty per subset is returned.
 
     Returns
     -------
     float
         The penalty for missing groups.
     """
-    n_avail_groups = nunique(z, axis=0)
+    if contingency is not None:
+        n_avail_groups = available_groups(contingency)
+    else:
+        n_avail_groups = count_groups(z)
+    return missing_groups_penalty(n_avail_groups, n_groups, agg_attribute=agg_attribute, agg_group=agg_group)
+
+
+def available_groups(contingency: GroupContingency) -> np.array:
+    """
+    Number of groups with samples for each protected attribute.
+
+    Parameters
+    ----------
+    contingency: GroupContingency
+        Counts of samples per group.
 
+    Returns
+    -------
+    np.array
+        Array of shape (n_attributes,), or (n_subsets, n_attributes) if the contingency is batched.
+    """
+    return np.stack([np.count_nonzero(contingency.attribute(k)[0] > 0, axis=-1)
+                     for k in range(contingency.n_attributes)], axis=-1)
+
+
+def count_groups(z: np.array) -> np.array:
+    """
+    Number of distinct groups of each protected attribute.
+    Protected attributes with small non-negative integer values are counted with `np.bincount` in linear time,
+    all others by sorting, see :func:`fairdo.utils.helper.nunique`.
+
+    Parameters
+    ----------
+    z: np.array
+        Array of shape (n_samples, n_protected_attributes) or (n_samples,).
+
+    Returns
+    -------
+    np.array
+        Array of shape (n_protected_attributes,).
+    """
+    z = np.asarray(z)
+    if z.ndim == 1:
+        z = z.reshape(-1, 1)
+    counts = []
+    for column in z.T:
+        if (column.dtype.kind in 'bui' and column.size and column.min() >= 0
+                and column.max() < 4 * column.size + 1024):
+            counts.append(np.count_nonzero(np.bincount(column.astype(np.int64))))
+        else:
+            counts.append(nunique(column)[0])
+    return np.array(counts, dtype=int)
+
+
+def missing_groups_penalty(n_avail_groups: np.array, n_groups: np.array,
+                           agg_attribute='max',
+                           agg_group='max') -> float:
+    """
+    Penalty for missing groups given the number of available groups of each protected attribute,
+    see `group_missing_penalty`.
+
+    Parameters
+    ----------
+    n_avail_groups: np.array
+        Number of available groups for each protected attribute.
+        Array of shape (n_attributes,) or (n_subsets, n_attributes) for one penalty per subset.
+    n_groups: np.array
+        Number of groups for each protected attribute.
+    agg_attribute: str, optional
+        Aggregation function for the attributes. Default is 'max'.
+    agg_group: str, optional
+        Aggregation function for the group. Default is 'max'.
+
+    Returns
+    -------
+    float or np.array
+        The penalty for missing groups. One value per subset if `n_avail_groups` is 2-dimensional.
+    """
+    n_avail_groups = np.asarray(n_avail_groups)
     if agg_group == 'max':
         if agg_attribute == 'max':
-            return int(np.any(n_avail_groups < n_groups))
+            return np.any(n_avail_groups < n_groups, axis=-1).astype(int)
         elif agg_attribute == 'sum':
-            return np.sum(n_avail_groups < n_groups)
+            return np.sum(n_avail_groups < n_groups, axis=-1)
     elif agg_group == 'sum':
         n_missing_groups = n_groups - n_avail_groups
         group_penalties = n_missing_groups * (2 * n_groups - n_missing_groups - 1) / 2
-        
+
         if agg_attribute == 'sum':
-            return np.sum(group_penalties)
+            return np.sum(group_penalties, axis=-1)
         elif agg_attribute == 'max':
-            return np.max(group_penalties)
-    else:
-        raise NotImplementedError("Only sum and max are implemented for agg_group and agg_attribute.")
+            return np.max(group_penalties, axis=-1)
+    raise NotImplementedError("Only sum and max are implemented for agg_group and agg_attribute.")
 
 
-def data_size_measure(y: np.array, dims: int, **kwargs) -> float:
+def data_size_measure(y: np.array = None, dims: int = None, contingency: GroupContingency = None,
+                      **kwargs) -> float:
     """
     Test function to measure the size of the data.
     The function returns the negative of the length of the vector `y` divided by `dims`.
@@ -71,11 +153,14 @@ def data_size_measure(y: np.array, dims: int, **kwargs) -> float:
     y: np.array
         Vector to measure the size of.
     dims: int
+    contingency: GroupContingency, optional
+        Counts of samples per group. If given, its size is used instead of the length of `y`.
     """
-    return - len(y) / dims
+    size = len(y) if contingency is None else contingency.size
+    return - size / dims
 
 
-def data_loss(y: np.array, dims: int, **kwargs) -> float:
+def data_loss(y: np.array = None, dims: int = None, contingency: GroupContingency = None, **kwargs) -> float:
     """
     Calculate the relative amount of data lost after pre-processing.
 
@@ -86,5 +171,8 @@ def data_loss(y: np.array, dims: int, **kwargs) -> float:
         The size of it depicts the current size of the data.
     dims: int
         The size of the original data.
+    contingency: GroupContingency, optional
+        Counts of samples per group. If given, its size is used instead of the length of `y`.
     """
-    return 1 - len(y) / dims
+    size = len(y) if contingency is None else contingency.size
+    return 1 - size / dims
@@ -9,7 +9,7 @@ and specific hyperparameters as parameters.
 
 Wrapping it as a pre-processing method, all solvers return a **binary mask** that can be used to filter the dataset.
 
-The Optimize module is divided into two submodules:
+The Optimize module is divided into the following submodules:
 
 1. `baseline`: This submodule provides baseline methods for fairness optimization.
 These methods serve as a starting point for fairness optimization and can be used for comparison
@@ -21,6 +21,10 @@ are difficult or impossible to solve with traditional methods, e.g., multiple lo
 non-continuous, or discontinuous fitness functions. (Note that fitness functions is used as a term in this context and
 are equivalent to objective functions.)
 
+3. `greedy` and `parity`: Fast heuristics for objectives that are evaluated from group counts.
+`parity_method` searches subsets in which all subgroups have the same positive rate, for statistical parity
+measures. It is a quick baseline and not guaranteed to find the optimal subset.
+
 Example
 -------
 >>> from fairdo.optimize import genetic_algorithm_constraint
@@ -41,4 +45,10 @@ Example
 
 from fairdo.optimize.baseline import *
 from fairdo.optimize.single import *
-from fairdo.optimize.multi import nsga2, dom_counts_indices, dom_counts_indices_fast
\ No newline at end of file
+from fairdo.optimize.greedy import greedy_method
+from fairdo.optimize.parity import parity_method
+from fairdo.optimize.island import island_genetic_algorithm
+from fairdo.optimize.steadystate import steady_state_genetic_algorithm
+from fairdo.optimize.multi import nsga2, dom_counts_indices, dom_counts_indices_fast
+from fairdo.optimize.archive import ParetoArchive
+from fairdo.optimize.cache import FitnessCache
\ No newline at end of file
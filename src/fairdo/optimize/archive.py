@@ -0,0 +1,184 @@
+"""
+Pareto Archive
+==============
+
+This module provides an archive of the non-dominated solutions found during a multi-objective optimization run.
+
+NSGA-II only keeps a population of fixed size, so good solutions of earlier generations can be lost.
+`ParetoArchive` is updated with every evaluated population and keeps all solutions that are not dominated
+by any other solution seen so far. All fitness functions are minimized.
+
+For two objectives, the archive is a staircase sorted by the first objective,
+so that dominance queries are binary searches. Inserting a candidate still shifts the lists, i.e., it takes O(N).
+For more objectives, the fitness values of the archive are compared with a candidate at once.
+
+The solutions are stored bit-packed with :func:`fairdo.utils.helper.pack_bits`. The archive can be bounded
+with `max_size`, in which case the solutions with the smallest crowding distance are removed.
+"""
+from bisect import bisect_left, bisect_right
+
+import numpy as np
+
+from fairdo.utils.helper import pack_bits, unpack_bits
+
+
+class ParetoArchive:
+    """
+    Archive of the non-dominated solutions and their fitness values.
+
+    A candidate is only added if no solution in the archive is at least as good in every objective,
+    i.e., of several solutions with equal fitness values only the first one is kept.
+    Solutions that are dominated by an added candidate are removed.
+    If the archive has more than `max_size` solutions, the solution with the smallest crowding distance
+    is removed, see :func:`fairdo.optimize.multi.crowding_distance`. The extreme solutions are always kept.
+
+    Parameters
+    ----------
+    max_size: int, optional
+        The maximum number of solutions. Default is None, i.e., no bound.
+    d: int, optional
+        The number of genes if the solutions are already packed with `pack_bits`.
+        Default is None, i.e., the solutions are binary vectors, which are packed by the archive.
+
+    >>> archive = ParetoArchive(max_size=100)
+    >>> archive.update(population, fitness_values)
+    >>> solutions, fitness_values = archive.solutions, archive.fitness_values
+    """
+
+    def __init__(self, max_size=None, d=None):
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size must be positive.")
+        self.max_size = max_size
+        self.d = d
+        self._packed = d is not None
+        # two objectives: first objective ascending, negated second objective ascending
+        self._f1 = []
+        self._neg_f2 = []
+        self._solutions = []
+        # more objectives: fitness values as rows
+        self._fitness_values = None
+        self.num_objectives = None
+
+    def __len__(self):
+        return len(self._solutions)
+
+    def dominates(self, fitness):
+        """
+        Whether a solution of the archive is at least as good as the fitness values in every objective.
+
+        Parameters
+        ----------
+        fitness: ndarray, shape (num_objectives,)
+            The fitness values of a candidate.
+
+        Returns
+        -------
+        bool
+        """
+        if len(self) == 0:
+            return False
+        if self.num_objectives == 2:
+            # the step with the largest first objective not greater than the candidate's
+            # has the smallest second objective
+            step = bisect_right(self._f1, fitness[0]) - 1
+            return step >= 0 and self._neg_f2[step] >= -fitness[1]
+        return bool(np.any(np.all(self._fitness_values <= fitness, axis=1)))
+
+    def insert(self, solution, fitness):
+        """
+        Add a solution to the archive if it is not dominated and remove the solutions it dominates.
+
+        Parameters
+        ----------
+        solution: ndarray, shape (d,)
+            The solution.
+        fitness: ndarray, shape (num_objectives,)
+            The fitness values of the solution.
+
+        Returns
+        -------
+        bool
+            Whether the solution was added.
+        """
+        fitness = np.asarray(fitness, dtype=float)
+        if self.num_objectives is None:
+            self.num_objectives = len(fitness)
+            self._fitness_values = np.empty((0, self.num_objectives))
+        if self.dominates(fitness):
+            return False
+        if self._packed:
+            solution = np.array(solution, dtype=np.uint8)
+        else:
+            self.d = len(solution)
+            # genes equal to 1 are selected, as in the objectives
+            solution = pack_bits(np.asarray(solution) == 1)
+        if self.num_objectives == 2:
+            f1, neg_f2 = float(fitness[0]), -float(fitness[1])
+            start = bisect_left(self._f1, f1)
+            stop = bisect_right(self._neg_f2, neg_f2, lo=start)
+            self._f1[start:stop] = [f1]
+            self._neg_f2[start:stop] = [neg_f2]
+            self._solutions[start:stop] = [solution]
+        else:
+            keep = ~np.all(fitness <= self._fitness_values, axis=1)
+            self._fitness_values = np.vstack((self._fitness_values[keep], fitness))
+            self._solutions = [s for s, k in zip(self._solutions, keep) if k] + [solution]
+        if self.max_size is not None and len(self) > self.max_size:
+            self._truncate()
+        return True
+
+    def _truncate(self):
+        """
+        Remove the solutions with the smallest crowding distance until the archive has `max_size` solutions.
+        """
+        # fairdo.optimize.multi imports this module
+        from fairdo.optimize.multi import crowding_distance
+
+        while len(self) > self.max_size:
+            worst = int(np.argmin(crowding_distance(self.fitness_values)))
+            if self.num_objectives == 2:
+                del self._f1[worst], self._neg_f2[worst]
+            else:
+                self._fitness_values = np.delete(self._fitness_values, worst, axis=0)
+            del self._solutions[worst]
+
+    def update(self, solutions, fitness_values):
+        """
+        Add all non-dominated solutions of a population to the archive.
+
+        Parameters
+        ----------
+        solutions: ndarray, shape (pop_size, d)
+            The population.
+        fitness_values: ndarray, shape (pop_size, num_objectives)
+            The fitness values of the population.
+
+        Returns
+        -------
+        int
+            The number of added solutions.
+        """
+        fitness_values = np.asarray(fitness_values, dtype=float)
+        # candidates in order of the first objective are rarely removed again
+        order = np.lexsort(fitness_values.T[::-1])
+        return sum(self.insert(solutions[i], fitness_values[i]) for i in order)
+
+    @property
+    def solutions(self):
+        """
+        ndarray, shape (n, d): The solutions of the archive, unpacked.
+        """
+        if len(self) == 0:
+            return np.empty((0, self.d or 0), dtype=np.uint8)
+        return unpack_bits(np.array(self._solutions), self.d)
+
+    @property
+    def fitness_values(self):
+        """
+        ndarray, shape (n, num_objectives): The fitness values of the solutions of the archive.
+        """
+        if self.num_objectives == 2:
+            return np.column_stack((self._f1, np.negative(self._neg_f2)))
+        if self._fitness_values is None:
+            return np.empty((0, 0))
+        return self._fitness_values.copy()
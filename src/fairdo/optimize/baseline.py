@@ -1,5 +1,9 @@
 import numpy as np
 
+from fairdo.optimize.budget import Budget
+from fairdo.optimize.cache import check_cache, evaluate_cached
+from fairdo.utils.helper import check_random_state
+
 
 def original_method(f, d):
     """
@@ -21,7 +25,8 @@ def original_method(f, d):
     return np.ones(d), f(np.ones(d))
 
 
-def random_method(f, d, pop_size=100, num_generations=500):
+def random_method(f, d, pop_size=100, num_generations=500, random_state=None, cache=None,
+                  max_time=None, max_evaluations=None, target_fitness=None):
     """
     This function generates a random binary vector and evaluates its performance.
     In a for-loop, it generates a new binary vector and evaluates its performance.
@@ -38,24 +43,46 @@ def random_method(f, d, pop_size=100, num_generations=500):
         The size of the population.
     num_generations : int
         The number of generations.
+    random_state : None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
+    cache : None, int or FitnessCache, optional
+        Cache of the fitness values of already evaluated vectors, see :class:`fairdo.optimize.cache.FitnessCache`.
+        If int, a new cache with this maximum size is used. Default is None, i.e., no cache.
+    max_time : float, optional
+        The maximum run time in seconds. Default is None, i.e., no deadline.
+    max_evaluations : int, optional
+        The maximum number of evaluated vectors. Default is None, i.e., no limit.
+    target_fitness : float, optional
+        The search stops as soon as a vector with a fitness of at most `target_fitness` is found. Default is None.
 
     Returns
     -------
     np.array, float
         The final solution vector and its fitness value.
     """
-    best_solution = np.random.randint(2, size=d)
-    best_fitness = f(best_solution)
+    budget = Budget(max_time=max_time, max_evaluations=max_evaluations)
+    rng = check_random_state(random_state)
+    cache = check_cache(cache)
+
+    def evaluate(solutions):
+        return [f(solution) for solution in solutions]
+
+    best_solution = rng.integers(2, size=d)
+    best_fitness = evaluate_cached(cache, evaluate, best_solution[np.newaxis])[0]
+    budget.spend(1)
     for _ in range(pop_size * num_generations):
-        new_solution = np.random.randint(2, size=d)
-        new_fitness = f(new_solution)
+        if (target_fitness is not None and best_fitness <= target_fitness) or budget.exhausted(1):
+            break
+        new_solution = rng.integers(2, size=d)
+        new_fitness = evaluate_cached(cache, evaluate, new_solution[np.newaxis])[0]
+        budget.spend(1)
         if new_fitness < best_fitness:
             best_solution = new_solution
             best_fitness = new_fitness
     return best_solution, best_fitness
 
 
-def random_method_vectorized(f, d, pop_size=100, num_generations=500):
+def random_method_vectorized(f, d, pop_size=100, num_generations=500, random_state=None, cache=None):
     """
     This function is not essentially faster than the original function but requires more memory.
 
@@ -74,14 +101,21 @@ def random_method_vectorized(f, d, pop_size=100, num_generations=500):
         The size of the population.
     num_generations : int
         The number of generations.
+    random_state : None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
+    cache : None, int or FitnessCache, optional
+        Cache of the fitness values of already evaluated vectors, see :class:`fairdo.optimize.cache.FitnessCache`.
+        If int, a new cache with this maximum size is used. Default is None, i.e., no cache.
 
     Returns
     -------
     np.array, float
         The final solution vector and its fitness value.
     """
-    solutions = np.random.randint(2, size=(pop_size * num_generations, d))
-    fitness_values = np.apply_along_axis(f, 1, solutions)
+    rng = check_random_state(random_state)
+    solutions = rng.integers(2, size=(pop_size * num_generations, d))
+    fitness_values = evaluate_cached(check_cache(cache), lambda population: np.apply_along_axis(f, 1, population),
+                                     solutions)
 
     best_index = np.argmin(fitness_values)
     best_solution = solutions[best_index]
@@ -0,0 +1,82 @@
+"""
+Budget
+======
+
+This module provides the budget of an optimizer run, i.e., a wall-clock deadline and a maximum number of
+fitness evaluations.
+
+The optimizers check the budget before each generation and stop if the next generation would exceed
+the maximum number of evaluations or if the deadline has passed.
+The deadline is checked between generations, i.e., a run can take up to one generation longer than `max_time`.
+The initial population is always evaluated.
+"""
+import time
+
+
+class Budget:
+    """
+    Wall-clock and evaluation budget of an optimizer run.
+
+    >>> budget = Budget(max_time=60, max_evaluations=10000)
+    >>> while not budget.exhausted(pop_size):
+    ...     fitness = evaluate_population(f, population)
+    ...     budget.spend(pop_size)
+
+    Attributes
+    ----------
+    max_time: float or None
+        The maximum run time in seconds. None means no deadline.
+    max_evaluations: int or None
+        The maximum number of fitness evaluations. None means no limit.
+    evaluations: int
+        The number of fitness evaluations so far.
+    """
+
+    def __init__(self, max_time=None, max_evaluations=None):
+        """
+        Parameters
+        ----------
+        max_time: float, optional
+            The maximum run time in seconds, measured from the creation of the budget. Default is None.
+        max_evaluations: int, optional
+            The maximum number of fitness evaluations. Default is None.
+        """
+        self.max_time = max_time
+        self.max_evaluations = max_evaluations
+        self.evaluations = 0
+        self.start = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        """
+        float: The seconds since the creation of the budget.
+        """
+        return time.perf_counter() - self.start
+
+    def spend(self, evaluations):
+        """
+        Count fitness evaluations.
+
+        Parameters
+        ----------
+        evaluations: int
+            The number of evaluated individuals.
+        """
+        self.evaluations += evaluations
+
+    def exhausted(self, evaluations=0):
+        """
+        Whether the deadline has passed or `evaluations` more fitness evaluations would exceed the maximum.
+
+        Parameters
+        ----------
+        evaluations: int, optional
+            The number of evaluations of the next step, e.g., of the next generation. Default is 0.
+
+        Returns
+        -------
+        bool
+        """
+        if self.max_time is not None and self.elapsed >= self.max_time:
+            return True
+        return self.max_evaluations is not None and self.evaluations + evaluations > self.max_evaluations
@@ -0,0 +1,188 @@
+"""
+Fitness Cache
+=============
+
+This module provides a bounded cache of fitness values for the optimizers.
+
+Genetic algorithms evaluate identical individuals again and again, e.g., parents that survive a generation
+or duplicates in a converged population. `FitnessCache` stores the fitness values of the most recently
+evaluated individuals, keyed by the bytes of the bit-packed individual, and only the individuals that are not
+in the cache are passed to the fitness function.
+Binary individuals are keyed by their bit-packed genes. Individuals with other values, e.g., from
+`simulated_binary_crossover`, are keyed by the exact bytes of their genes, so they never share a fitness value
+with a different individual, whatever the fitness function does with the values.
+The cache pays off for expensive fitness functions, e.g., the consistency score or the RDC.
+
+Example
+-------
+>>> from fairdo.optimize import genetic_algorithm
+>>> best_solution, fitness = genetic_algorithm(f, d, cache=10000)
+
+or, to inspect the statistics of the cache after the run:
+
+>>> cache = FitnessCache(maxsize=10000)
+>>> best_solution, fitness = genetic_algorithm(f, d, cache=cache)
+>>> cache.hits, cache.misses, cache.hit_rate
+"""
+from collections import OrderedDict
+
+import numpy as np
+
+
+class FitnessCache:
+    """
+    Least recently used cache of the fitness values of individuals.
+
+    Attributes
+    ----------
+    maxsize: int
+        The maximum number of cached individuals.
+    hits: int
+        The number of individuals whose fitness values were taken from the cache.
+    misses: int
+        The number of individuals that were evaluated.
+    """
+
+    def __init__(self, maxsize=100000):
+        """
+        Parameters
+        ----------
+        maxsize: int, optional
+            The maximum number of cached individuals. Default is 100000.
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._values = OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def hit_rate(self):
+        """
+        float: The fraction of individuals whose fitness values were taken from the cache.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """
+        Remove all cached fitness values and reset the statistics.
+        """
+        self._values.clear()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def keys(population, d=None):
+        """
+        The cache keys of the individuals of a population.
+
+        Parameters
+        ----------
+        population: ndarray, shape (pop_size, d)
+            The population.
+        d: int, optional
+            The number of bits if the individuals are bit-packed. Default is None, i.e., not packed.
+
+        Returns
+        -------
+        list of bytes
+            The bytes of each bit-packed individual. Individuals with genes other than 0 and 1
+            are keyed by the bytes of their genes and their dtype instead.
+        """
+        if d is not None:
+            return [row.tobytes() for row in np.ascontiguousarray(population)]
+        population = np.ascontiguousarray(population)
+        binary = np.all((population == 0) | (population == 1), axis=1)
+        packed = np.packbits(population == 1, axis=1)
+        # the prefix keeps the keys of packed and unpacked individuals apart
+        dtype = b'\x01' + population.dtype.str.encode()
+        return [b'\x00' + packed_row.tobytes() if is_binary else dtype + row.tobytes()
+                for row, packed_row, is_binary in zip(population, packed, binary)]
+
+    def evaluate(self, evaluate, population, d=None):
+        """
+        Fitness values of a population. Only individuals that are not in the cache are evaluated,
+        identical individuals of the population only once.
+
+        Parameters
+        ----------
+        evaluate: callable
+            Function that evaluates a sub-population and returns its fitness values.
+        population: ndarray, shape (pop_size, d)
+            The population.
+        d: int, optional
+            The number of bits if the individuals are bit-packed. Default is None, i.e., not packed.
+
+        Returns
+        -------
+        fitness: ndarray, shape (pop_size,) or (pop_size, n_objectives)
+            The fitness values of the population.
+        """
+        fitness = [None] * len(population)
+        # positions of the individuals that are not in the cache
+        missing = {}
+        for i, key in enumerate(self.keys(population, d)):
+            if key in self._values:
+                self._values.move_to_end(key)
+                fitness[i] = self._values[key]
+            else:
+                missing.setdefault(key, []).append(i)
+        self.misses += len(missing)
+        self.hits += len(population) - len(missing)
+
+        if missing:
+            values = np.asarray(evaluate(population[[positions[0] for positions in missing.values()]]), dtype=float)
+            for (key, positions), value in zip(missing.items(), values):
+                self._values[key] = value
+                for i in positions:
+                    fitness[i] = value
+            while len(self._values) > self.maxsize:
+                self._values.popitem(last=False)
+        return np.asarray(fitness, dtype=float)
+
+
+def check_cache(cache):
+    """
+    Turn the `cache` argument of an optimizer into a `FitnessCache`.
+
+    Parameters
+    ----------
+    cache: None, int or FitnessCache
+        If None, no cache is used. If int, a new cache with this maximum size.
+        If a FitnessCache, it is used as is, e.g., to share it between runs or to read its statistics.
+
+    Returns
+    -------
+    FitnessCache or None
+    """
+    if cache is None or isinstance(cache, FitnessCache):
+        return cache
+    return FitnessCache(maxsize=int(cache))
+
+
+def evaluate_cached(cache, evaluate, population, d=None):
+    """
+    Fitness values of a population, taken from the cache where possible.
+
+    Parameters
+    ----------
+    cache: FitnessCache or None
+        The cache. If None, the whole population is evaluated.
+    evaluate: callable
+        Function that evaluates a sub-population and returns its fitness values.
+    population: ndarray, shape (pop_size, d)
+        The population.
+    d: int, optional
+        The number of bits if the individuals are bit-packed. Default is None, i.e., not packed.
+
+    Returns
+    -------
+    fitness: ndarray, shape (pop_size,) or (pop_size, n_objectives)
+        The fitness values of the population.
+    """
+    if cache is None:
+        return evaluate(population)
+    return cache.evaluate(evaluate, population, d=d)
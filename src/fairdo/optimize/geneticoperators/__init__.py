@@ -4,6 +4,7 @@ Genetic Operators Module
 
 The Genetic Operators module provides methods for genetic operators used in the genetic algorithm.
 It is divided into three submodules: `crossover`, `mutation`, and `selection`.
+The submodule `packed` adapts the operators to bit-packed populations.
 If the user wants to use different parameter settings for the provided genetic operators,
 they can do so by using Python's `functools.partial` method.
 
@@ -31,3 +32,4 @@ from fairdo.optimize.geneticoperators.initialization import *
 from fairdo.optimize.geneticoperators.crossover import *
 from fairdo.optimize.geneticoperators.mutation import *
 from fairdo.optimize.geneticoperators.selection import *
+from fairdo.optimize.geneticoperators.packed import *
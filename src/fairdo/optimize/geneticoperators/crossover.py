@@ -15,8 +15,14 @@ Goldberg, D. E. (1989). Genetic Algorithms in Search, Optimization, and Machine
 """
 import numpy as np
 
+from fairdo.optimize.geneticoperators.mutation import sample_without_replacement
+from fairdo.utils.helper import MAX_SPARSE_FLIPS, check_random_state, pack_bits, unpack_bits
 
-def onepoint_crossover(parents, num_offspring):
+# below this probability of taking a gene from the other parent, uniform crossover only draws the taken genes
+SPARSE_CROSSOVER_RATE = 0.1
+
+
+def onepoint_crossover(parents, num_offspring, return_lineage=False, random_state=None):
     """
     Perform the crossover operation with One-point crossover on the parents to create the offspring.
 
@@ -26,16 +32,23 @@ def onepoint_crossover(parents, num_offspring):
         Parents of the offspring with shape (2, d).
     num_offspring: int
         Number of offsprings.
+    return_lineage: bool, optional
+        Whether to also return the lineage of the offspring, see `crossover_lineage`. Default is False.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
     offspring: ndarray, shape (num_offspring, d)
+    lineage: tuple of ndarray
+        Only if `return_lineage` is True, see `crossover_lineage`.
     """
     # perform one-point crossover on the parents to generate new offspring
-    return kpoint_crossover(parents, num_offspring, k=1)
+    return kpoint_crossover(parents, num_offspring, k=1, return_lineage=return_lineage, random_state=random_state)
 
 
-def uniform_crossover(parents, num_offspring, p=0.5):
+def uniform_crossover(parents, num_offspring, p=0.5, packed=False, d=None, n_keep=None, return_lineage=False,
+                      random_state=None):
     """
     Perform the crossover operation with Uniform crossover on the parents to create the offspring.
 
@@ -47,22 +60,125 @@ def uniform_crossover(parents, num_offspring, p=0.5):
         Number of offsprings.
     p: float
         Probability of selecting a gene from the first parent, default is `0.5`.
+    packed: bool, optional
+        Whether the parents are bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+    d: int, optional
+        Number of bits of packed parents. Required if `packed` is True.
+    n_keep: int, optional
+        If given, each offspring has exactly `n_keep` ones, see `fixed_size_uniform_crossover`.
+        `p` is ignored in this case. Default is None.
+    return_lineage: bool, optional
+        Whether to also return the lineage of the offspring, see `crossover_lineage`.
+        Only supported for unpacked parents. Default is False.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
     offspring: ndarray, shape (num_offspring, d)
+    lineage: tuple of ndarray
+        Only if `return_lineage` is True, see `crossover_lineage`.
     """
-    # perform crossover on the parents to generate new offspring
-    offspring = np.empty((num_offspring, parents.shape[1]))
-    for k in range(num_offspring):
-        # create a mask with the same shape as a gene
-        mask = np.random.uniform(size=parents.shape[1]) < p
-        # assign genes to the offspring based on the mask
-        offspring[k] = np.where(mask, parents[0], parents[1])
+    if return_lineage and (packed or n_keep is not None):
+        if packed:
+            raise ValueError("The lineage of the offspring is only supported for unpacked parents.")
+        offspring = fixed_size_uniform_crossover(parents, num_offspring, n_keep, random_state=random_state)
+        return offspring, crossover_lineage(parents, offspring)
+    if n_keep is not None:
+        return fixed_size_uniform_crossover(parents, num_offspring, n_keep, packed=packed, d=d,
+                                            random_state=random_state)
+    rng = check_random_state(random_state)
+    if packed:
+        if p == 0.5:
+            # random bytes are uniformly distributed bits
+            mask = rng.integers(0, 256, size=(num_offspring, parents.shape[1]), dtype=np.uint8)
+        else:
+            mask = pack_bits(rng.random((num_offspring, d)) < p)
+        return (parents[0] & mask) | (parents[1] & ~mask)
+    # the offspring copy the parent they mostly take genes from, only the genes in which the parents differ
+    # are drawn
+    origin = 0 if p >= 0.5 else 1
+    differ = np.flatnonzero(parents[0] != parents[1])
+    offspring = np.repeat(parents[origin][np.newaxis].astype(float), num_offspring, axis=0)
+    q = min(p, 1 - p)
+    if q < SPARSE_CROSSOVER_RATE:
+        # the number of genes taken from the other parent is binomial, and they are a uniformly random subset
+        n_taken = rng.binomial(differ.size, q, size=num_offspring)
+        k = int(n_taken.max(initial=0))
+        samples = sample_without_replacement(num_offspring, differ.size, k, random_state=rng)
+        if k > differ.size // 4:
+            # the samples of a random permutation are not in random order
+            samples = rng.permuted(samples, axis=1)
+        rows, columns = np.nonzero(np.arange(k) < n_taken[:, np.newaxis])
+        positions = differ[samples[rows, columns]]
+        offspring[rows, positions] = parents[1 - origin, positions]
+    else:
+        # each row decides which differing gene is taken from the other parent
+        if q == 0.5:
+            random_bytes = rng.integers(0, 256, size=(num_offspring, -(-differ.size // 8)), dtype=np.uint8)
+            taken = np.unpackbits(random_bytes, axis=1, count=differ.size).view(bool)
+        else:
+            taken = rng.random((num_offspring, differ.size)) < q
+        offspring[:, differ] = np.where(taken, parents[1 - origin, differ], parents[origin, differ])
+        if return_lineage:
+            if q * differ.size > MAX_SPARSE_FLIPS * parents.shape[1]:
+                # too many flips to list, the offspring are counted from scratch
+                return offspring, (np.full(num_offspring, origin), None, None)
+            rows, columns = np.nonzero(taken)
+            positions = differ[columns]
+    if return_lineage:
+        return offspring, (np.full(num_offspring, origin), rows, positions)
     return offspring
 
 
-def kpoint_crossover(parents, num_offspring, k=2):
+def fixed_size_uniform_crossover(parents, num_offspring, n_keep, packed=False, d=None, random_state=None):
+    """
+    Perform a cardinality-preserving Uniform crossover on the parents to create the offspring.
+    Genes selected by both parents are inherited. The remaining ones are a uniformly random subset of the genes
+    selected by only one of the parents, so that each offspring selects exactly `n_keep` genes
+    if both parents do.
+
+    Parameters
+    ----------
+    parents: numpy array
+        Parents of the offspring with shape (2, d).
+    num_offspring: int
+        Number of offsprings.
+    n_keep: int
+        Number of selected genes per offspring.
+    packed: bool, optional
+        Whether the parents are bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+    d: int, optional
+        Number of bits of packed parents. Required if `packed` is True.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
+
+    Returns
+    -------
+    offspring: ndarray, shape (num_offspring, d)
+    """
+    rng = check_random_state(random_state)
+    genes = unpack_bits(parents[:2], d) if packed else parents[:2]
+    common = (genes[0] == 1) & (genes[1] == 1)
+    differ = np.flatnonzero(genes[0] != genes[1])
+    k = int(np.clip(n_keep - np.count_nonzero(common), 0, differ.size))
+
+    if packed:
+        offspring = np.repeat(pack_bits(common)[np.newaxis], num_offspring, axis=0)
+    else:
+        offspring = np.repeat(common[np.newaxis].astype(float), num_offspring, axis=0)
+    if k == 0:
+        return offspring
+    chosen = differ[sample_without_replacement(num_offspring, differ.size, k, random_state=rng)].ravel()
+    rows = np.repeat(np.arange(num_offspring), k)
+    if packed:
+        np.bitwise_or.at(offspring, (rows, chosen // 8), (128 >> (chosen % 8)).astype(np.uint8))
+    else:
+        offspring[rows, chosen] = 1
+    return offspring
+
+
+def kpoint_crossover(parents, num_offspring, k=2, return_lineage=False, random_state=None):
     """
     Perform the crossover operation with K-point crossover on the parents to create the offspring.
 
@@ -74,32 +190,82 @@ def kpoint_crossover(parents, num_offspring, k=2):
         Number of offsprings.
     k: int
         number of crossover points, default is 2
+    return_lineage: bool, optional
+        Whether to also return the lineage of the offspring, see `crossover_lineage`. Default is False.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
     offspring: ndarray, shape (num_offspring, d)
+    lineage: tuple of ndarray
+        Only if `return_lineage` is True, see `crossover_lineage`.
     """
     d = parents.shape[1]
-    offspring = np.empty((num_offspring, d))
-
-    for i in range(num_offspring):
-        parent1_idx = i % parents.shape[0]
-        parent2_idx = (i + 1) % parents.shape[0]
+    if k > d - 1:
+        raise ValueError("k cannot be larger than the number of genes minus one.")
+    rng = check_random_state(random_state)
+    rows = np.arange(num_offspring)
+    parent1_idx = rows % parents.shape[0]
+    parent2_idx = (rows + 1) % parents.shape[0]
 
-        # Calculate crossover points
-        crossover_points = np.sort(np.random.choice(d - 1, k, replace=False)) + 1
-        crossover_points = np.concatenate(([0], crossover_points, [d]))
+    # Calculate k distinct crossover points per offspring, rows with duplicate points are drawn again
+    crossover_points = rng.integers(1, d, size=(num_offspring, k))
+    duplicates = rows
+    while duplicates.size:
+        crossover_points[duplicates] = rng.integers(1, d, size=(duplicates.size, k))
+        sorted_points = np.sort(crossover_points, axis=1)
+        duplicates = np.flatnonzero(np.any(sorted_points[:, 1:] == sorted_points[:, :-1], axis=1))
 
-        for j in range(len(crossover_points) - 1):
-            start, end = crossover_points[j], crossover_points[j + 1]
-            # Choose parent based on j (even or odd)
-            parent_idx = parent1_idx if j % 2 == 0 else parent2_idx
-            offspring[i, start:end] = parents[parent_idx, start:end]
+    # every crossover point switches the parent, i.e., odd segments come from the second parent
+    switches = np.zeros((num_offspring, d), dtype=bool)
+    switches[rows[:, np.newaxis], crossover_points] = True
+    second = np.logical_xor.accumulate(switches, axis=1)
 
+    offspring = np.where(second, parents[parent2_idx], parents[parent1_idx]).astype(float)
+    if return_lineage:
+        return offspring, crossover_lineage(parents, offspring, parent1_idx, parent2_idx)
     return offspring
 
 
-def simulated_binary_crossover(parents, num_offspring, eta=15):
+def crossover_lineage(parents, offspring, first=None, second=None):
+    """
+    Lineage of binary offspring of two parents each: the closer parent of each offspring and the bits in which the
+    offspring differs from it.
+    With the lineage, the counts of the parents can be updated to the counts of the offspring, see
+    :meth:`fairdo.preprocessing.objective.DatasetObjective.update_counts`.
+
+    Parameters
+    ----------
+    parents: ndarray, shape (n_parents, d)
+        The parents.
+    offspring: ndarray, shape (num_offspring, d)
+        The offspring.
+    first, second: ndarray, shape (num_offspring,), optional
+        The indices of the two parents of each offspring. Default is the first and the second parent.
+
+    Returns
+    -------
+    origin: ndarray, shape (num_offspring,)
+        The index of the closer parent of each offspring.
+    rows, positions: ndarray, shape (n_flips,)
+        The offspring and the position of each bit that differs from the closer parent.
+        `uniform_crossover` returns None for both if more than `MAX_SPARSE_FLIPS` of the bits would be listed.
+    """
+    n = len(offspring)
+    first = np.zeros(n, dtype=int) if first is None else np.asarray(first)
+    second = np.ones(n, dtype=int) if second is None else np.asarray(second)
+    differ = parents[first] != parents[second]
+    flipped = offspring != parents[first]
+    n_flipped = np.count_nonzero(flipped, axis=1)
+    # where the parents differ, a bit of binary offspring differs from exactly one of them
+    closer_second = n_flipped > np.count_nonzero(differ, axis=1) - n_flipped
+    flipped[closer_second] ^= differ[closer_second]
+    rows, positions = np.nonzero(flipped)
+    return np.where(closer_second, second, first), rows, positions
+
+
+def simulated_binary_crossover(parents, num_offspring, eta=15, random_state=None):
     """
     Perform the crossover operation with Simulated Binary Crossover (SBX) on the parents to create the offspring.
     
@@ -109,7 +275,11 @@ def simulated_binary_crossover(parents, num_offspring, eta=15):
         Parents of the offspring with shape (2, d).
     num_offspring: int
         Number of offsprings.
-    
+    eta: float
+        Distribution index, default is 15.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
+
     Returns
     -------
     offspring: ndarray, shape (num_offspring, d)
@@ -118,20 +288,16 @@ def simulated_binary_crossover(parents, num_offspring, eta=15):
     ----------
     Kalyanmoy Deb, Karthik Sindhya, and Tatsuya Okabe. Self-adaptive simulated binary crossover for real-parameter optimization. In Proceedings of the 9th Annual Conference on Genetic and Evolutionary Computation, GECCO ‘07, pages 1187–1194, New York, NY, USA, 2007. Association for Computing Machinery.
     """
-    # initialize offspring
     d = parents.shape[1]
-    offspring = np.empty((num_offspring, d))
+    rng = check_random_state(random_state)
+    # select the order of the two parents for each offspring
+    swap = (rng.random(num_offspring) < 0.5)[:, np.newaxis]
+    parent1 = np.where(swap, parents[1], parents[0])
+    parent2 = np.where(swap, parents[0], parents[1])
+
+    # generate the spread factors of all offspring
+    u = rng.random((num_offspring, d))
+    beta = np.where(u <= 0.5, 2 * u, 1 / (2 * (1 - u))) ** (1 / (eta + 1))
 
     # generate the offspring
-    for i in range(num_offspring):
-        # select two parents
-        parent1, parent2 = parents[np.random.choice(2, 2, replace=False)]
-        # generate a random number
-        u = np.random.rand(d)
-        beta = np.empty(d)
-        beta[u <= 0.5] = (2 * u[u <= 0.5]) ** (1 / (eta + 1))
-        beta[u > 0.5] = (1 / (2 * (1 - u[u > 0.5]))) ** (1 / (eta + 1))
-        # generate the offspring
-        offspring[i] = 0.5 * ((1 + beta) * parent1 + (1 - beta) * parent2)
-    
-    return offspring
\ No newline at end of file
+    return 0.5 * ((1 + beta) * parent1 + (1 - beta) * parent2)
\ No newline at end of file
@@ -1,7 +1,10 @@
 import numpy as np
 
+from fairdo.optimize.geneticoperators.mutation import sample_without_replacement
+from fairdo.utils.helper import check_random_state, pack_bits
 
-def random_initialization(pop_size, d):
+
+def random_initialization(pop_size, d, packed=False, n_keep=None, random_state=None):
     """
     Generate a random population of binary vectors. Each vector has a length of d.
     The values of the vectors are either 0 or 1. The population is generated randomly.
@@ -12,16 +15,25 @@ def random_initialization(pop_size, d):
         The size of the population to generate.
     d: int
         The dimension of the binary vectors.
+    packed: bool, optional
+        Whether to return the population bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+    n_keep: int, optional
+        If given, each vector has exactly `n_keep` ones, see `fixed_size_initialization`. Default is None.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
     population: ndarray, shape (pop_size, d)
         The generated population of binary vectors.
     """
-    return biased_random_initialization(pop_size, d, selection_probability=0.5)
+    if n_keep is not None:
+        return fixed_size_initialization(pop_size, d, n_keep, packed=packed, random_state=random_state)
+    return biased_random_initialization(pop_size, d, selection_probability=0.5, packed=packed,
+                                        random_state=random_state)
 
 
-def biased_random_initialization(pop_size, d, selection_probability=0.8):
+def biased_random_initialization(pop_size, d, selection_probability=0.8, packed=False, random_state=None):
     """
     Initialize the population with a bias towards selecting more items.
 
@@ -33,15 +45,24 @@ def biased_random_initialization(pop_size, d, selection_probability=0.8):
         Dimensionality of the problem (number of items).
     selection_probability: float
         Probability of initializing a bit as 1.
+    packed: bool, optional
+        Whether to return the population bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns:
         np.ndarray: Initialized population with shape (pop_size, d).
     """
-    population = np.random.choice([0, 1], size=(pop_size, d), p=[1 - selection_probability, selection_probability])
+    rng = check_random_state(random_state)
+    if packed:
+        # pack row by row to never hold the unpacked population
+        return np.array([pack_bits(rng.random(d) < selection_probability) for _ in range(pop_size)])
+    population = rng.choice([0, 1], size=(pop_size, d), p=[1 - selection_probability, selection_probability])
     return population
 
 
-def variable_probability_initialization(pop_size, d, initial_probability=0.99, min_probability=0.5):
+def variable_probability_initialization(pop_size, d, initial_probability=0.99, min_probability=0.5, packed=False,
+                                        random_state=None):
     """
     Initialize the population with a variable probability of selecting items.
 
@@ -55,10 +76,55 @@ def variable_probability_initialization(pop_size, d, initial_probability=0.99, m
         Initial probability of selecting an item.
     min_probability: float
         Minimum probability of selecting an item.
+    packed: bool, optional
+        Whether to return the population bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns:
         np.ndarray: Initialized population with shape (pop_size, d).
     """
+    rng = check_random_state(random_state)
     probabilities = np.linspace(initial_probability, min_probability, num=pop_size)
-    population = np.array([np.random.choice([0, 1], size=d, p=[1 - p, p]) for p in probabilities])
-    return population
\ No newline at end of file
+    if packed:
+        return np.array([pack_bits(rng.random(d) < p) for p in probabilities])
+    population = np.array([rng.choice([0, 1], size=d, p=[1 - p, p]) for p in probabilities])
+    return population
+
+
+def fixed_size_initialization(pop_size, d, n_keep, packed=False, random_state=None):
+    """
+    Initialize the population with binary vectors that select exactly `n_keep` items each.
+    The selected items of each vector are a uniformly random subset.
+
+    Parameters
+    ----------
+    pop_size: int
+        Size of the population.
+    d: int
+        Dimensionality of the problem (number of items).
+    n_keep: int
+        Number of selected items per vector.
+    packed: bool, optional
+        Whether to return the population bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
+
+    Returns:
+        np.ndarray: Initialized population with shape (pop_size, d).
+    """
+    rng = check_random_state(random_state)
+    if packed:
+        population = np.zeros((pop_size, 8 * -(-d // 64)), dtype=np.uint8)
+    else:
+        population = np.zeros((pop_size, d), dtype=int)
+    if n_keep == 0:
+        return population
+    selected = sample_without_replacement(pop_size, d, n_keep, random_state=rng)
+    rows = np.repeat(np.arange(pop_size), n_keep)
+    selected = selected.ravel()
+    if packed:
+        np.bitwise_or.at(population, (rows, selected // 8), (128 >> (selected % 8)).astype(np.uint8))
+    else:
+        population[rows, selected] = 1
+    return population
@@ -16,11 +16,16 @@ Proceedings of the 5th International Conference on Genetic Algorithms.
 """
 import numpy as np
 
+from fairdo.utils.helper import check_random_state, pack_bits, unpack_bits
 
-def fractional_flip_mutation(offspring, mutation_rate=0.05):
+
+def fractional_flip_mutation(offspring, mutation_rate=0.05, packed=False, d=None, n_keep=None, return_lineage=False,
+                             random_state=None):
     """
     Mutates the given offspring by flipping a percentage of random bits for each offspring.
     A fixed amount of bits is flipped for each offspring.
+    If `n_keep` is given, half of the flipped bits are ones and half are zeros,
+    i.e., each offspring keeps its `n_keep` ones.
 
     Parameters
     ----------
@@ -28,24 +33,47 @@ def fractional_flip_mutation(offspring, mutation_rate=0.05):
         The offspring to be mutated. Each row represents an offspring, and each column represents a bit.
     mutation_rate: float, optional
         The percentage of random bits to flip for each offspring. Default is 0.05.
+    packed: bool, optional
+        Whether the offspring are bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+    d: int, optional
+        Number of bits of packed offspring. Required if `packed` is True.
+    n_keep: int, optional
+        The number of ones of each offspring, which is preserved by the mutation. Default is None.
+    return_lineage: bool, optional
+        Whether to also return the flipped bits. Default is False.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
     offspring: ndarray, shape (n, d)
         The mutated offspring. Each row represents an offspring, and each column represents a bit.
+    flips: tuple of ndarray
+        Only if `return_lineage` is True. The offspring and the position of each flipped bit.
     """
-    num_mutation = int(mutation_rate * offspring.shape[1])
-    for idx in range(offspring.shape[0]):
-        # select the random bits to flip
-        mutation_bits = np.random.choice(offspring.shape[1],
-                                         num_mutation,
-                                         replace=False)
-        # flip the bits
-        offspring[idx, mutation_bits] = 1 - offspring[idx, mutation_bits]
+    rng = check_random_state(random_state)
+    d = d if packed else offspring.shape[1]
+    num_mutation = int(mutation_rate * d)
+    # select the random bits to flip for all offspring at once
+    if n_keep is not None:
+        mutation_bits = exchange_bits(unpack_bits(offspring, d) if packed else offspring, n_keep,
+                                      num_mutation // 2, random_state=rng)
+        num_mutation = mutation_bits.shape[1]
+    else:
+        mutation_bits = sample_without_replacement(offspring.shape[0], d, num_mutation, random_state=rng)
+    rows = np.repeat(np.arange(offspring.shape[0]), num_mutation)
+    mutation_bits = mutation_bits.ravel()
+    # flip the bits in place
+    if packed:
+        np.bitwise_xor.at(offspring, (rows, mutation_bits // 8), (128 >> (mutation_bits % 8)).astype(np.uint8))
+    else:
+        offspring[rows, mutation_bits] = 1 - offspring[rows, mutation_bits]
+    if return_lineage:
+        return offspring, (rows, mutation_bits)
     return offspring
 
 
-def bit_flip_mutation(offspring, mutation_rate=0.05):
+def bit_flip_mutation(offspring, mutation_rate=0.05, packed=False, d=None, return_lineage=False, random_state=None):
     """
     Mutates the given offspring by flipping each bit with a certain probability.
     Some offspring may not be mutated at all, and some may be mutated more than expected.
@@ -56,18 +84,37 @@ def bit_flip_mutation(offspring, mutation_rate=0.05):
         The offspring to be mutated. Each row represents an offspring, and each column represents a bit.
     mutation_rate: float, optional
         The probability of flipping each bit. Default is 0.05.
+    packed: bool, optional
+        Whether the offspring are bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+    d: int, optional
+        Number of bits of packed offspring. Required if `packed` is True.
+    return_lineage: bool, optional
+        Whether to also return the flipped bits. Only supported for unpacked offspring. Default is False.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
     offspring: ndarray, shape (n, d)
         The mutated offspring. Each row represents an offspring, and each column represents a bit.
+    flips: tuple of ndarray
+        Only if `return_lineage` is True. The offspring and the position of each flipped bit.
     """
-    mutation_mask = np.random.rand(*offspring.shape) < mutation_rate
+    rng = check_random_state(random_state)
+    if packed:
+        if return_lineage:
+            raise ValueError("The flipped bits are only supported for unpacked offspring.")
+        for idx in range(offspring.shape[0]):
+            offspring[idx] ^= pack_bits(rng.random(d) < mutation_rate)
+        return offspring
+    mutation_mask = rng.random(offspring.shape) < mutation_rate
     offspring[mutation_mask] = 1 - offspring[mutation_mask]
+    if return_lineage:
+        return offspring, np.nonzero(mutation_mask)
     return offspring
 
 
-def swap_mutation(offspring):
+def swap_mutation(offspring, random_state=None):
     """
     Mutates the given offspring by randomly selecting two bits and swapping their values.
 
@@ -75,21 +122,26 @@ def swap_mutation(offspring):
     ----------
     offspring: ndarray, shape (n, d)
         The offspring to be mutated. Each row represents an offspring, and each column represents a bit.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
     offspring: ndarray, shape (n, d)
         The mutated offspring. Each row represents an offspring, and each column represents a bit.
     """
-    for idx in range(offspring.shape[0]):
-        # select two random bits
-        bit1, bit2 = np.random.choice(offspring.shape[1], 2, replace=False)
-        # swap the bits
-        offspring[idx, bit1], offspring[idx, bit2] = offspring[idx, bit2], offspring[idx, bit1]
+    rng = check_random_state(random_state)
+    rows = np.arange(offspring.shape[0])
+    # select two distinct random bits per offspring
+    bit1 = rng.integers(offspring.shape[1], size=rows.size)
+    bit2 = rng.integers(offspring.shape[1] - 1, size=rows.size)
+    bit2 += bit2 >= bit1
+    # swap the bits in place
+    offspring[rows, bit1], offspring[rows, bit2] = offspring[rows, bit2], offspring[rows, bit1]
     return offspring
 
 
-def adaptive_mutation(offspring, mutation_rate=0.05, diversity_threshold=0.1):
+def adaptive_mutation(offspring, mutation_rate=0.05, diversity_threshold=0.1, random_state=None):
     """
     Mutates the given offspring with an adaptive mutation rate based on population diversity.
 
@@ -101,22 +153,25 @@ def adaptive_mutation(offspring, mutation_rate=0.05, diversity_threshold=0.1):
         The initial probability of flipping each bit for each offspring. Default is 0.05.
     diversity_threshold: float, optional
         The threshold for population diversity. If diversity falls below this threshold, increase mutation rate. Default is 0.1.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
     offspring: ndarray, shape (n, d)
         The mutated offspring. Each row represents an offspring, and each column represents a bit.
     """
+    rng = check_random_state(random_state)
     # Calculate population diversity
     population_diversity = np.mean(np.std(offspring, axis=0))
     # Adjust mutation rate based on diversity
     if population_diversity < diversity_threshold:
         mutation_rate *= 2  # Increase mutation rate
     # Apply random mutation
-    return bit_flip_mutation(offspring, mutation_rate)
+    return bit_flip_mutation(offspring, mutation_rate, random_state=rng)
 
 
-def diverse_mutation(offspring, mutation_rate=0.05):
+def diverse_mutation(offspring, mutation_rate=0.05, random_state=None):
     """
     Mutates the given offspring in a diverse manner to prevent convergence towards 50% selection rate.
 
@@ -126,28 +181,31 @@ def diverse_mutation(offspring, mutation_rate=0.05):
         The offspring to be mutated. Each row represents an offspring, and each column represents a bit.
     mutation_rate: float, optional
         The base mutation rate for each bit. Default is 0.05.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
     offspring: ndarray, shape (n, d)
         The mutated offspring. Each row represents an offspring, and each column represents a bit.
     """
+    rng = check_random_state(random_state)
     # Calculate the proportion of 1s in each offspring
     proportion_ones = np.mean(offspring, axis=1)
 
     # Adjust the mutation rate based on the proportion of 1s
-    mutated_proportion_ones = proportion_ones + np.random.uniform(-0.1, 0.1, size=proportion_ones.shape)
+    mutated_proportion_ones = proportion_ones + rng.uniform(-0.1, 0.1, size=proportion_ones.shape)
     mutated_proportion_ones = np.clip(mutated_proportion_ones, 0, 1)  # Ensure values are within [0, 1] range
 
     # Generate mutated offspring
     mutation_probs = mutation_rate * mutated_proportion_ones
-    mutated_mask = np.random.rand(*offspring.shape) < mutation_probs[:, np.newaxis]
+    mutated_mask = rng.random(offspring.shape) < mutation_probs[:, np.newaxis]
     mutated_offspring = np.where(mutated_mask, 1 - offspring, offspring)
 
     return mutated_offspring
 
 
-def shuffle_mutation(offspring, **kwargs):
+def shuffle_mutation(offspring, random_state=None, **kwargs):
     """
     Mutates the given offspring by shuffling the bits of each offspring.
 
@@ -155,6 +213,8 @@ def shuffle_mutation(offspring, **kwargs):
     ----------
     offspring: ndarray, shape (n, d)
         The offspring to be mutated. Each row represents an offspring, and each column represents a bit.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
     kwargs: dict
         Additional keyword arguments. Ignored.
 
@@ -163,6 +223,94 @@ def shuffle_mutation(offspring, **kwargs):
     offspring: ndarray, shape (n, d)
         The mutated offspring. Each row represents an offspring, and each column represents a bit.
     """
-    rng = np.random.default_rng()
+    rng = check_random_state(random_state)
     rng.shuffle(offspring, axis=1)
     return offspring
+
+
+def exchange_bits(offspring, n_keep, k, random_state=None):
+    """
+    Draw `k` random ones and `k` random zeros of each offspring.
+    Flipping them exchanges selected for unselected bits and keeps the number of ones.
+
+    Parameters
+    ----------
+    offspring: ndarray, shape (n, d)
+        The unpacked offspring. Each row must have exactly `n_keep` ones.
+    n_keep: int
+        The number of ones of each offspring.
+    k: int
+        The number of exchanged pairs per offspring. It is reduced to the number of ones or zeros if necessary.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
+
+    Returns
+    -------
+    bits: ndarray, shape (n, 2 * k)
+        The positions of the bits to flip.
+    """
+    rng = check_random_state(random_state)
+    n, d = offspring.shape
+    selected = offspring == 1
+    if not np.all(np.count_nonzero(selected, axis=1) == n_keep):
+        raise ValueError(f"Each offspring must select exactly n_keep={n_keep} bits.")
+    k = min(k, n_keep, d - n_keep)
+    if k == 0:
+        return np.empty((n, 0), dtype=np.int64)
+    # the positions of the ones and zeros of each row, in row-major order
+    ones = np.nonzero(selected)[1].reshape(n, n_keep)
+    zeros = np.nonzero(~selected)[1].reshape(n, d - n_keep)
+    removed = np.take_along_axis(ones, sample_without_replacement(n, n_keep, k, random_state=rng), axis=1)
+    added = np.take_along_axis(zeros, sample_without_replacement(n, d - n_keep, k, random_state=rng), axis=1)
+    return np.concatenate([removed, added], axis=1)
+
+
+def sample_without_replacement(n, d, k, random_state=None):
+    """
+    Draw `k` distinct integers from `range(d)` for each of `n` rows,
+    i.e., the batched version of ``np.random.choice(d, k, replace=False)``.
+
+    Parameters
+    ----------
+    n: int
+        Number of rows.
+    d: int
+        Number of integers to draw from.
+    k: int
+        Number of integers per row.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
+
+    Returns
+    -------
+    samples: ndarray, shape (n, k)
+        The drawn integers. Each row is a uniformly random subset of `range(d)`.
+    """
+    rng = check_random_state(random_state)
+    if k > d:
+        raise ValueError("Cannot take a larger sample than population when replace=False")
+    if k == 0:
+        return np.empty((n, 0), dtype=np.int64)
+    if k > d // 4:
+        # a random permutation per row is cheaper than rejecting many duplicates
+        return np.argpartition(rng.random((n, d)), k - 1, axis=1)[:, :k]
+
+    samples = np.empty((n, k), dtype=np.int64)
+    remaining = np.arange(n)
+    # draw a few more integers than needed, about k^2 / 2d of them are duplicates
+    m = k + 2 * (k * k // d) + 16
+    while remaining.size:
+        draws = rng.integers(d, size=(remaining.size, m))
+        # keep the first occurrence of each integer in the order of drawing
+        order = np.argsort(draws, axis=1, kind='stable')
+        sorted_draws = np.take_along_axis(draws, order, axis=1)
+        first = np.ones_like(draws, dtype=bool)
+        first[:, 1:] = sorted_draws[:, 1:] != sorted_draws[:, :-1]
+        distinct = np.empty_like(first)
+        np.put_along_axis(distinct, order, first, axis=1)
+        keep = distinct & (np.cumsum(distinct, axis=1) <= k)
+        complete = keep.sum(axis=1) == k
+        samples[remaining[complete]] = draws[complete][keep[complete]].reshape(-1, k)
+        # rows with too many duplicates are drawn again
+        remaining = remaining[~complete]
+    return samples
@@ -0,0 +1,71 @@
+"""
+Packed Populations
+==================
+
+Populations of binary vectors can be stored bit-packed, i.e., eight genes per byte,
+with :func:`fairdo.utils.helper.pack_bits`. This cuts the memory of a population by a factor of 8 compared to
+uint8 and by a factor of 64 compared to float64 populations.
+
+Selection methods only index rows of the population and work on packed populations as they are.
+Initialization, crossover and mutation methods that support packed populations have the keyword arguments
+`packed` and `d`, e.g., `uniform_crossover` and `fractional_flip_mutation`.
+`packed_operator` adapts any genetic operator to packed populations.
+Operators without native support unpack their input and pack their output.
+
+Example
+-------
+>>> from fairdo.optimize.geneticoperators import packed_operator, uniform_crossover, swap_mutation
+>>> crossover = packed_operator(uniform_crossover, d)  # native
+>>> mutation = packed_operator(swap_mutation, d)  # unpacks the offspring
+"""
+import inspect
+from functools import partial
+
+from fairdo.utils.helper import pack_bits, unpack_bits
+
+
+def packed_operator(operator, d):
+    """
+    Adapt a genetic operator to bit-packed populations.
+
+    Parameters
+    ----------
+    operator: callable
+        Initialization, crossover or mutation method. It is called with keyword arguments only.
+    d: int
+        The number of genes of an individual.
+
+    Returns
+    -------
+    callable
+        The operator on packed populations.
+    """
+    if supports_packed(operator):
+        return partial(operator, packed=True, d=d)
+
+    def unpacked_operator(**kwargs):
+        for name in ['parents', 'offspring']:
+            if name in kwargs:
+                kwargs[name] = unpack_bits(kwargs[name], d)
+        return pack_bits(operator(**kwargs))
+
+    return unpacked_operator
+
+
+def supports_packed(operator):
+    """
+    Check whether a genetic operator works on packed populations, i.e., whether it has the keyword argument `packed`.
+
+    Parameters
+    ----------
+    operator: callable
+        The genetic operator.
+
+    Returns
+    -------
+    bool
+    """
+    try:
+        return 'packed' in inspect.signature(operator).parameters
+    except (TypeError, ValueError):
+        return False
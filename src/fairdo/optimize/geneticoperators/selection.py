@@ -22,6 +22,8 @@ reproductive trials is best. Proceedings of the Third International Conference o
 
 import numpy as np
 
+from fairdo.utils.helper import check_random_state
+
 
 def elitist_selection(population, fitness, num_parents=2):
     """
@@ -48,7 +50,7 @@ def elitist_selection(population, fitness, num_parents=2):
     return parents, parents_fitness
 
 
-def tournament_selection(population, fitness, num_parents=2, tournament_size=3):
+def tournament_selection(population, fitness, num_parents=2, tournament_size=3, random_state=None):
     """
     Select parents using Tournament Selection.
     This method randomly selects a few individuals and chooses the best out of them to become a parent.
@@ -64,6 +66,8 @@ def tournament_selection(population, fitness, num_parents=2, tournament_size=3):
         Number of parents to select.
     tournament_size: int
         Number of individuals participating in each tournament.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
@@ -72,15 +76,16 @@ def tournament_selection(population, fitness, num_parents=2, tournament_size=3):
     fitness: ndarray, shape (num_parents,)
         Fitness of the selected parents.
     """
+    rng = check_random_state(random_state)
     if population.shape[0] < tournament_size:
         raise ValueError("Tournament size cannot be larger than the population size.")
     if len(population.shape) != 2:
         population = population.reshape(-1, 1)
 
-    parents = np.empty((num_parents, population.shape[1]))
+    parents = np.empty((num_parents, population.shape[1]), dtype=population.dtype)
     parents_fitness = np.empty(num_parents)
     for i in range(num_parents):
-        tournament_indices = np.random.randint(len(population), size=tournament_size)
+        tournament_indices = rng.integers(len(population), size=tournament_size)
         tournament_fitnesses = fitness[tournament_indices]
         winner_index = tournament_indices[np.argmax(tournament_fitnesses)]
         parents[i, :] = population[winner_index, :]
@@ -88,7 +93,7 @@ def tournament_selection(population, fitness, num_parents=2, tournament_size=3):
     return parents, parents_fitness
 
 
-def roulette_wheel_selection(population, fitness, num_parents=2):
+def roulette_wheel_selection(population, fitness, num_parents=2, random_state=None):
     """
     Select parents using Roulette Wheel Selection. The probability of selecting an individual is proportional to its
     fitness. The higher the fitness, the higher the chance of being selected.
@@ -102,6 +107,8 @@ def roulette_wheel_selection(population, fitness, num_parents=2):
         Fitness of each individual.
     num_parents: int
         Number of parents to select.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
@@ -121,6 +128,7 @@ def roulette_wheel_selection(population, fitness, num_parents=2):
     Holland, J. H. (1975). Adaptation in natural and artificial systems: An introductory analysis with applications
     to biology, control, and artificial intelligence. The Michigan Press.
     """
+    rng = check_random_state(random_state)
     # Check if the fitness is non-negative
     if np.any(fitness < 0):
         # shift the fitness values to be non-negative
@@ -128,11 +136,11 @@ def roulette_wheel_selection(population, fitness, num_parents=2):
         fitness = fitness - 2*np.min(fitness)
     fitness_sum = np.sum(fitness)
     selection_probs = fitness / fitness_sum
-    parents_idx = np.random.choice(len(population), size=num_parents, p=selection_probs)
+    parents_idx = rng.choice(len(population), size=num_parents, p=selection_probs)
     return population[parents_idx], fitness[parents_idx]
 
 
-def stochastic_universal_sampling(population, fitness, num_parents=2):
+def stochastic_universal_sampling(population, fitness, num_parents=2, random_state=None):
     """
     This function selects parents from the population using the Stochastic Universal Sampling (SUS) method.
 
@@ -144,6 +152,8 @@ def stochastic_universal_sampling(population, fitness, num_parents=2):
         The fitness of each individual in the population.
     num_parents: int
         The number of parents to select.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
@@ -163,6 +173,7 @@ def stochastic_universal_sampling(population, fitness, num_parents=2):
     Baker, J. E. (1987). "Reducing Bias and Inefficiency in the Selection Algorithm".
     Proceedings of the Second International Conference on Genetic Algorithms and Their Application.
     """
+    rng = check_random_state(random_state)
     # Check if the population is a 2D array
     if len(population.shape) != 2:
         population = population.reshape(-1, 1)
@@ -179,10 +190,10 @@ def stochastic_universal_sampling(population, fitness, num_parents=2):
     distance = 1.0 / num_parents
 
     # Initialize the start of the pointers
-    start = np.random.uniform(distance)
+    start = rng.uniform(distance)
 
     # Initialize the parents
-    parents = np.empty((num_parents, population.shape[1]))
+    parents = np.empty((num_parents, population.shape[1]), dtype=population.dtype)
     parents_fitness = np.empty(num_parents)
     # Perform the SUS
     for i in range(num_parents):
@@ -198,7 +209,7 @@ def stochastic_universal_sampling(population, fitness, num_parents=2):
     return parents, parents_fitness
 
 
-def rank_selection(population, fitness, num_parents=2):
+def rank_selection(population, fitness, num_parents=2, random_state=None):
     """
     This function selects parents from the population based on their rank.
     The rank is determined by the fitness of the individual.
@@ -213,6 +224,8 @@ def rank_selection(population, fitness, num_parents=2):
         The fitness of each individual.
     num_parents: int
         The number of parents to select.
+    random_state: None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
 
     Returns
     -------
@@ -221,6 +234,7 @@ def rank_selection(population, fitness, num_parents=2):
     fitness: ndarray, shape (num_parents,)
         The fitness of the selected parents.
     """
+    rng = check_random_state(random_state)
     # Rank individuals based on fitness
     ranks = np.argsort(np.argsort(fitness))
 
@@ -229,7 +243,7 @@ def rank_selection(population, fitness, num_parents=2):
     selection_probabilities = ranks / total_ranks
 
     # Select parents based on selection probabilities
-    parent_indices = np.random.choice(len(population), size=num_parents, p=selection_probabilities)
+    parent_indices = rng.choice(len(population), size=num_parents, p=selection_probabilities)
 
     parents = population[parent_indices]
     fitness = fitness[parent_indices]
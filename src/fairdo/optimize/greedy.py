@@ -0,0 +1,163 @@
+"""
+Greedy Local Search
+===================
+
+This module implements a greedy local search for objectives that only depend on the group counts of the
+selected rows, e.g., the statistical parity measures evaluated by
+:class:`fairdo.preprocessing.objective.DatasetObjective`.
+
+All rows with the same label and protected attributes form a cell and contribute the same to the group counts.
+A move therefore only decides how many rows of which cell are removed or added, and its fitness follows from the
+counts of the current solution plus the contribution of the moved rows.
+Each step evaluates all moves at once from the counts, i.e., in O(n_cells * n_groups) independent of the number
+of rows, and applies the best one. The dataset is never filtered.
+Moves of 1, 2, 4, ... rows of a cell are considered, so even datasets with millions of rows need few steps.
+Within a cell, the rows are removed and added in a random order.
+
+Without a size constraint, the search removes or adds rows as long as the fitness improves.
+With a size constraint `n_keep`, it first moves towards `n_keep` rows with the best move of each step,
+and then exchanges rows of one cell for rows of another cell as long as the fitness improves.
+
+Example
+-------
+>>> from fairdo.optimize import greedy_method
+>>> from fairdo.preprocessing import HeuristicWrapper
+>>> preprocessor = HeuristicWrapper(heuristic=greedy_method, protected_attribute='race', label='y')
+>>> # keep exactly 80% of the rows
+>>> preprocessor = HeuristicWrapper(heuristic=greedy_method, protected_attribute='race', label='y', n_keep=0.8)
+"""
+import numpy as np
+
+from fairdo.optimize.budget import Budget
+from fairdo.utils.helper import check_random_state, select_cell_rows
+
+
+def greedy_method(f, d, n_keep=None, initial_solution=None, max_steps=None, tol=1e-9, random_state=None,
+                  max_time=None):
+    """
+    Greedy local search over the number of selected rows per cell of rows with the same label and
+    protected attributes.
+
+    Parameters
+    ----------
+    f: DatasetObjective
+        The objective to minimize. It must be evaluated from group counts, i.e., `f.incremental` is True.
+    d: int
+        The number of dimensions.
+    n_keep: int, optional
+        If given, the solution has exactly `n_keep` ones. Default is None, i.e., any number of ones.
+    initial_solution: ndarray, shape (d,), optional
+        The binary vector to start from. Default is None, i.e., all rows are selected.
+    max_steps: int, optional
+        The maximum number of moves. Default is None, i.e., until no move improves the fitness.
+    tol: float, optional
+        The minimum improvement of a move. Default is 1e-9.
+    random_state: None, int or np.random.Generator, optional
+        The random state that orders the rows of each cell, see :func:`fairdo.utils.helper.check_random_state`.
+        Default is None.
+    max_time: float, optional
+        The maximum run time in seconds. Default is None, i.e., no deadline.
+
+    Returns
+    -------
+    best_solution: ndarray, shape (d,)
+        The binary vector found by the search.
+    best_fitness: float
+        The fitness of the solution.
+    """
+    if not getattr(f, 'incremental', False):
+        raise ValueError("greedy_method requires an objective that is evaluated from group counts, "
+                         "e.g., a DatasetObjective of a statistical parity measure.")
+    if n_keep is not None and not 0 <= n_keep <= d:
+        raise ValueError(f"n_keep must be between 0 and d={d}, got {n_keep}.")
+    budget = Budget(max_time=max_time)
+    rng = check_random_state(random_state)
+    solution = np.ones(d, dtype=int) if initial_solution is None else (np.asarray(initial_solution) == 1).astype(int)
+
+    cell_counts, cells = f.cells()
+    n_cells = len(cell_counts)
+    sizes = np.bincount(cells, minlength=n_cells)
+    kept = np.bincount(cells[solution == 1], minlength=n_cells)
+    # the rows of each cell in random order, selected rows first
+    order = np.lexsort((rng.random(d), 1 - solution, cells))
+    steps = 2 ** np.arange(int(np.log2(max(sizes.max(initial=0), 1))) + 1)
+
+    counts = f.counts(solution[np.newaxis])[0]
+    fitness = f.evaluate_counts(counts[np.newaxis])[0]
+    step = 0
+    while (max_steps is None or step < max_steps) and not budget.exhausted():
+        remaining = None if n_keep is None else n_keep - kept.sum()
+        if remaining is None or remaining == 0:
+            if remaining is None:
+                out_cells, in_cells, moved = _single_moves(kept, sizes, steps)
+            else:
+                out_cells, in_cells, moved = _exchange_moves(kept, sizes, steps)
+            if moved.size == 0:
+                break
+            candidates = counts + _move_counts(cell_counts, out_cells, in_cells, moved)
+            candidate_fitness = np.asarray(f.evaluate_counts(candidates))
+            best = np.argmin(candidate_fitness)
+            if candidate_fitness[best] >= fitness - tol:
+                break
+        else:
+            # move towards n_keep rows, even if the fitness gets worse
+            out_cells, in_cells, moved = _single_moves(kept, sizes, steps, max_rows=abs(remaining),
+                                                       remove=bool(remaining < 0))
+            if moved.size == 0:
+                break
+            candidates = counts + _move_counts(cell_counts, out_cells, in_cells, moved)
+            candidate_fitness = np.asarray(f.evaluate_counts(candidates))
+            best = np.argmin(candidate_fitness)
+        if out_cells[best] >= 0:
+            kept[out_cells[best]] -= moved[best]
+        if in_cells[best] >= 0:
+            kept[in_cells[best]] += moved[best]
+        counts = candidates[best]
+        fitness = candidate_fitness[best]
+        step += 1
+
+    return select_cell_rows(cells, kept, order), fitness
+
+
+def _single_moves(kept, sizes, steps, max_rows=None, remove=None):
+    """
+    All moves that remove or add `steps` rows of a single cell.
+    A cell of -1 means that no rows are removed or added, respectively.
+    """
+    n_cells = len(kept)
+    cell = np.repeat(np.arange(n_cells), len(steps))
+    moved = np.tile(steps, n_cells)
+    if max_rows is not None:
+        valid = moved <= max_rows
+        cell, moved = cell[valid], moved[valid]
+    removals = kept[cell] >= moved
+    additions = sizes[cell] - kept[cell] >= moved
+    if remove is True:
+        additions[:] = False
+    elif remove is False:
+        removals[:] = False
+    none_out = -np.ones(np.count_nonzero(additions), dtype=int)
+    none_in = -np.ones(np.count_nonzero(removals), dtype=int)
+    out_cells = np.concatenate([cell[removals], none_out])
+    in_cells = np.concatenate([none_in, cell[additions]])
+    return out_cells, in_cells, np.concatenate([moved[removals], moved[additions]])
+
+
+def _exchange_moves(kept, sizes, steps):
+    """
+    All moves that remove `steps` rows of one cell and add as many rows of another cell.
+    """
+    n_cells = len(kept)
+    out_cells, in_cells, moved = [a.ravel() for a in np.meshgrid(np.arange(n_cells), np.arange(n_cells), steps,
+                                                                 indexing='ij')]
+    valid = (out_cells != in_cells) & (kept[out_cells] >= moved) & (sizes[in_cells] - kept[in_cells] >= moved)
+    return out_cells[valid], in_cells[valid], moved[valid]
+
+
+def _move_counts(cell_counts, out_cells, in_cells, moved):
+    """
+    Change of the group counts by each move.
+    """
+    delta = np.where(in_cells[:, np.newaxis] >= 0, cell_counts[in_cells], 0)
+    delta = delta - np.where(out_cells[:, np.newaxis] >= 0, cell_counts[out_cells], 0)
+    return moved[:, np.newaxis] * delta
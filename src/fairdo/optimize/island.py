@@ -0,0 +1,268 @@
+"""
+Island Model
+============
+
+This module implements an island model of the genetic algorithm, see :func:`fairdo.optimize.single.genetic_algorithm`.
+
+Several populations (islands) evolve independently in worker processes, each with the usual
+selection, crossover, and mutation operators. Every `migration_interval` generations the islands return to
+the main process, which exchanges their best individuals (migration) and sends them out again.
+The islands only synchronize once per migration instead of once per generation,
+so the model scales to many processes. Migration spreads good solutions while the islands keep their diversity.
+
+Example
+-------
+>>> from fairdo.optimize import island_genetic_algorithm
+>>> best_solution, fitness = island_genetic_algorithm(f, d, num_islands=8, pop_size=100, num_generations=500)
+
+References
+----------
+Whitley, D., Rana, S., & Heckendorn, R. B. (1999).
+The island model genetic algorithm: On separability, population size and convergence.
+Journal of Computing and Information Technology.
+"""
+import numpy as np
+import pathos.multiprocessing as mp
+
+from fairdo.optimize.budget import Budget
+from fairdo.optimize.geneticoperators.initialization import random_initialization
+from fairdo.optimize.geneticoperators.selection import elitist_selection
+from fairdo.optimize.geneticoperators.crossover import uniform_crossover
+from fairdo.optimize.geneticoperators.mutation import fractional_flip_mutation
+from fairdo.optimize.geneticoperators.packed import packed_operator
+from fairdo.optimize.single import evaluate_population, evaluate_population_single_cpu
+from fairdo.utils.helper import bind_random_state, check_random_state, is_batched, spawn_random_states, unpack_bits
+from fairdo.utils.parallel import EvaluationPool
+
+
+def island_genetic_algorithm(f, d,
+                             num_islands=None,
+                             pop_size=100,
+                             num_generations=500,
+                             migration_interval=10,
+                             num_migrants=2,
+                             initialization=random_initialization,
+                             selection=elitist_selection,
+                             crossover=uniform_crossover,
+                             mutation=fractional_flip_mutation,
+                             migration=None,
+                             maximize=False,
+                             tol=1e-6,
+                             patience=50,
+                             packed=False,
+                             random_state=None,
+                             backend='processes',
+                             max_time=None):
+    """
+    Perform a genetic algorithm with several populations (islands) that evolve in parallel and
+    exchange their best individuals every `migration_interval` generations.
+
+    Parameters
+    ----------
+    f: callable
+        The fitness function to minimize.
+    d: int
+        The number of dimensions.
+    num_islands: int, optional
+        The number of islands. Default is the number of CPUs.
+    pop_size: int
+        The size of the population of each island.
+    num_generations: int
+        The number of generations of each island.
+    migration_interval: int, optional
+        The number of generations between two migrations. Default is 10.
+    num_migrants: int, optional
+        The number of individuals that each island sends to another island per migration. Default is 2.
+    initialization: callable
+        The function to initialize the population.
+    selection: callable
+        The function to select the parents from the population.
+    crossover: callable
+        The function to perform the crossover operation.
+    mutation: callable
+        The function to perform the mutation operation.
+    migration: callable, optional
+        The function that exchanges individuals between the islands. Default is `ring_migration`.
+    maximize: bool, optional
+        Whether to maximize or minimize the fitness function.
+    tol: float, optional
+        The tolerance for early stopping. If the best solution of all islands is within tol of the previous best
+        solution, then the generations count towards `patience`.
+    patience: int, optional
+        The number of generations to wait before early stopping. It is checked at each migration.
+    packed: bool, optional
+        Whether to store the populations bit-packed, which needs 1 bit per gene.
+        The genetic operators are adapted with :func:`fairdo.optimize.geneticoperators.packed_operator`.
+        Default is False.
+    random_state: None, int or np.random.Generator, optional
+        The random state of the run, see :func:`fairdo.utils.helper.check_random_state`.
+        Each island gets an independent random stream spawned from it, so the result does not depend on the
+        number of worker processes. Default is None.
+    backend: str, optional
+        Either 'processes' or 'threads'. Default is 'processes'.
+        The islands evolve in a :class:`fairdo.utils.parallel.EvaluationPool` with one worker per island,
+        but at most one per CPU.
+    max_time: float, optional
+        The maximum run time in seconds. The deadline is checked at each migration.
+        Default is None, i.e., no deadline.
+
+    Returns
+    -------
+    best_solution : ndarray, shape (d,)
+        The best solution found by the algorithm.
+    best_fitness : float
+        The fitness of the best solution found by the algorithm.
+    """
+    budget = Budget(max_time=max_time)
+    # negate the fitness if we are minimizing
+    sign = 1 if maximize else -1
+    if num_islands is None:
+        num_islands = mp.cpu_count()
+    if migration is None:
+        migration = ring_migration
+    island_rngs = spawn_random_states(check_random_state(random_state), num_islands)
+    operators = (initialization, selection, crossover, mutation)
+
+    # the populations are initialized by the islands in the first epoch
+    islands = [(None, None, rng) for rng in island_rngs]
+    best_fitness = -np.inf
+    best_population = None
+    no_improvement_streak = 0
+    generation = 0
+    with EvaluationPool(f, processes=min(num_islands, mp.cpu_count()), backend=backend) as pool:
+        while generation < num_generations:
+            num_epoch_generations = min(migration_interval, num_generations - generation)
+            islands = pool.starmap(evolve_island,
+                                   [(population, fitness, rng, num_epoch_generations, pop_size, d, operators,
+                                     sign, packed) for population, fitness, rng in islands])
+            generation += num_epoch_generations
+
+            # save the best solution found so far
+            epoch_best_fitness, epoch_best_population = max(((fitness.max(), population[np.argmax(fitness)])
+                                                             for population, fitness, _ in islands),
+                                                            key=lambda best: best[0])
+            if epoch_best_fitness > best_fitness + tol:
+                no_improvement_streak = 0
+            else:
+                no_improvement_streak += num_epoch_generations
+            if epoch_best_fitness > best_fitness:
+                best_fitness = epoch_best_fitness
+                best_population = epoch_best_population.copy()
+
+            if no_improvement_streak >= patience:
+                print(f"Stopping after {generation} generations after stagnating for "
+                      f"{no_improvement_streak} generations.")
+                break
+            if budget.exhausted():
+                print(f"Stopping after {generation} generations after {budget.elapsed:.1f} seconds "
+                      f"because the budget is exhausted.")
+                break
+            if generation < num_generations:
+                islands = migration(islands, num_migrants)
+
+    if packed:
+        best_population = unpack_bits(best_population, d)
+    if not maximize:
+        # negate the fitness back to its original form
+        best_fitness = -best_fitness
+    return best_population, best_fitness
+
+
+def evolve_island(f, population, fitness, rng, num_generations, pop_size, d, operators, sign, packed=False):
+    """
+    Evolve the population of an island for a number of generations in the current process.
+
+    Parameters
+    ----------
+    f: callable
+        The fitness function.
+    population: ndarray, shape (pop_size, d) or None
+        The population of the island. If None, a population is initialized and evaluated first.
+    fitness: ndarray, shape (pop_size,) or None
+        The fitness values of the population, multiplied by `sign`.
+    rng: np.random.Generator
+        The random stream of the island.
+    num_generations: int
+        The number of generations.
+    pop_size: int
+        The size of the population.
+    d: int
+        The number of dimensions.
+    operators: tuple of callables
+        The initialization, selection, crossover, and mutation operators.
+    sign: int
+        1 to maximize and -1 to minimize the fitness function.
+    packed: bool, optional
+        Whether the population is bit-packed. Default is False.
+
+    Returns
+    -------
+    population: ndarray, shape (pop_size, d)
+        The evolved population.
+    fitness: ndarray, shape (pop_size,)
+        The fitness values of the evolved population, multiplied by `sign`.
+    rng: np.random.Generator
+        The random stream of the island, to continue it in the next call.
+    """
+    initialization, selection, crossover, mutation = (bind_random_state(operator, rng) for operator in operators)
+    if packed:
+        initialization = packed_operator(initialization, d)
+        crossover = packed_operator(crossover, d)
+        mutation = packed_operator(mutation, d)
+    # number of bits of packed individuals
+    bits = d if packed else None
+
+    if population is None:
+        population = initialization(pop_size=pop_size, d=d)
+        fitness = sign * _evaluate(f, population, d=bits)
+    for _ in range(num_generations):
+        parents, fitness = selection(population=population, fitness=fitness)
+        offspring = crossover(parents=parents, num_offspring=pop_size - parents.shape[0])
+        offspring = mutation(offspring=offspring)
+        offspring_fitness = sign * _evaluate(f, offspring, d=bits)
+        population = np.concatenate((parents, offspring))
+        fitness = np.concatenate((fitness, offspring_fitness))
+    return population, fitness, rng
+
+
+def ring_migration(islands, num_migrants):
+    """
+    Send the best individuals of each island to the next island, where they replace the worst individuals.
+
+    Parameters
+    ----------
+    islands: list of tuples
+        The population, the fitness values (larger is better), and the random stream of each island.
+    num_migrants: int
+        The number of individuals that each island sends.
+
+    Returns
+    -------
+    islands: list of tuples
+        The islands after the migration.
+    """
+    if len(islands) < 2 or num_migrants <= 0:
+        return islands
+    emigrants = []
+    for population, fitness, _ in islands:
+        best = np.argsort(fitness)[-num_migrants:]
+        emigrants.append((population[best], fitness[best]))
+
+    migrated = []
+    for i, (population, fitness, rng) in enumerate(islands):
+        immigrants, immigrant_fitness = emigrants[i - 1]
+        worst = np.argsort(fitness)[:len(immigrants)]
+        population, fitness = population.copy(), fitness.copy()
+        population[worst] = immigrants
+        fitness[worst] = immigrant_fitness
+        migrated.append((population, fitness, rng))
+    return migrated
+
+
+def _evaluate(f, population, d=None):
+    """
+    Evaluate a population in the current process.
+    """
+    if is_batched(f):
+        return evaluate_population(f, population, d=d)
+    return evaluate_population_single_cpu(f, population, d=d)
@@ -1,9 +1,18 @@
+from bisect import bisect_left, bisect_right
+from functools import partial
+
 import numpy as np
 
+from fairdo.optimize.archive import ParetoArchive
+from fairdo.optimize.budget import Budget
+from fairdo.optimize.cache import check_cache, evaluate_cached
 from fairdo.optimize.geneticoperators.initialization import random_initialization, variable_probability_initialization
 from fairdo.optimize.geneticoperators.selection import elitist_selection, tournament_selection
 from fairdo.optimize.geneticoperators.crossover import onepoint_crossover, uniform_crossover, simulated_binary_crossover
 from fairdo.optimize.geneticoperators.mutation import fractional_flip_mutation, shuffle_mutation
+from fairdo.optimize.geneticoperators.packed import packed_operator
+from fairdo.utils.helper import bind_random_state, check_random_state, is_batched, spawn_random_states, unpack_bits
+from fairdo.utils.parallel import EvaluationPool
 
 
 def nsga2(fitness_functions, d,
@@ -12,12 +21,24 @@ def nsga2(fitness_functions, d,
           initialization=variable_probability_initialization,
           crossover=uniform_crossover,
           mutation=shuffle_mutation,
-          return_all_fronts=False):
+          return_all_fronts=False,
+          n_jobs=1,
+          backend='processes',
+          packed=False,
+          random_state=None,
+          archive=False,
+          cache=None,
+          max_time=None,
+          max_evaluations=None,
+          hv_patience=None,
+          hv_tol=1e-6,
+          target_fitness=None):
     """
     Perform NSGA-II (Non-dominated Sorting Genetic Algorithm II) for multi-objective optimization.
 
     NSGA-II maintains a population of solutions and uses non-dominated sorting and crowding distance to select
-    the best solutions.
+    the best solutions. Parents are chosen by binary tournaments with the crowded-comparison operator,
+    see `crowded_tournament`.
 
     Fitness functions are minimized by default.
 
@@ -33,8 +54,6 @@ def nsga2(fitness_functions, d,
         The number of generations.
     initialization : callable, optional
         The function to initialize the population. Default is random_initialization.
-    selection : callable, optional
-        The function to perform selection. Default is tournament_selection.
     crossover : callable, optional
         The function to perform crossover. Default is simulated_binary_crossover.
     mutation : callable, optional
@@ -43,13 +62,51 @@ def nsga2(fitness_functions, d,
         Whether to return all fronts. Default is False.
         If False, only the first front is returned.
         If True, the `combined population` and `fitness values` are returned along with the `fronts`.
+    n_jobs : int, optional
+        Number of workers that evaluate the population. Default is 1, i.e., no workers.
+        -1 uses one worker per CPU.
+    backend : str, optional
+        Either 'processes' or 'threads'. Default is 'processes'.
+        The workers live as long as the run, see :class:`fairdo.utils.parallel.EvaluationPool`.
+    packed : bool, optional
+        Whether to store the population bit-packed, which needs 1 bit per gene.
+        The genetic operators are adapted with :func:`fairdo.optimize.geneticoperators.packed_operator`.
+        Default is False.
+    random_state : None, int or np.random.Generator, optional
+        The random state of the run, see :func:`fairdo.utils.helper.check_random_state`.
+        It is passed to all genetic operators that have the keyword argument `random_state`.
+        Default is None.
+    archive : bool or int, optional
+        Whether to keep all non-dominated solutions found during the run in a
+        :class:`fairdo.optimize.archive.ParetoArchive` and return them instead of the first front of
+        the last generation. Needs no extra fitness evaluations. Only used if return_all_fronts is False.
+        If int, the maximum size of the archive, which is truncated by crowding distance.
+        Default is False, i.e., the first front of the last generation is returned.
+    cache : None, int or FitnessCache, optional
+        Cache of the fitness values of already evaluated individuals, see :class:`fairdo.optimize.cache.FitnessCache`.
+        If int, a new cache with this maximum size is used. Default is None, i.e., no cache.
+    max_time : float, optional
+        The maximum run time in seconds. The deadline is checked before each generation.
+        Default is None, i.e., no deadline.
+    max_evaluations : int, optional
+        The maximum number of evaluated individuals. The run stops before a generation that would exceed it.
+        Default is None, i.e., no limit.
+    hv_patience : int, optional
+        The number of generations without an improvement of the hypervolume of the first front after which
+        the run stops. The reference point is the worst fitness value of each objective in the initial population,
+        see `hypervolume`. Default is None, i.e., no early stopping.
+    hv_tol : float, optional
+        The minimum increase of the hypervolume that counts as improvement. Default is 1e-6.
+    target_fitness : array-like, shape (num_fitness_functions,), optional
+        The run stops as soon as an individual of the population has a fitness value of at most `target_fitness`
+        in every objective. Default is None, i.e., no target.
 
     Returns
     -------
-    population : ndarray, shape (pop_size, d)
-        The best solution found by NSGA-II.
-    fitness_values : ndarray, shape (pop_size, num_fitness_functions)
-        The fitness values of the best solution found by NSGA-II.
+    population : ndarray, shape (n, d)
+        The best solutions found by NSGA-II.
+    fitness_values : ndarray, shape (n, num_fitness_functions)
+        The fitness values of the best solutions found by NSGA-II.
     (fronts : list of ndarrays
         List of fronts, where each front contains the indices of individuals in that front.
         Only returned if return_all_fronts is True.)
@@ -62,46 +119,142 @@ def nsga2(fitness_functions, d,
     ----------
     Deb, K., Pratap, A., Agarwal, S., & Meyarivan, T. (2002). A fast and elitist multiobjective genetic algorithm: NSGA-II.
     """
-    rng = np.random.default_rng()
-
-    # Generate the initial population
-    population = initialization(pop_size=pop_size, d=d)
-    
-    # Evaluate the fitness of each individual in the population
-    fitness_values = evaluate_population(fitness_functions=fitness_functions,
-                                         population=population)
-
-    # Perform NSGA-II for the specified number of generations
-    for _ in range(num_generations):
-        # Select parents
-        parents = rng.choice(population, size=2, replace=False, axis=0)
-        # Perform crossover
-        offspring = crossover(parents=parents, num_offspring=pop_size)
-        # Perform mutation
-        offspring = mutation(offspring=offspring)
-        # Evaluate the fitness of the offspring
-        offspring_fitness_values = evaluate_population(fitness_functions, offspring)
-        
-        # Combine the parents and the offspring
-        combined_population = np.concatenate((population, offspring))
-        combined_fitness_values = np.concatenate((fitness_values, offspring_fitness_values))
-        
-        # Select the best individuals using non-dominated sorting and crowding distance
+    budget = Budget(max_time=max_time, max_evaluations=max_evaluations)
+    if target_fitness is not None:
+        target_fitness = np.asarray(target_fitness, dtype=float)
+    rng = check_random_state(random_state)
+    # the workers get their own random stream, so the operators draw the same numbers with or without a pool
+    pool_rng, = spawn_random_states(rng, 1)
+    initialization = bind_random_state(initialization, rng)
+    crossover = bind_random_state(crossover, rng)
+    mutation = bind_random_state(mutation, rng)
+    if packed:
+        initialization = packed_operator(initialization, d)
+        crossover = packed_operator(crossover, d)
+        mutation = packed_operator(mutation, d)
+    # number of bits of packed individuals
+    bits = d if packed else None
+    cache = check_cache(cache)
+
+    pool = open_pool(fitness_functions, n_jobs, backend, random_state=pool_rng)
+    evaluate = partial(evaluate_population, fitness_functions, pool=pool, d=bits)
+    pareto_archive = None
+    if archive and not return_all_fronts:
+        pareto_archive = ParetoArchive(max_size=None if archive is True else archive, d=bits)
+    try:
+        # Generate the initial population
+        population = initialization(pop_size=pop_size, d=d)
+
+        # Evaluate the fitness of each individual in the population
+        fitness_values = evaluate_cached(cache, evaluate, population, d=bits)
+        budget.spend(pop_size)
+        if pareto_archive is not None:
+            pareto_archive.update(population, fitness_values)
+        combined_population, combined_fitness_values, fronts = population, fitness_values, None
+        ranks, crowding_distances = crowded_ranks(fitness_values, non_dominated_sort_fast(fitness_values))
+        if hv_patience is not None:
+            reference_point = fitness_values.max(axis=0)
+            best_hypervolume = hypervolume(fitness_values, reference_point)
+            no_improvement_streak = 0
+
+        # Perform NSGA-II for the specified number of generations
+        for generation in range(num_generations):
+            if target_fitness is not None and np.any(np.all(fitness_values <= target_fitness, axis=1)):
+                print(f"Stopping after {generation} generations after reaching the target fitness.")
+                break
+            if budget.exhausted(pop_size):
+                print(f"Stopping after {generation} generations after {budget.evaluations} evaluations "
+                      f"and {budget.elapsed:.1f} seconds because the budget is exhausted.")
+                break
+            # Select parents by crowded binary tournaments
+            parents = population[crowded_tournament(ranks, crowding_distances, random_state=rng)]
+            # Perform crossover
+            offspring = crossover(parents=parents, num_offspring=pop_size)
+            # Perform mutation
+            offspring = mutation(offspring=offspring)
+            # Evaluate the fitness of the offspring
+            offspring_fitness_values = evaluate_cached(cache, evaluate, offspring, d=bits)
+            budget.spend(pop_size)
+            if pareto_archive is not None:
+                pareto_archive.update(offspring, offspring_fitness_values)
+
+            # Combine the parents and the offspring
+            combined_population = np.concatenate((population, offspring))
+            combined_fitness_values = np.concatenate((fitness_values, offspring_fitness_values))
+
+            # Select the best individuals using non-dominated sorting and crowding distance
+            fronts = non_dominated_sort_fast(combined_fitness_values)
+            combined_ranks, combined_crowding_distances = crowded_ranks(combined_fitness_values, fronts)
+            # Fit the first fronts to the population size. The front that doesnt fit will be selected based on crowding distance
+            selected_indices = selection_indices(combined_fitness_values, fronts, pop_size,
+                                                 crowding_distances=combined_crowding_distances)
+
+            # Update the population and fitness values
+            population = combined_population[selected_indices]
+            fitness_values = combined_fitness_values[selected_indices]
+            ranks = combined_ranks[selected_indices]
+            crowding_distances = combined_crowding_distances[selected_indices]
+
+            if hv_patience is not None:
+                current_hypervolume = hypervolume(combined_fitness_values[fronts[0]], reference_point)
+                if current_hypervolume > best_hypervolume + hv_tol:
+                    best_hypervolume = current_hypervolume
+                    no_improvement_streak = 0
+                else:
+                    no_improvement_streak += 1
+                    if no_improvement_streak >= hv_patience:
+                        print(f"Stopping after {generation + 1} generations after the hypervolume stagnated for "
+                              f"{no_improvement_streak} generations.")
+                        break
+    finally:
+        if pool is not None:
+            pool.close()
+
+    if pareto_archive is not None:
+        return pareto_archive.solutions, pareto_archive.fitness_values
+    if fronts is None:
+        # stopped before the first generation
         fronts = non_dominated_sort_fast(combined_fitness_values)
-        # Fit the first fronts to the population size. The front that doesnt fit will be selected based on crowding distance
-        selected_indices = selection_indices(combined_fitness_values, fronts, pop_size)
-
-        # Update the population and fitness values
-        population = combined_population[selected_indices]
-        fitness_values = combined_fitness_values[selected_indices]
-    
+    if packed:
+        combined_population = unpack_bits(combined_population, d)
     if return_all_fronts is False:
         return combined_population[fronts[0]], combined_fitness_values[fronts[0]]
     else:
         return combined_population, combined_fitness_values, fronts
 
 
-def evaluate_population(fitness_functions, population):
+def open_pool(fitness_functions, n_jobs=1, backend='processes', random_state=None):
+    """
+    Open workers that evaluate all fitness functions of a population.
+
+    Parameters
+    ----------
+    fitness_functions : list of callables
+        The list of fitness functions to evaluate.
+    n_jobs : int, optional
+        Number of workers. -1 uses one worker per CPU. Default is 1, i.e., no workers.
+    backend : str, optional
+        Either 'processes' or 'threads'. Default is 'processes'.
+    random_state : None, int or np.random.Generator, optional
+        The random state from which the random streams of the workers are spawned.
+
+    Returns
+    -------
+    pool : EvaluationPool or None
+        The workers, which must be closed by the caller, or None if `n_jobs` is 1 or all fitness functions are
+        batched, see :func:`fairdo.utils.helper.is_batched`.
+    """
+    if n_jobs == 1:
+        return None
+    if is_batched(fitness_functions) or all(is_batched(fitness_function) for fitness_function in fitness_functions):
+        return None
+    if not hasattr(fitness_functions, 'evaluate_population'):
+        fitness_functions = partial(_evaluate_individual, list(fitness_functions))
+    return EvaluationPool(fitness_functions, processes=None if n_jobs == -1 else n_jobs, backend=backend,
+                          random_state=random_state)
+
+
+def evaluate_population(fitness_functions, population, pool=None, d=None):
     """
     Evaluate the fitness of each individual in the population using the given fitness functions.
 
@@ -109,23 +262,51 @@ def evaluate_population(fitness_functions, population):
     ----------
     fitness_functions : list of callables
         The list of fitness functions to evaluate.
+        If it has a method ``evaluate_population``, e.g., :class:`fairdo.preprocessing.MultiDatasetObjective`,
+        all fitness functions are evaluated on the whole population at once.
     population : ndarray, shape (pop_size, d)
         The population of binary vectors.
+    pool : EvaluationPool, optional
+        Workers that evaluate the population, see `open_pool`.
+    d : int, optional
+        The number of bits if the individuals are bit-packed. Default is None, i.e., not packed.
 
     Returns
     -------
     fitness_values : ndarray, shape (pop_size, num_fitness_functions)
         The fitness values of each individual in the population for each fitness function.
     """
+    packed = d is not None
+    if pool is not None:
+        return pool.map(population, d=d).reshape(population.shape[0], -1)
+    if hasattr(fitness_functions, 'evaluate_population'):
+        if packed:
+            return np.asarray(fitness_functions.evaluate_population(population, packed=True), dtype=float)
+        return np.asarray(fitness_functions.evaluate_population(population), dtype=float)
+
     num_fitness_functions = len(fitness_functions)
     fitness_values = np.zeros((population.shape[0], num_fitness_functions))
     for i, fitness_function in enumerate(fitness_functions):
-        # TODO: Parallelize this loop
-        fitness_values[:, i] = np.apply_along_axis(fitness_function, axis=1, arr=population).flatten()
-    
+        if is_batched(fitness_function):
+            if packed:
+                fitness_values[:, i] = fitness_function.evaluate_population(population, packed=True)
+            else:
+                fitness_values[:, i] = fitness_function.evaluate_population(population)
+        elif packed:
+            fitness_values[:, i] = [fitness_function(unpack_bits(individual, d)) for individual in population]
+        else:
+            fitness_values[:, i] = np.apply_along_axis(fitness_function, axis=1, arr=population).flatten()
+
     return fitness_values
 
 
+def _evaluate_individual(fitness_functions, individual):
+    """
+    Evaluate all fitness functions on a single individual.
+    """
+    return [fitness_function(individual) for fitness_function in fitness_functions]
+
+
 def non_dominated_sort(fitness_values):
     """
     Perform non-dominated sorting on the given fitness values.
@@ -163,7 +344,11 @@ def non_dominated_sort(fitness_values):
 def non_dominated_sort_fast(fitness_values):
     """
     Perform non-dominated sorting on the given fitness values.
-    Faster implementation using broadcasting.
+    Faster implementation that sorts the individuals instead of comparing all pairs of individuals.
+
+    Two and three objectives are sorted with a sweep in O(N log N) and O(N log^2 N),
+    see `non_dominated_sort_2d` and `non_dominated_sort_3d`.
+    More objectives are sorted with the efficient non-dominated sort, see `non_dominated_sort_efficient`.
 
     Parameters
     ----------
@@ -174,32 +359,178 @@ def non_dominated_sort_fast(fitness_values):
     -------
     fronts : list of ndarrays
         List of fronts, where each front contains the indices of individuals in that front.
+    """
+    fitness_values = np.asarray(fitness_values, dtype=float)
+    if fitness_values.shape[1] == 2:
+        return non_dominated_sort_2d(fitness_values)
+    if fitness_values.shape[1] == 3:
+        return non_dominated_sort_3d(fitness_values)
+    return non_dominated_sort_efficient(fitness_values)
 
-    Notes
-    -----
-    This function uses broadcasting to compare all pairs of individuals in the population.
-    The result is a significant speedup compared to the non-broadcasting implementation.
+
+def non_dominated_sort_2d(fitness_values):
     """
-    dominating_counts, dominated_indices = dom_counts_indices_fast(fitness_values)
+    Perform non-dominated sorting on the fitness values of two objectives in O(N log N).
 
-    fronts = []
-    # Find the first front
-    current_front = np.where(dominating_counts == 0)[0]
+    The individuals are sorted by the first objective and swept in that order.
+    The best value of the second objective in each front increases from front to front,
+    so the front of an individual is found by a binary search over these values.
 
-    while current_front.size > 0:
-        fronts.append(current_front)
-        # Next front is the set of all indices dominated by the current front
-        next_front = np.concatenate([dominated_indices[i] for i in current_front])
-        # Count the number of dominating solutions for each solution
-        unique_next_front, counts = np.unique(next_front, return_counts=True)
-        # Decrement the dominating counts
-        dominating_counts[unique_next_front] -= counts
-        # Next front is the set of all solutions with no dominating solutions
-        current_front = np.where(dominating_counts[unique_next_front] == 0)[0]
+    Parameters
+    ----------
+    fitness_values : ndarray, shape (pop_size, 2)
+        The fitness values of each individual in the population for both fitness functions.
 
-    return fronts
+    Returns
+    -------
+    fronts : list of ndarrays
+        List of fronts, where each front contains the indices of individuals in that front.
+    """
+    # lexicographic order, individuals that dominate others come first
+    order = np.lexsort((fitness_values[:, 1], fitness_values[:, 0]))
+    sorted_values = fitness_values[order]
+    duplicate = np.zeros(len(order), dtype=bool)
+    duplicate[1:] = np.all(sorted_values[1:] == sorted_values[:-1], axis=1)
+
+    ranks = np.empty(len(order), dtype=int)
+    # best value of the second objective in each front
+    front_min = []
+    for i, (f2, is_duplicate) in enumerate(zip(sorted_values[:, 1].tolist(), duplicate.tolist())):
+        if is_duplicate:
+            # equal fitness values do not dominate each other
+            ranks[i] = ranks[i - 1]
+            continue
+        rank = bisect_right(front_min, f2)
+        if rank == len(front_min):
+            front_min.append(f2)
+        else:
+            front_min[rank] = f2
+        ranks[i] = rank
+    return _ranks_to_fronts(order, ranks)
 
 
+def non_dominated_sort_3d(fitness_values):
+    """
+    Perform non-dominated sorting on the fitness values of three objectives in O(N log^2 N).
+
+    The individuals are sorted by the first objective and swept in that order.
+    Each front keeps the staircase of its members that are non-dominated in the second and third objective,
+    which answers whether a front dominates an individual with one binary search.
+    As in `non_dominated_sort_efficient`, the front of an individual is found by a binary search over the fronts.
+
+    Parameters
+    ----------
+    fitness_values : ndarray, shape (pop_size, 3)
+        The fitness values of each individual in the population for the three fitness functions.
+
+    Returns
+    -------
+    fronts : list of ndarrays
+        List of fronts, where each front contains the indices of individuals in that front.
+    """
+    order = np.lexsort(fitness_values.T[::-1])
+    sorted_values = fitness_values[order]
+    duplicate = np.zeros(len(order), dtype=bool)
+    duplicate[1:] = np.all(sorted_values[1:] == sorted_values[:-1], axis=1)
+
+    ranks = np.empty(len(order), dtype=int)
+    # staircase of each front: second objective ascending and negated third objective ascending
+    stairs_f2, stairs_f3 = [], []
+    for i, (f2, f3, is_duplicate) in enumerate(zip(sorted_values[:, 1].tolist(), (-sorted_values[:, 2]).tolist(),
+                                                   duplicate.tolist())):
+        if is_duplicate:
+            ranks[i] = ranks[i - 1]
+            continue
+        low, high = 0, len(stairs_f2)
+        while low < high:
+            middle = (low + high) // 2
+            # the step with the largest second objective not greater than f2 has the smallest third objective
+            step = bisect_right(stairs_f2[middle], f2) - 1
+            if step >= 0 and stairs_f3[middle][step] >= f3:
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(stairs_f2):
+            stairs_f2.append([f2])
+            stairs_f3.append([f3])
+        else:
+            # remove the steps that the individual dominates in the second and third objective
+            start = bisect_left(stairs_f2[low], f2)
+            stop = bisect_right(stairs_f3[low], f3, lo=start)
+            stairs_f2[low][start:stop] = [f2]
+            stairs_f3[low][start:stop] = [f3]
+        ranks[i] = low
+    return _ranks_to_fronts(order, ranks)
+
+
+def non_dominated_sort_efficient(fitness_values):
+    """
+    Perform non-dominated sorting with the efficient non-dominated sort (ENS-BS) by Zhang et al.
+
+    The individuals are processed in lexicographic order, so that an individual
+    is only dominated by individuals that already have a front.
+    If an individual is dominated by an individual of a front, it is also dominated by an individual of every
+    previous front, so the front of the individual is found by a binary search over the fronts.
+    Each step of the search compares the individual with all individuals of a front at once.
+
+    Parameters
+    ----------
+    fitness_values : ndarray, shape (pop_size, num_fitness_functions)
+        The fitness values of each individual in the population for each fitness function.
+
+    Returns
+    -------
+    fronts : list of ndarrays
+        List of fronts, where each front contains the indices of individuals in that front.
+
+    Notes
+    -----
+    The worst case is O(M N^2) comparisons for M objectives,
+    but the number of comparisons is far smaller for populations with several fronts.
+    """
+    order = np.lexsort(fitness_values.T[::-1])
+    sorted_values = fitness_values[order]
+    duplicate = np.zeros(len(order), dtype=bool)
+    duplicate[1:] = np.all(sorted_values[1:] == sorted_values[:-1], axis=1)
+
+    ranks = np.empty(len(order), dtype=int)
+    # fitness values of the members of each front and the number of members
+    fronts, sizes = [], []
+    for i, values in enumerate(sorted_values):
+        if duplicate[i]:
+            ranks[i] = ranks[i - 1]
+            continue
+        low, high = 0, len(fronts)
+        while low < high:
+            middle = (low + high) // 2
+            # earlier individuals with different fitness values dominate if they are not worse in any objective
+            if np.any(np.all(fronts[middle][:sizes[middle]] <= values, axis=1)):
+                low = middle + 1
+            else:
+                high = middle
+        if low == len(fronts):
+            fronts.append(np.empty((16, fitness_values.shape[1])))
+            sizes.append(0)
+        elif sizes[low] == len(fronts[low]):
+            fronts[low] = np.concatenate((fronts[low], np.empty_like(fronts[low])))
+        fronts[low][sizes[low]] = values
+        sizes[low] += 1
+        ranks[i] = low
+    return _ranks_to_fronts(order, ranks)
+
+
+def _ranks_to_fronts(order, ranks):
+    """
+    Convert the front ranks of the sorted individuals into a list of fronts with ascending indices.
+    """
+    if len(ranks) == 0:
+        return []
+    individual_ranks = np.empty_like(ranks)
+    individual_ranks[order] = ranks
+    indices = np.argsort(individual_ranks, kind='stable')
+    boundaries = np.flatnonzero(np.diff(individual_ranks[indices])) + 1
+    return np.split(indices, boundaries)
+
 
 def dom_counts_indices(fitness_values):
     """
@@ -269,7 +600,7 @@ def dom_counts_indices_fast(fitness_values):
     return dominating_counts, dominated_indices
 
 
-def selection_indices(combined_fitness_values, fronts, pop_size):
+def selection_indices(combined_fitness_values, fronts, pop_size, crowding_distances=None):
     """
     Select the best individuals from the combined population based on the non-dominated sorting results and crowding distance to maintain diversity.
 
@@ -281,6 +612,9 @@ def selection_indices(combined_fitness_values, fronts, pop_size):
         List of fronts, where each front contains the indices of individuals in that front.
     pop_size : int
         The size of the population.
+    crowding_distances : ndarray, shape (N,), optional
+        Crowding distances of the combined population within the fronts, see `crowding_distance_fronts`.
+        Default is None, i.e., they are calculated for the front that does not fit.
 
     Returns
     -------
@@ -300,9 +634,12 @@ def selection_indices(combined_fitness_values, fronts, pop_size):
             remaining_space -= len(current_front)
         else:
             # If the current front cannot fit entirely, select individuals based on crowding distance
-            crowding_distances = crowding_distance(combined_fitness_values[current_front])
+            if crowding_distances is None:
+                front_distances = crowding_distance(combined_fitness_values[current_front])
+            else:
+                front_distances = crowding_distances[current_front]
             # Select individuals with larger crowding distances first
-            indices = np.argpartition(crowding_distances, -remaining_space)[-remaining_space:]
+            indices = np.argpartition(front_distances, -remaining_space)[-remaining_space:]
             selected_indices.extend(current_front[indices])
             remaining_space = 0
         front_idx += 1
@@ -310,6 +647,104 @@ def selection_indices(combined_fitness_values, fronts, pop_size):
     return selected_indices
 
 
+def crowded_ranks(fitness_values, fronts):
+    """
+    Calculate the front index and the crowding distance of each individual.
+
+    Parameters
+    ----------
+    fitness_values : ndarray, shape (N, num_fitness_functions)
+        Fitness values of the population.
+    fronts : list of ndarrays
+        List of fronts, where each front contains the indices of individuals in that front.
+
+    Returns
+    -------
+    ranks : ndarray, shape (N,)
+        Index of the front of each individual. 0 is the first front.
+    crowding_distances : ndarray, shape (N,)
+        Crowding distance of each individual within its front, see `crowding_distance_fronts`.
+    """
+    ranks = np.zeros(len(fitness_values), dtype=int)
+    for rank, front in enumerate(fronts):
+        ranks[front] = rank
+    return ranks, crowding_distance_fronts(fitness_values, fronts)
+
+
+def crowded_tournament(ranks, crowding_distances, num_parents=2, random_state=None):
+    """
+    Select parents by binary tournaments with the crowded-comparison operator of NSGA-II.
+
+    Of two random individuals, the one in the better front wins. Within the same front,
+    the one with the larger crowding distance wins.
+
+    Parameters
+    ----------
+    ranks : ndarray, shape (N,)
+        Index of the front of each individual.
+    crowding_distances : ndarray, shape (N,)
+        Crowding distance of each individual within its front.
+    num_parents : int, optional
+        The number of parents. Default is 2.
+    random_state : None, int or np.random.Generator, optional
+        The random state, see :func:`fairdo.utils.helper.check_random_state`. Default is None.
+
+    Returns
+    -------
+    ndarray, shape (num_parents,)
+        The indices of the selected parents. They are distinct if N >= 2 * num_parents.
+    """
+    rng = check_random_state(random_state)
+    pop_size = len(ranks)
+    if pop_size < 2 * num_parents:
+        return rng.choice(pop_size, size=num_parents, replace=pop_size < num_parents)
+    contestants = rng.choice(pop_size, size=(num_parents, 2), replace=False)
+    first, second = contestants[:, 0], contestants[:, 1]
+    first_wins = ((ranks[first] < ranks[second])
+                  | ((ranks[first] == ranks[second]) & (crowding_distances[first] >= crowding_distances[second])))
+    return np.where(first_wins, first, second)
+
+
+def hypervolume(fitness_values, reference_point):
+    """
+    Calculate the hypervolume that the given fitness values dominate up to a reference point.
+
+    Only fitness values that are better than the reference point in every objective contribute.
+    Two objectives are calculated in O(N log N) by a sweep, more objectives by slicing along the last objective.
+
+    Parameters
+    ----------
+    fitness_values : ndarray, shape (N, num_fitness_functions)
+        Fitness values of the population, e.g., of the first front.
+    reference_point : ndarray, shape (num_fitness_functions,)
+        The reference point, e.g., the worst fitness value of each objective.
+
+    Returns
+    -------
+    float
+        The hypervolume.
+    """
+    fitness_values = np.asarray(fitness_values, dtype=float)
+    reference_point = np.asarray(reference_point, dtype=float)
+    points = fitness_values[np.all(fitness_values < reference_point, axis=1)]
+    if len(points) == 0:
+        return 0.0
+    if points.shape[1] == 1:
+        return float(reference_point[0] - points[:, 0].min())
+    if points.shape[1] == 2:
+        order = np.argsort(points[:, 0], kind='stable')
+        f1 = points[order, 0]
+        # best second objective of all points up to the current first objective
+        f2 = np.minimum.accumulate(points[order, 1])
+        widths = np.diff(np.append(f1, reference_point[0]))
+        return float(np.sum(widths * (reference_point[1] - f2)))
+    # slices between consecutive values of the last objective
+    points = points[np.argsort(points[:, -1], kind='stable')]
+    heights = np.diff(np.append(points[:, -1], reference_point[-1]))
+    return float(sum(height * hypervolume(points[:i + 1, :-1], reference_point[:-1])
+                     for i, height in enumerate(heights) if height > 0))
+
+
 def crowding_distance(fitness_values):
     """
     Calculate crowding distance for each individual in the population.
@@ -324,23 +759,56 @@ def crowding_distance(fitness_values):
     crowding_distances : ndarray, shape (N,)
         Crowding distances for each individual.
     """
-    pop_size, num_objectives = fitness_values.shape
-    crowding_distances = np.zeros(pop_size)
+    return crowding_distance_fronts(fitness_values, [np.arange(len(fitness_values))])
 
-    for obj_index in range(num_objectives):
-        # Sort the fitness values based on the current objective in ascending order. Best values first.
-        sorted_indices = np.argsort(fitness_values[:, obj_index])
-        crowding_distances[sorted_indices[0]] = np.inf
-        crowding_distances[sorted_indices[-1]] = np.inf
 
-        f_max = fitness_values[sorted_indices[-1], obj_index]
-        f_min = fitness_values[sorted_indices[0], obj_index]
+def crowding_distance_fronts(fitness_values, fronts):
+    """
+    Calculate the crowding distance of each individual within its front, for all fronts at once.
 
-        if f_max == f_min:
-            continue
+    Parameters
+    ----------
+    fitness_values : ndarray, shape (N, num_fitness_functions)
+        Fitness values of the population.
+    fronts : list of ndarrays
+        List of fronts, where each front contains the indices of individuals in that front.
 
-        # Crowding distance is the sum of the distances to the previous and next individuals. It geometrically describes the sum of the lengths of a cuboid.
-        for i in range(1, pop_size - 1):
-            crowding_distances[sorted_indices[i]] += (fitness_values[sorted_indices[i + 1], obj_index]
-                                                      - fitness_values[sorted_indices[i - 1], obj_index])/ (f_max - f_min)
+    Returns
+    -------
+    crowding_distances : ndarray, shape (N,)
+        Crowding distances for each individual. Individuals that are not in any front have distance 0.
+    """
+    fitness_values = np.asarray(fitness_values, dtype=float)
+    crowding_distances = np.zeros(len(fitness_values))
+    if len(fronts) == 0:
+        return crowding_distances
+    indices = np.concatenate(fronts).astype(int)
+    labels = np.repeat(np.arange(len(fronts)), [len(front) for front in fronts])
+    values = fitness_values[indices]
+    distances = np.zeros(len(indices))
+
+    for obj_index in range(values.shape[1]):
+        # Sort by front and, within each front, by the current objective in ascending order. Best values first.
+        order = np.lexsort((values[:, obj_index], labels))
+        sorted_values = values[order, obj_index]
+        sorted_labels = labels[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sorted_labels[1:] != sorted_labels[:-1]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = first[1:]
+
+        # Range of the objective within the front of each individual
+        starts = np.flatnonzero(first)
+        sizes = np.diff(np.append(starts, len(order)))
+        f_range = np.repeat(sorted_values[last] - sorted_values[first], sizes)
+
+        # Crowding distance is the sum of the distances to the previous and next individuals.
+        # It geometrically describes the sum of the lengths of a cuboid.
+        gaps = np.zeros(len(order))
+        interior = np.flatnonzero(~first & ~last & (f_range > 0))
+        gaps[interior] = (sorted_values[interior + 1] - sorted_values[interior - 1]) / f_range[interior]
+        gaps[first | last] = np.inf
+        distances[order] += gaps
+
+    crowding_distances[indices] = distances
     return crowding_distances
@@ -0,0 +1,133 @@
+"""
+Parity Heuristic
+================
+
+This module searches subsets with statistical parity directly on the counts of the
+cells of rows with the same label and protected attributes, i.e., independent of the number of rows.
+
+Statistical parity measures, e.g., `statistical_parity_abs_diff_max`, only depend on how many positive and
+negative rows of each group are selected, and they are zero iff all groups have the same rate of positive labels.
+If every subgroup, i.e., every combination of the protected attributes, keeps positive and negative rows in the
+ratio `a : (b - a)`, all groups of all protected attributes have the positive rate `a / b`.
+For a fixed rate, the largest such subset keeps `t_g = min(P_g // a, N_g // (b - a))` multiples of `(a, b - a)`
+rows of subgroup `g` with `P_g` positive and `N_g` negative rows.
+`parity_method` evaluates all rates `a / b` up to a maximum denominator at once from the cell counts,
+and keeps the best of these candidate subsets. Ties are broken in favor of larger subsets.
+The concrete rows of each cell are sampled at random.
+
+`parity_method` is a heuristic, not an optimal solver. It only considers the subsets above, so it may miss
+better or larger subsets:
+
+- rates with a denominator larger than `max_denominator`,
+- subsets in which the subgroups have different rates but the groups of each protected attribute have equal
+  rates, which is possible with more than one protected attribute,
+- subsets that do not reach parity but have a smaller objective value, e.g., if the objective also penalizes
+  the number of removed rows.
+
+The original dataset is always a candidate, so the solution is never worse than keeping all rows.
+It is a fast baseline for the genetic algorithm, independent of the number of rows.
+
+Example
+-------
+>>> from fairdo.optimize import parity_method
+>>> from fairdo.preprocessing import HeuristicWrapper
+>>> preprocessor = HeuristicWrapper(heuristic=parity_method, protected_attribute='race', label='y')
+"""
+import numpy as np
+
+from fairdo.optimize.greedy import greedy_method
+from fairdo.utils.helper import check_random_state, select_cell_rows
+
+
+def parity_method(f, d, n_keep=None, max_denominator=100, tol=1e-9, random_state=None):
+    """
+    Select the candidate subset that minimizes `f`, among the largest subsets in which all subgroups have the
+    same positive rate `a / b` with `b <= max_denominator`, and the whole dataset.
+    The result is not guaranteed to be optimal, see the module documentation.
+
+    Parameters
+    ----------
+    f: DatasetObjective
+        The objective to minimize. It must be evaluated from group counts, i.e., `f.incremental` is True.
+    d: int
+        The number of dimensions.
+    n_keep: int, optional
+        If given, the solution has exactly `n_keep` ones. The best subset is brought to this size with
+        :func:`fairdo.optimize.greedy.greedy_method`. Default is None, i.e., any number of ones.
+    max_denominator: int, optional
+        The maximum denominator `b` of the positive rates `a / b`. Default is 100.
+    tol: float, optional
+        Subsets whose fitness is within `tol` of the best fitness are considered equally good. Default is 1e-9.
+    random_state: None, int or np.random.Generator, optional
+        The random state that samples the rows of each cell, see :func:`fairdo.utils.helper.check_random_state`.
+        Default is None.
+
+    Returns
+    -------
+    best_solution: ndarray, shape (d,)
+        The binary vector of the best subset.
+    best_fitness: float
+        The fitness of the best subset.
+    """
+    if not getattr(f, 'incremental', False):
+        raise ValueError("parity_method requires an objective that is evaluated from group counts, "
+                         "e.g., a DatasetObjective of a statistical parity measure.")
+    rng = check_random_state(random_state)
+    cell_counts, cells = f.cells()
+    sizes = np.bincount(cells, minlength=len(cell_counts))
+    kept = parity_cell_counts(cell_counts, sizes, max_denominator=max_denominator)
+    # keeping all rows is always a candidate
+    kept = np.vstack([sizes, kept])
+
+    base_counts = f.counts(np.zeros((1, d)))[0]
+    fitness = np.asarray(f.evaluate_counts(base_counts + kept @ cell_counts))
+    # the largest of the best subsets
+    best = np.flatnonzero(fitness <= fitness.min() + tol)
+    best = best[np.argmax(kept[best].sum(axis=1))]
+
+    solution = select_cell_rows(cells, kept[best], np.lexsort((rng.random(d), cells)))
+    if n_keep is not None:
+        return greedy_method(f, d, n_keep=n_keep, initial_solution=solution, tol=tol, random_state=rng)
+    return solution, fitness[best]
+
+
+def parity_cell_counts(cell_counts, sizes, max_denominator=100):
+    """
+    For each positive rate `a / b` with `b <= max_denominator`, the number of rows of each cell of the largest
+    subset in which all subgroups have this positive rate.
+
+    Parameters
+    ----------
+    cell_counts: ndarray, shape (n_cells, 2 * n_groups)
+        The contribution of a single row of each cell to the group counts,
+        see :meth:`fairdo.preprocessing.objective.DatasetObjective.cells`.
+    sizes: ndarray, shape (n_cells,)
+        The number of rows of each cell.
+    max_denominator: int, optional
+        The maximum denominator of the positive rates. Default is 100.
+
+    Returns
+    -------
+    kept: ndarray, shape (n_rates, n_cells)
+        The number of selected rows of each cell for each positive rate.
+    """
+    n_groups = cell_counts.shape[1] // 2
+    # cells with the same groups form a subgroup, the label of a cell is positive if it counts positives
+    _, subgroups = np.unique(cell_counts[:, :n_groups], axis=0, return_inverse=True)
+    subgroups = subgroups.reshape(-1)
+    positive = cell_counts[:, n_groups:].sum(axis=1) > 0
+    n_subgroups = subgroups.max(initial=-1) + 1
+    positives = np.bincount(subgroups, weights=sizes * positive, minlength=n_subgroups).astype(np.int64)
+    negatives = np.bincount(subgroups, weights=sizes * ~positive, minlength=n_subgroups).astype(np.int64)
+
+    # all reduced fractions a / b with 0 <= a <= b <= max_denominator
+    a, b = np.meshgrid(np.arange(max_denominator + 1), np.arange(1, max_denominator + 1), indexing='ij')
+    reduced = (a <= b) & (np.gcd(a, b) == 1)
+    a, b = a[reduced][:, np.newaxis], b[reduced][:, np.newaxis]
+
+    # the number of multiples of (a, b - a) rows each subgroup can afford, a label with zero rows is no limit
+    unlimited = np.iinfo(np.int64).max
+    multiples_positive = np.where(a > 0, positives // np.maximum(a, 1), unlimited)
+    multiples_negative = np.where(b - a > 0, negatives // np.maximum(b - a, 1), unlimited)
+    multiples = np.minimum(multiples_positive, multiples_negative)
+    return multiples[:, subgroups] * np.where(positive, a, b - a)
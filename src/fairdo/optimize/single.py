@@ -28,13 +28,21 @@ Deb, K., Pratap, A., Agarwal, S., & Meyarivan, T. (2002).
 A fast and elitist multiobjective genetic algorithm: NSGA-II. IEEE Transactions on Evolutionary Computation.
 """
 
+from functools import partial
+
 import pathos.multiprocessing as mp
 import numpy as np
 
+from fairdo.optimize.budget import Budget
+from fairdo.optimize.cache import check_cache, evaluate_cached
 from fairdo.optimize.geneticoperators.initialization import random_initialization
 from fairdo.optimize.geneticoperators.selection import elitist_selection, tournament_selection
 from fairdo.optimize.geneticoperators.crossover import onepoint_crossover, uniform_crossover
 from fairdo.optimize.geneticoperators.mutation import fractional_flip_mutation, shuffle_mutation
+from fairdo.optimize.geneticoperators.packed import packed_operator
+from fairdo.utils.helper import (bind_keyword, bind_random_state, check_random_state, is_batched, popcount,
+                                spawn_random_states, unpack_bits)
+from fairdo.utils.parallel import EvaluationPool
 
 
 def genetic_algorithm(f, d,
@@ -46,7 +54,15 @@ def genetic_algorithm(f, d,
                       mutation=fractional_flip_mutation,
                       maximize=False,
                       tol=1e-6,
-                      patience=50):
+                      patience=50,
+                      packed=False,
+                      random_state=None,
+                      cache=None,
+                      max_time=None,
+                      max_evaluations=None,
+                      target_fitness=None,
+                      n_keep=None,
+                      incremental=False):
     """
     Perform a genetic algorithm with constraints. The constraint is that the sum of the binary vector must be equal
     to n. The fitness function is the value of the fitness function plus a penalty for individuals that do not satisfy
@@ -85,6 +101,42 @@ def genetic_algorithm(f, d,
         then the algorithm stops.
     patience: int, optional
         The number of generations to wait before early stopping.
+    packed: bool, optional
+        Whether to store the population bit-packed, which needs 1 bit per gene.
+        The genetic operators are adapted with :func:`fairdo.optimize.geneticoperators.packed_operator`.
+        Default is False.
+    random_state: None, int or np.random.Generator, optional
+        The random state of the run, see :func:`fairdo.utils.helper.check_random_state`.
+        It is passed to all genetic operators that have the keyword argument `random_state`.
+        Default is None.
+    cache: None, int or FitnessCache, optional
+        Cache of the fitness values of already evaluated individuals, see :class:`fairdo.optimize.cache.FitnessCache`.
+        If int, a new cache with this maximum size is used. Default is None, i.e., no cache.
+    max_time: float, optional
+        The maximum run time in seconds. The deadline is checked before each generation.
+        Default is None, i.e., no deadline.
+    max_evaluations: int, optional
+        The maximum number of evaluated individuals. The run stops before a generation that would exceed it.
+        Default is None, i.e., no limit.
+    target_fitness: float, optional
+        The run stops as soon as the best fitness is at least as good as `target_fitness`.
+        Default is None.
+    n_keep: int, optional
+        If given, only solutions with exactly `n_keep` ones are searched.
+        It is passed to all genetic operators that have the keyword argument `n_keep`, e.g., `random_initialization`,
+        `uniform_crossover` and `fractional_flip_mutation`, which then preserve the number of ones.
+        Operators without it must preserve the number of ones on their own, e.g., `swap_mutation`.
+        Default is None, i.e., solutions of any size.
+    incremental: bool, optional
+        Whether to evaluate the offspring by updating the group counts of their parents, see
+        :meth:`fairdo.preprocessing.objective.DatasetObjective.update_counts`.
+        The counts are kept with the population across generations, and the crossover and the mutation report
+        the parent of each offspring and the flipped bits (keyword `return_lineage`).
+        Requires an incremental `f`, unpacked populations and no cache.
+        It pays off if the offspring differ from their parents in few bits, e.g., `uniform_crossover` with `p`
+        close to 0 or 1 and a small mutation rate. In `tests/benchmark_incremental.py`, it is 1.4x faster
+        with ``p=0.999`` and a mutation rate of 0.001. With ``p=0.5``, the offspring are counted from scratch.
+        Default is False.
 
     Returns
     -------
@@ -101,56 +153,177 @@ def genetic_algorithm(f, d,
     The fitness function must map the binary vector to a positive value, i.e.,
     :math:`f: \{0, 1\}^d \rightarrow \mathbb{R}^+`.
     """
-    # negate the fitness function if we are minimizing
-    if not maximize:
-        f_orig = f
-        f = lambda x: -f_orig(x)
-
-    # Generate the initial population
-    population = initialization(pop_size=pop_size, d=d)
-    # Evaluate the function for each vector in the population
-    fitness = evaluate_population(f, population)
-    best_idx = np.argmax(fitness)
-    best_fitness = fitness[best_idx]
-    best_population = population[best_idx]
-    no_improvement_streak = 0
-    # Perform the genetic algorithm for the specified number of generations
-    for generation in range(num_generations):
-        # Select the parents
-        parents, fitness = selection(population=population, fitness=fitness)
-        # Create the offspring
-        num_offspring = pop_size - parents.shape[0]
-        offspring = crossover(parents=parents, num_offspring=num_offspring)
-        # Mutate the offspring
-        offspring = mutation(offspring=offspring)
-
-        # Evaluate the fitness of the offspring
-        offspring_fitness = evaluate_population(f, offspring)
-
-        # Create the new population (allow the parents to be part of the next generation)
-        population = np.concatenate((parents, offspring))
-        fitness = np.concatenate((fitness, offspring_fitness))
-        
-        # save the best solution found so far
-        best_idx = np.argmax(offspring_fitness)
-        if offspring_fitness[best_idx] > best_fitness + tol:
-            best_fitness = offspring_fitness[best_idx]
-            best_population = offspring[best_idx]
-            no_improvement_streak = 0
+    budget = Budget(max_time=max_time, max_evaluations=max_evaluations)
+    # negate the fitness if we are minimizing
+    sign = 1 if maximize else -1
+    rng = check_random_state(random_state)
+    # the workers get their own random stream, so the operators draw the same numbers with or without a pool
+    pool_rng, = spawn_random_states(rng, 1)
+    if n_keep is not None:
+        if not 0 <= n_keep <= d:
+            raise ValueError(f"n_keep must be between 0 and d={d}, got {n_keep}.")
+        initialization = bind_keyword(initialization, 'n_keep', n_keep)
+        crossover = bind_keyword(crossover, 'n_keep', n_keep)
+        mutation = bind_keyword(mutation, 'n_keep', n_keep)
+    initialization = bind_random_state(initialization, rng)
+    selection = bind_random_state(selection, rng)
+    crossover = bind_random_state(crossover, rng)
+    mutation = bind_random_state(mutation, rng)
+    if incremental:
+        check_incremental(f, crossover, mutation, packed=packed, cache=cache)
+        crossover = bind_keyword(crossover, 'return_lineage', True)
+        mutation = bind_keyword(mutation, 'return_lineage', True)
+    if packed:
+        initialization = packed_operator(initialization, d)
+        crossover = packed_operator(crossover, d)
+        mutation = packed_operator(mutation, d)
+    # number of bits of packed individuals
+    bits = d if packed else None
+    cache = check_cache(cache)
+
+    # the worker processes live as long as the run and receive the fitness function only once
+    pool = open_pool(f, pop_size, random_state=pool_rng)
+    try:
+        # Generate the initial population
+        population = initialization(pop_size=pop_size, d=d)
+        check_n_keep(population, n_keep, d=bits)
+        # Evaluate the function for each vector in the population
+        if incremental:
+            # the group counts are kept with the population
+            counts = f.counts(population)
+            fitness = sign * np.asarray(f.evaluate_counts(counts))
         else:
-            # early stopping if the best solution is found
-            no_improvement_streak += 1
-            if no_improvement_streak >= patience:
-                print(f"Stopping after {generation + 1} generations after stagnating for "
-                      f"{no_improvement_streak} generations.")
+            fitness = sign * evaluate_cached(cache, partial(evaluate_population, f, pool=pool, d=bits),
+                                             population, d=bits)
+        budget.spend(len(population))
+        best_idx = np.argmax(fitness)
+        best_fitness = fitness[best_idx]
+        best_population = population[best_idx]
+        no_improvement_streak = 0
+        # Perform the genetic algorithm for the specified number of generations
+        for generation in range(num_generations):
+            if target_fitness is not None and best_fitness >= sign * target_fitness:
+                print(f"Stopping after {generation} generations after reaching the target fitness.")
                 break
-
+            # Select the parents
+            if incremental:
+                # select the indices of the parents to select their counts as well
+                selected, fitness = selection(population=np.arange(len(population))[:, np.newaxis], fitness=fitness)
+                parents, counts = population[selected[:, 0]], counts[selected[:, 0]]
+            else:
+                parents, fitness = selection(population=population, fitness=fitness)
+            # Create the offspring
+            num_offspring = pop_size - parents.shape[0]
+            if budget.exhausted(num_offspring):
+                print(f"Stopping after {generation} generations after {budget.evaluations} evaluations "
+                      f"and {budget.elapsed:.1f} seconds because the budget is exhausted.")
+                break
+            if incremental:
+                offspring, (origin, rows, positions) = crossover(parents=parents, num_offspring=num_offspring)
+                offspring, mutated = mutation(offspring=offspring)
+                check_n_keep(offspring, n_keep)
+                # update the parents' counts with the bits flipped by crossover and mutation
+                offspring_counts = f.update_counts(counts, origin, offspring, (rows, positions), mutated)
+                offspring_fitness = sign * np.asarray(f.evaluate_counts(offspring_counts))
+                counts = np.concatenate((counts, offspring_counts))
+            else:
+                offspring = crossover(parents=parents, num_offspring=num_offspring)
+                # Mutate the offspring
+                offspring = mutation(offspring=offspring)
+                check_n_keep(offspring, n_keep, d=bits)
+
+                # Evaluate the fitness of the offspring
+                offspring_fitness = sign * evaluate_cached(cache, partial(evaluate_population, f, pool=pool, d=bits),
+                                                           offspring, d=bits)
+            budget.spend(num_offspring)
+
+            # Create the new population (allow the parents to be part of the next generation)
+            population = np.concatenate((parents, offspring))
+            fitness = np.concatenate((fitness, offspring_fitness))
+
+            # save the best solution found so far
+            best_idx = np.argmax(offspring_fitness)
+            if offspring_fitness[best_idx] > best_fitness + tol:
+                best_fitness = offspring_fitness[best_idx]
+                best_population = offspring[best_idx]
+                no_improvement_streak = 0
+            else:
+                # early stopping if the best solution is found
+                no_improvement_streak += 1
+                if no_improvement_streak >= patience:
+                    print(f"Stopping after {generation + 1} generations after stagnating for "
+                          f"{no_improvement_streak} generations.")
+                    break
+    finally:
+        if pool is not None:
+            pool.close()
+
+    if packed:
+        best_population = unpack_bits(best_population, d)
     if not maximize:
         # negate the fitness back to its original form
         best_fitness = -best_fitness
     return best_population, best_fitness
 
 
+def check_n_keep(population, n_keep, d=None):
+    """
+    Check that each individual of a population has exactly `n_keep` ones.
+
+    Parameters
+    ----------
+    population: ndarray, shape (pop_size, d)
+        The population of binary vectors.
+    n_keep: int or None
+        The required number of ones. If None, nothing is checked.
+    d: int, optional
+        The number of bits if the individuals are bit-packed. Default is None, i.e., not packed.
+
+    Raises
+    ------
+    ValueError
+        If an individual has a different number of ones, i.e., a genetic operator does not preserve the size.
+    """
+    if n_keep is None:
+        return
+    sizes = popcount(population) if d is not None else np.count_nonzero(population == 1, axis=1)
+    if np.any(sizes != n_keep):
+        raise ValueError(f"The genetic operators must preserve n_keep={n_keep} ones per individual, "
+                         f"got individuals with {np.unique(sizes[sizes != n_keep])} ones.")
+
+
+def check_incremental(f, crossover, mutation, packed=False, cache=None):
+    """
+    Check that the offspring can be evaluated by updating the group counts of their parents.
+
+    Parameters
+    ----------
+    f: callable
+        The fitness function.
+    crossover, mutation: callable
+        The genetic operators, which must have the keyword argument `return_lineage`.
+    packed: bool, optional
+        Whether the population is bit-packed. Default is False.
+    cache: FitnessCache, optional
+        The fitness cache. Default is None.
+
+    Raises
+    ------
+    ValueError
+        If the fitness function is not incremental, the population is packed, a cache is used or an operator does not
+        report the lineage of the offspring.
+    """
+    if not getattr(f, 'incremental', False):
+        raise ValueError("Incremental evaluation requires an objective that is evaluated from group counts, "
+                         "e.g., a DatasetObjective of a statistical parity measure.")
+    if packed or cache is not None:
+        raise ValueError("Incremental evaluation supports neither packed populations nor a fitness cache.")
+    for operator in (crossover, mutation):
+        if bind_keyword(operator, 'return_lineage', True) is operator:
+            raise ValueError(f"Incremental evaluation requires genetic operators with the keyword argument "
+                             f"return_lineage, got {operator}.")
+
+
 def evaluate_individual(args):
     """
     Calculates the fitness of an individual. The fitness is the value of the fitness function
@@ -171,7 +344,7 @@ def evaluate_individual(args):
     return fitness
 
 
-def evaluate_population_single_cpu(f, population):
+def evaluate_population_single_cpu(f, population, d=None):
     """
     Calculates the fitness of each individual in a population. The fitness is the value of the fitness function
     plus a penalty for individuals that do not satisfy the size constraint.
@@ -184,19 +357,54 @@ def evaluate_population_single_cpu(f, population):
         The constraint value.
     population: ndarray, shape (pop_size, d)
         The population of vectors to evaluate.
+    d: int, optional
+        The number of bits if the individuals are bit-packed. Default is None, i.e., not packed.
 
     Returns
     -------
     fitness: ndarray, shape (pop_size,)
         The fitness values of the population.
     """
+    if d is not None:
+        return np.array([f(unpack_bits(individual, d)) for individual in population])
     # fallback to single process execution if multiprocessing fails
     fitness = np.apply_along_axis(f, axis=1, arr=population)
 
     return fitness
 
 
-def evaluate_population(f, population):
+def open_pool(f, pop_size, random_state=None):
+    """
+    Open a pool of worker processes for the evaluation of `f` if it pays off, i.e.,
+    if there is more than one CPU, the population is large enough and `f` is not batched, see
+    :func:`fairdo.utils.helper.is_batched`.
+
+    Parameters
+    ----------
+    f: callable
+        The fitness function to evaluate.
+    pop_size: int
+        The size of the population.
+    random_state: None, int or np.random.Generator, optional
+        The random state from which the random streams of the workers are spawned.
+        It should not be shared with the genetic operators, see `spawn_random_states`.
+
+    Returns
+    -------
+    pool: EvaluationPool or None
+        The pool, which must be closed by the caller, or None if the population is evaluated in this process.
+    """
+    if is_batched(f) or mp.cpu_count() <= 1 or pop_size < 200:
+        return None
+    try:
+        return EvaluationPool(f, random_state=random_state)
+    except Exception as e:
+        print(f"Multiprocessing pool failed with error: {e}")
+        print("Falling back to single process execution")
+        return None
+
+
+def evaluate_population(f, population, pool=None, d=None):
     """
     Calculates the fitness of each individual in a population. The fitness is the value of the fitness function
     plus a penalty for individuals that do not satisfy the size constraint.
@@ -207,23 +415,36 @@ def evaluate_population(f, population):
         The fitness function to evaluate.
     population: ndarray, shape (pop_size, d)
         The population of vectors to evaluate.
+    pool: EvaluationPool, optional
+        Worker processes that evaluate `f`, see `open_pool`.
+        If not given, a pool is opened for this population only if it is large enough.
+    d: int, optional
+        The number of bits if the individuals are bit-packed. Default is None, i.e., not packed.
 
     Returns
     -------
     fitness: ndarray, shape (pop_size,)
         The fitness values of the population.
+
+    Notes
+    -----
+    If `f` is batched, i.e., it has the attribute ``batched=True`` or ``vectorized=True`` and a method
+    ``evaluate_population``, the whole population is passed to `f` at once.
+    See :class:`fairdo.preprocessing.objective.DatasetObjective`.
     """
+    if is_batched(f):
+        if d is not None:
+            return np.asarray(f.evaluate_population(population, packed=True))
+        return np.asarray(f.evaluate_population(population))
+    if pool is None:
+        pool = open_pool(f, population.shape[0])
+        if pool is None:
+            return evaluate_population_single_cpu(f, population, d=d)
+        with pool:
+            return evaluate_population(f, population, pool=pool, d=d)
     try:
-        # use multiprocessing to speed up the evaluation if the population is large enough
-        if mp.cpu_count() > 1 and population.shape[0] >= 200:
-            # use multiprocessing to speed up the evaluation
-            with mp.Pool() as pool:
-                fitness = pool.map(evaluate_individual, [(f, individual) for individual in population])
-
-            return np.array(fitness)
-        else:
-            return evaluate_population_single_cpu(f, population)
+        return pool.map(population, d=d)
     except Exception as e:
         print(f"Multiprocessing pool failed with error: {e}")
         print("Falling back to single process execution")
-        return evaluate_population_single_cpu(f, population)
+        return evaluate_population_single_cpu(f, population, d=d)
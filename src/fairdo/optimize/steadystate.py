@@ -0,0 +1,224 @@
+"""
+Steady-State Genetic Algorithm
+==============================
+
+This module implements a steady-state genetic algorithm with asynchronous evaluation.
+
+The generational genetic algorithm, see :func:`fairdo.optimize.single.genetic_algorithm`, waits until all
+offspring of a generation are evaluated, so the workers idle whenever a few individuals take longer than the rest,
+e.g., with fitness functions whose cost depends on the individual.
+The steady-state genetic algorithm keeps a fixed number of offspring in flight in the workers.
+As soon as the fitness of an offspring returns, it replaces the worst individual of the population if it is better,
+and a new offspring is created from the current population and sent to the free worker.
+
+Example
+-------
+>>> from fairdo.optimize import steady_state_genetic_algorithm
+>>> best_solution, fitness = steady_state_genetic_algorithm(f, d, pop_size=100, num_evaluations=50000)
+
+Notes
+-----
+The order in which the evaluations return depends on the workers,
+so runs with a fixed random state are only reproducible with a single worker.
+
+References
+----------
+Syswerda, G. (1991). A study of reproduction in generational and steady-state genetic algorithms.
+Foundations of Genetic Algorithms.
+"""
+import queue
+from functools import partial
+
+import numpy as np
+
+from fairdo.optimize.budget import Budget
+from fairdo.optimize.geneticoperators.initialization import random_initialization
+from fairdo.optimize.geneticoperators.selection import tournament_selection
+from fairdo.optimize.geneticoperators.crossover import uniform_crossover
+from fairdo.optimize.geneticoperators.mutation import fractional_flip_mutation
+from fairdo.optimize.geneticoperators.packed import packed_operator
+from fairdo.optimize.single import evaluate_population, evaluate_population_single_cpu
+from fairdo.utils.helper import bind_random_state, check_random_state, is_batched, spawn_random_states, unpack_bits
+from fairdo.utils.parallel import EvaluationPool
+
+
+def steady_state_genetic_algorithm(f, d,
+                                   pop_size=100,
+                                   num_evaluations=50000,
+                                   initialization=random_initialization,
+                                   selection=tournament_selection,
+                                   crossover=uniform_crossover,
+                                   mutation=fractional_flip_mutation,
+                                   maximize=False,
+                                   tol=1e-6,
+                                   patience=None,
+                                   in_flight=None,
+                                   n_jobs=-1,
+                                   backend='processes',
+                                   packed=False,
+                                   random_state=None,
+                                   max_time=None,
+                                   target_fitness=None):
+    """
+    Perform a steady-state genetic algorithm that evaluates the offspring asynchronously.
+
+    Parameters
+    ----------
+    f: callable
+        The fitness function to minimize.
+    d: int
+        The number of dimensions.
+    pop_size: int
+        The size of the population.
+    num_evaluations: int
+        The number of evaluated offspring, not counting the initial population.
+    initialization: callable
+        The function to initialize the population.
+    selection: callable
+        The function to select the parents of each offspring from the population.
+    crossover: callable
+        The function to perform the crossover operation.
+    mutation: callable
+        The function to perform the mutation operation.
+    maximize: bool, optional
+        Whether to maximize or minimize the fitness function.
+    tol: float, optional
+        The tolerance for early stopping, see `patience`.
+    patience: int, optional
+        The number of evaluations without an improvement of more than `tol` after which the algorithm stops.
+        Default is None, i.e., no early stopping.
+    in_flight: int, optional
+        The number of offspring that are evaluated at the same time. Default is twice the number of workers.
+    n_jobs: int, optional
+        The number of workers. Default is -1, i.e., one worker per CPU.
+        1 evaluates the offspring one after the other in the current process, without a pool.
+    backend: str, optional
+        Either 'processes' or 'threads'. Default is 'processes'.
+        See :class:`fairdo.utils.parallel.EvaluationPool`.
+    packed: bool, optional
+        Whether to store the population bit-packed, which needs 1 bit per gene.
+        The genetic operators are adapted with :func:`fairdo.optimize.geneticoperators.packed_operator`.
+        Default is False.
+    random_state: None, int or np.random.Generator, optional
+        The random state of the run, see :func:`fairdo.utils.helper.check_random_state`.
+        It is passed to all genetic operators that have the keyword argument `random_state`.
+        Default is None.
+    max_time: float, optional
+        The maximum run time in seconds. No offspring are created after the deadline.
+        Default is None, i.e., no deadline.
+    target_fitness: float, optional
+        The run stops as soon as the best fitness is at least as good as `target_fitness`.
+        Default is None.
+
+    Returns
+    -------
+    best_solution : ndarray, shape (d,)
+        The best solution found by the algorithm.
+    best_fitness : float
+        The fitness of the best solution found by the algorithm.
+    """
+    budget = Budget(max_time=max_time, max_evaluations=num_evaluations)
+    # negate the fitness if we are minimizing
+    sign = 1 if maximize else -1
+    rng = check_random_state(random_state)
+    # the workers get their own random stream, so the operators draw the same numbers with or without a pool
+    pool_rng, = spawn_random_states(rng, 1)
+    initialization = bind_random_state(initialization, rng)
+    selection = bind_random_state(selection, rng)
+    crossover = bind_random_state(crossover, rng)
+    mutation = bind_random_state(mutation, rng)
+    if packed:
+        initialization = packed_operator(initialization, d)
+        crossover = packed_operator(crossover, d)
+        mutation = packed_operator(mutation, d)
+    # number of bits of packed individuals
+    bits = d if packed else None
+
+    # evaluated offspring and exceptions of the workers, in the order they return
+    results = queue.Queue()
+    # a single worker evaluates the offspring in the current process, one after the other
+    pool = None
+    if n_jobs != 1:
+        pool = EvaluationPool(f, processes=None if n_jobs == -1 else n_jobs, backend=backend,
+                              random_state=pool_rng)
+    try:
+        if in_flight is None:
+            in_flight = 1 if pool is None else 2 * pool.processes
+
+        if pool is None:
+            evaluate = partial(evaluate_population if is_batched(f)
+                               else evaluate_population_single_cpu, f, d=bits)
+        else:
+            evaluate = partial(evaluate_population, f, pool=pool, d=bits)
+
+        population = initialization(pop_size=pop_size, d=d)
+        fitness = sign * evaluate(population)
+        best_idx = np.argmax(fitness)
+        best_fitness = fitness[best_idx]
+        best_population = population[best_idx].copy()
+        no_improvement_streak = 0
+
+        pending = 0
+        stopped = False
+        while True:
+            # keep the workers busy with new offspring
+            while not stopped and pending < in_flight and not budget.exhausted(pending + 1):
+                parents, _ = selection(population=population, fitness=fitness)
+                offspring = mutation(offspring=crossover(parents=parents, num_offspring=1))
+                if pool is None:
+                    _put_result(results, offspring, evaluate(offspring))
+                else:
+                    pool.submit(offspring, callback=partial(_put_result, results, offspring),
+                                error_callback=results.put, d=bits)
+                pending += 1
+            if pending == 0:
+                break
+
+            result = results.get()
+            pending -= 1
+            if isinstance(result, BaseException):
+                raise result
+            offspring, offspring_fitness = result
+            budget.spend(1)
+            offspring_fitness = sign * offspring_fitness
+            # replace the worst individual of the population
+            worst_idx = np.argmin(fitness)
+            if offspring_fitness > fitness[worst_idx]:
+                population[worst_idx] = offspring
+                fitness[worst_idx] = offspring_fitness
+
+            # save the best solution found so far
+            if offspring_fitness > best_fitness + tol:
+                no_improvement_streak = 0
+            else:
+                no_improvement_streak += 1
+            if offspring_fitness > best_fitness:
+                best_fitness = offspring_fitness
+                best_population = offspring.copy()
+
+            if stopped:
+                continue
+            if target_fitness is not None and best_fitness >= sign * target_fitness:
+                print(f"Stopping after {budget.evaluations} evaluations after reaching the target fitness.")
+                stopped = True
+            elif patience is not None and no_improvement_streak >= patience:
+                print(f"Stopping after {budget.evaluations} evaluations after stagnating for "
+                      f"{no_improvement_streak} evaluations.")
+                stopped = True
+    finally:
+        if pool is not None:
+            pool.close()
+
+    if packed:
+        best_population = unpack_bits(best_population, d)
+    if not maximize:
+        # negate the fitness back to its original form
+        best_fitness = -best_fitness
+    return best_population, best_fitness
+
+
+def _put_result(results, offspring, fitness):
+    """
+    Put an evaluated offspring into the queue of results. Runs in a thread of the pool.
+    """
+    results.put((offspring[0], fitness[0]))
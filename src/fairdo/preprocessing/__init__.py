@@ -19,6 +19,11 @@ The `HeuristicWrapper` is a pre-processor that is used with a given combinatoria
 to optimize the fairness of a dataset. The user can use any heuristic solver from the `fairdo.optimize` module.
 This requires manually setting the parameters of the heuristic solver
 and is recommended for advanced users.
+Both evaluate their solutions with a `DatasetObjective`, which evaluates whole populations of binary masks at once
+for discrimination measures that only depend on group counts.
+The `MultiObjectiveWrapper` evaluates all of its objectives at once with a `MultiDatasetObjective`.
+With ``compress=True``, a `CompressedObjective` collapses interchangeable rows so that the solvers of the
+`HeuristicWrapper` search the number of selected rows per group instead of one bit per row.
 
 The `MetricOptimizer` is a pre-processor that is used with a given optimization algorithm
 to optimize the fairness of a dataset. This pre-processor is **deprecated**. Use `DefaultPreprocessing` instead.
@@ -30,4 +35,5 @@ These pre-processors are used for comparison purposes.
 """
 from fairdo.preprocessing.base import Preprocessing, OriginalData, Unawareness, Random
 from fairdo.preprocessing.metricoptimizer import MetricOptimizer, MetricOptGenerator, MetricOptRemover
+from fairdo.preprocessing.objective import DatasetObjective, MultiDatasetObjective, CompressedObjective
 from fairdo.preprocessing.solverwrapper import HeuristicWrapper, DefaultPreprocessing, MultiObjectiveWrapper
@@ -144,7 +144,6 @@ class Random(Preprocessing):
         super().__init__(protected_attribute=protected_attribute, label=label)
         self.frac = frac
         self.random_state = random_state
-        np.random.seed(self.random_state)
 
     def transform(self):
         """
@@ -0,0 +1,907 @@
+"""
+Objective
+=========
+
+This module implements the objective that is optimized by the solvers of the pre-processors
+`HeuristicWrapper`, `DefaultPreprocessing` and `MultiObjectiveWrapper`.
+An objective maps a binary mask over the rows of a dataset to the discrimination
+(plus a penalty) of the masked dataset.
+
+The function `f` evaluates a single binary mask by materializing the masked dataset.
+The class `DatasetObjective` wraps `f` and additionally evaluates a whole population of masks at once.
+The class `MultiDatasetObjective` evaluates several objectives on the same masks and shares the work between them.
+For discrimination measures that accept a :class:`fairdo.metrics.GroupContingency`,
+e.g., `statistical_parity_abs_diff_max`, the group counts of all individuals are computed as a single matrix product
+of the population with a precomputed one-hot encoding of the label `y` and the protected attributes `z`.
+The dataset is never filtered in this case.
+The same holds for penalties that accept a `GroupContingency`, e.g., `group_missing_penalty`,
+which are evaluated on the same counts as the discrimination measure.
+Discrimination measures that accept a binary `mask`, e.g.,
+:class:`fairdo.metrics.individual.ConsistencyScoreObjective` or :class:`fairdo.metrics.independence.RDCObjective`,
+are fitted once on all rows that may be part of a solution and then evaluate the masks of a whole population
+over these rows, e.g., with a precomputed nearest neighbor graph.
+All other discrimination measures fall back to `f`.
+The class `CompressedObjective` collapses interchangeable rows, e.g., rows with the same label and protected
+attributes, and evaluates the number of selected rows per group instead of a mask over the rows.
+
+Vectorized objectives are also incremental. The encoding holds the contribution of each row to the group counts,
+so the counts of an offspring follow from the counts of its parent and the rows in which both differ.
+Solvers can use `counts`, `update_counts` and `evaluate_counts` to evaluate offspring that differ from their parents
+in a few bits only in time proportional to the number of flipped bits, e.g., `genetic_algorithm` with
+``incremental=True``.
+"""
+import inspect
+from functools import partial
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+
+from fairdo.metrics.contingency import GroupContingency, group_encoding
+from fairdo.metrics.dataset import statistical_parity_abs_diff_max
+from fairdo.utils.helper import (MAX_SPARSE_FLIPS, check_random_state, merge_flips, pack_bits, unpack_bits, popcount,
+                                select_cell_rows)
+from fairdo.utils.parallel import SharedArray, SharedFrame
+
+
+class DatasetObjective:
+    """
+    Objective function of a pre-processor. It evaluates binary masks over the rows of a dataset.
+
+    The objective is callable with a single binary vector, which makes it a drop-in replacement for
+    ``partial(f, ...)``. In addition, `evaluate_population` evaluates all individuals of a population at once.
+
+    Attributes
+    ----------
+    dataset: pd.DataFrame
+        The original data.
+    label: str
+        The column in the dataset to use as the target variable.
+    protected_attributes: List[str]
+        The columns in the dataset to consider as protected attributes.
+    approach: str
+        The approach to be used for the heuristic method. It can be either 'remove' or 'add'.
+    synthetic_dataset: pd.DataFrame
+        Extra samples to be added to the original data. Only used by the 'add' approach.
+    fitness_function: callable
+        The discrimination measure to be minimized.
+    penalty: callable
+        The penalty added to the discrimination measure.
+    dims: int
+        The number of dimensions of a binary mask.
+    vectorized: bool
+        Whether the whole population is evaluated without materializing the masked datasets.
+    masked: bool
+        Whether the discrimination measure is fitted on all rows and evaluates the binary mask over them.
+    batched: bool
+        Whether `evaluate_population` evaluates the whole population at once, i.e., the objective is vectorized
+        or masked. The optimizers then call it once per population instead of once per individual.
+    incremental: bool
+        Whether offspring can be evaluated from the counts of their parents.
+        See `counts`, `update_counts` and `evaluate_counts`.
+    """
+
+    def __init__(self, dataset, label, protected_attributes,
+                 approach='remove',
+                 synthetic_dataset=None,
+                 fitness_function=statistical_parity_abs_diff_max,
+                 penalty=None):
+        """
+        Parameters
+        ----------
+        dataset: pd.DataFrame
+            The data to calculate the discrimination measure on.
+        label: str
+            The column in the dataset to use as the target variable.
+        protected_attributes: Union[str, List[str]]
+            The column or columns in the dataset to consider as protected attributes.
+        approach: str
+            The approach to be used for the heuristic method.
+            It can be either 'remove' or 'add'.
+        synthetic_dataset: pd.DataFrame, optional
+            Extra samples to be added to the original data. Samples can be synthetic data.
+            It is required only if the 'add' approach is used.
+        fitness_function: callable, optional (default=statistical_parity_abs_diff_max)
+            A function that takes in x (features), y (labels), and z (protected attributes) and returns a numeric
+            value.
+        penalty: callable, optional (default=None)
+            A function that takes a dictionary of keyword arguments and returns a numeric value.
+        """
+        if isinstance(protected_attributes, str):
+            protected_attributes = [protected_attributes]
+        if approach == 'add':
+            if synthetic_dataset is None:
+                raise ValueError('The \'add\' approach requires a synthetic dataset.')
+            dims = len(synthetic_dataset)
+        elif approach == 'remove':
+            dims = len(dataset)
+        else:
+            raise ValueError('Invalid approach. It can be either \'remove\' or \'add\'.')
+
+        self.dataset = dataset
+        self.label = label
+        self.protected_attributes = protected_attributes
+        self.approach = approach
+        self.synthetic_dataset = synthetic_dataset
+        self.fitness_function = fitness_function
+        self.penalty = penalty
+        self.dims = dims
+
+        self._f = self._bind()
+
+        self.vectorized = accepts_contingency(fitness_function) and (penalty is None or
+                                                                    accepts_contingency(penalty))
+        self.incremental = self.vectorized
+        if self.vectorized:
+            self._fit_encoding()
+        self.masked = not self.vectorized and accepts_mask(fitness_function)
+        if self.masked:
+            self._fit_mask()
+        self.batched = self.vectorized or self.masked
+        self._shared = None
+
+    def __call__(self, binary_vector):
+        """
+        Evaluate a single binary mask.
+
+        Parameters
+        ----------
+        binary_vector: np.array
+            Binary vector indicating which rows to include in the discrimination measure calculation.
+
+        Returns
+        -------
+        float
+            The calculated discrimination measure.
+        """
+        if self.vectorized or self.masked:
+            return self.evaluate_population(np.asarray(binary_vector).reshape(1, -1))[0]
+        return self._f(binary_vector)
+
+    def evaluate_population(self, population, packed=False):
+        """
+        Evaluate all binary masks of a population.
+
+        Parameters
+        ----------
+        population: ndarray, shape (pop_size, d)
+            The population of binary masks.
+        packed: bool, optional
+            Whether the masks are bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+
+        Returns
+        -------
+        fitness: ndarray, shape (pop_size,)
+            The calculated discrimination measure of each individual.
+        """
+        population = np.asarray(population)
+        if self.masked:
+            return self._evaluate_masks(np.array([self._unpack(individual, packed) for individual in population]))
+        if not self.vectorized:
+            return np.array([self._f(self._unpack(individual, packed)) for individual in population], dtype=float)
+
+        return self.evaluate_counts(self.counts(population, packed=packed))
+
+    def counts(self, population, packed=False):
+        """
+        Count the samples and positive labels per group for each binary mask of a population.
+
+        Parameters
+        ----------
+        population: ndarray, shape (pop_size, d)
+            The population of binary masks.
+        packed: bool, optional
+            Whether the masks are bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+            Packed masks are counted with a popcount of the masks and the packed columns of the encoding.
+
+        Returns
+        -------
+        counts: ndarray, shape (pop_size, 2 * n_groups)
+            The group counts of each individual, see :meth:`GroupContingency.from_counts`.
+        """
+        if packed:
+            if self._packed_encoding is None:
+                self._packed_encoding = pack_bits(self._encoding.T)
+            population = np.asarray(population)
+            counts = np.column_stack([popcount(population & column) for column in self._packed_encoding])
+            return counts.astype(self._encoding.dtype) + self._base_counts
+        # like masked_data, only genes equal to 1 select a row
+        population = (np.asarray(population) == 1).astype(self._encoding.dtype)
+        return population @ self._encoding + self._base_counts
+
+    def update_counts(self, counts, origin, population, *flips):
+        """
+        Count the samples and positive labels per group of a population by updating the counts of the individuals
+        it originates from, e.g., the parents, with the contributions of the flipped bits.
+
+        The genetic operators report which individual each offspring originates from and which of its bits differ,
+        see the keyword `return_lineage` of `uniform_crossover` and `fractional_flip_mutation`.
+        The update costs O(n_flips * n_groups), independent of the number of rows.
+        If more than `MAX_SPARSE_FLIPS` of the bits are flipped, or an operator does not list its flipped bits,
+        the population is counted from scratch, which is cheaper then.
+
+        Parameters
+        ----------
+        counts: ndarray, shape (n_reference, 2 * n_groups)
+            The group counts of the reference individuals, e.g., the parents.
+        origin: ndarray, shape (pop_size,)
+            The index of the reference individual of each individual of the population.
+        population: ndarray, shape (pop_size, d)
+            The population of binary masks, e.g., the offspring.
+        *flips: tuple of ndarray
+            The individual and the position of each flipped bit, one pair of arrays per operator,
+            e.g., the crossover and the mutation. Bits that are flipped an even number of times are unchanged,
+            see :func:`fairdo.utils.helper.merge_flips`. A pair of None means that too many bits are
+            flipped to list them.
+
+        Returns
+        -------
+        counts: ndarray, shape (pop_size, 2 * n_groups)
+            The group counts of each individual.
+        """
+        updated = np.asarray(counts)[origin]
+        if any(rows is None for rows, _ in flips):
+            return self.counts(population)
+        n_flips = sum(len(rows) for rows, _ in flips)
+        if n_flips == 0:
+            return updated
+        if n_flips > len(origin) * self._encoding.shape[0] * MAX_SPARSE_FLIPS:
+            return self.counts(population)
+        rows, positions = merge_flips(self._encoding.shape[0], *flips)
+        # +1 for rows added to the reference individual, -1 for removed rows
+        signs = np.where(np.asarray(population)[rows, positions] == 1, 1, -1).astype(self._encoding.dtype)
+        flipped = csr_matrix((signs, (rows, positions)), shape=(len(origin), self._encoding.shape[0]))
+        return updated + flipped @ self._encoding
+
+    def evaluate_counts(self, counts):
+        """
+        Evaluate a population from its group counts.
+        The masks are not needed, i.e., the counts can also be those of candidate solutions that were never
+        materialized as masks, e.g., the moves of :func:`fairdo.optimize.greedy.greedy_method`.
+
+        Parameters
+        ----------
+        counts: ndarray, shape (pop_size, 2 * n_groups)
+            The group counts of each individual, see `counts` and `update_counts`.
+
+        Returns
+        -------
+        fitness: ndarray, shape (pop_size,)
+            The calculated discrimination measure of each individual.
+        """
+        contingency = GroupContingency.from_counts(counts, self._groups)
+        fitness = np.asarray(self.fitness_function(contingency=contingency, dims=self.dims), dtype=float)
+        if self.penalty is not None:
+            fitness = fitness + np.asarray(self.penalty(contingency=contingency), dtype=float)
+        return fitness
+
+    def cells(self):
+        """
+        Group the rows of the searched dataset into cells of rows with the same label and protected attributes.
+        All rows of a cell contribute the same to the group counts, so the fitness only depends on how many
+        rows of each cell are selected.
+
+        Returns
+        -------
+        cell_counts: ndarray, shape (n_cells, 2 * n_groups)
+            The contribution of a single row of each cell to the group counts.
+        cells: ndarray, shape (d,)
+            The cell of each row.
+        """
+        cell_counts, cells = np.unique(self._encoding, axis=0, return_inverse=True)
+        return cell_counts, cells.reshape(-1)
+
+    def contingency(self, population, packed=False):
+        """
+        Count the samples and positive labels per group for each binary mask of a population.
+
+        Parameters
+        ----------
+        population: ndarray, shape (pop_size, d)
+            The population of binary masks.
+
+        packed: bool, optional
+            Whether the masks are bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+
+        Returns
+        -------
+        GroupContingency
+            The batched group counts of all individuals.
+        """
+        return GroupContingency.from_counts(self.counts(population, packed=packed), self._groups)
+
+    def share_memory(self):
+        """
+        Move the datasets and the encoding into shared memory.
+        Pickling the objective, e.g., to send it to worker processes, then transfers references only.
+
+        Returns
+        -------
+        self
+        """
+        if self._shared is None:
+            self._shared = {name: SharedFrame(value) if isinstance(value, pd.DataFrame) else SharedArray(value)
+                            for name, value in self._shareable().items()}
+        return self
+
+    def release_memory(self):
+        """
+        Free the shared memory allocated by `share_memory`. The objective keeps working on its own copy.
+        """
+        if self._shared is not None:
+            for shared in self._shared.values():
+                shared.release()
+            self._shared = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if self._shared is not None:
+            # the shared blocks replace the data, the partial is rebuilt from them
+            for name in self._shared:
+                state.pop(name)
+            state.pop('_f')
+        return state
+
+    def __setstate__(self, state):
+        shared = state.get('_shared')
+        if shared is not None:
+            for name, value in shared.items():
+                state[name] = value.to_frame() if isinstance(value, SharedFrame) else value.array
+        self.__dict__.update(state)
+        if shared is not None:
+            self._f = self._bind()
+
+    def _bind(self):
+        """
+        Bind the data of the objective to `f`.
+        """
+        return partial(f,
+                       dataset=self.dataset,
+                       label=self.label,
+                       protected_attributes=self.protected_attributes,
+                       approach=self.approach,
+                       synthetic_dataset=self.synthetic_dataset,
+                       fitness_function=self.fitness_function,
+                       penalty=self.penalty)
+
+    def _shareable(self):
+        """
+        Attributes holding data proportional to the size of the datasets.
+        """
+        attributes = ['dataset', 'synthetic_dataset', '_encoding', '_y_all', '_z_all']
+        return {name: getattr(self, name) for name in attributes if getattr(self, name, None) is not None}
+
+    def _fit_encoding(self):
+        """
+        Precompute the one-hot encoding of the groups and the positive labels per group.
+        A matrix product of the population with the encoding yields the counts of all individuals.
+        """
+        searched = self.synthetic_dataset if self.approach == 'add' else self.dataset
+        frames = [searched, self.dataset] if self.approach == 'add' else [searched]
+
+        # groups are determined on all rows that may be part of a solution
+        z_all = np.concatenate([frame[self.protected_attributes].to_numpy().astype(int) for frame in frames])
+        self._groups = [np.unique(z_all[:, k]) for k in range(z_all.shape[1])]
+
+        # float32 counts are exact up to 2**24 rows and halve the cost of the matrix product
+        dtype = np.float32 if len(z_all) < 2 ** 24 else np.float64
+        self._encoding, _ = group_encoding(searched[self.label], searched[self.protected_attributes],
+                                           groups=self._groups, dtype=dtype)
+        if self.approach == 'add':
+            base, _ = group_encoding(self.dataset[self.label], self.dataset[self.protected_attributes],
+                                     groups=self._groups, dtype=dtype)
+            self._base_counts = base.sum(axis=0)
+        else:
+            self._base_counts = np.zeros(self._encoding.shape[1], dtype=dtype)
+
+        # packed columns of the encoding, created on demand for packed populations
+        self._packed_encoding = None
+
+    def _fit_mask(self):
+        """
+        Fit the discrimination measure on all rows that may be part of a solution.
+        The penalty is evaluated on the labels and protected attributes of the selected rows.
+        """
+        x, self._y_all, self._z_all, _ = masked_data(np.ones(self.dims), self.dataset, self.label,
+                                                     self.protected_attributes, approach=self.approach,
+                                                     synthetic_dataset=self.synthetic_dataset)
+        if hasattr(self.fitness_function, 'fit'):
+            self.fitness_function.fit(x=x, y=self._y_all, z=self._z_all)
+
+    def _evaluate_masks(self, population):
+        """
+        Evaluate a population of binary masks with a discrimination measure that accepts masks over all rows.
+        The measure receives the 2-D array of masks of the whole population.
+        """
+        masks = population == 1
+        if self.approach == 'add':
+            # the rows of the dataset precede the synthetic rows
+            masks = np.hstack([np.ones((len(masks), len(self.dataset)), dtype=bool), masks])
+        fitness = np.asarray(self.fitness_function(mask=masks, dims=self.dims), dtype=float).reshape(len(masks))
+        if self.penalty is not None:
+            fitness = fitness + [self.penalty(x=None, y=self._y_all[mask], z=self._z_all[mask]) for mask in masks]
+        return fitness
+
+    def _unpack(self, individual, packed):
+        """
+        Binary mask of an individual that may be bit-packed.
+        """
+        return unpack_bits(individual, self.dims) if packed else individual
+
+
+class MultiDatasetObjective:
+    """
+    Several objectives of a multi-objective pre-processor that evaluate the same binary masks.
+
+    The objectives share their work: the group counts of a population are computed once for all vectorized
+    objectives, and the masked dataset of an individual is materialized once for all other objectives.
+    The object behaves like the list of its `DatasetObjective` instances, so it can be passed wherever a list of
+    fitness functions is expected, e.g., to :func:`fairdo.optimize.multi.nsga2`.
+
+    Attributes
+    ----------
+    objectives: list of DatasetObjective
+        One objective per fitness function.
+    vectorized: bool
+        Whether all objectives are vectorized.
+    batched: bool
+        Whether all objectives evaluate whole populations at once, see :attr:`DatasetObjective.batched`.
+    """
+
+    def __init__(self, dataset, label, protected_attributes,
+                 approach='remove',
+                 synthetic_dataset=None,
+                 fitness_functions=(statistical_parity_abs_diff_max,),
+                 penalty=None):
+        """
+        Parameters
+        ----------
+        dataset: pd.DataFrame
+            The data to calculate the discrimination measure on.
+        label: str
+            The column in the dataset to use as the target variable.
+        protected_attributes: Union[str, List[str]]
+            The column or columns in the dataset to consider as protected attributes.
+        approach: str
+            The approach to be used for the heuristic method.
+            It can be either 'remove' or 'add'.
+        synthetic_dataset: pd.DataFrame, optional
+            Extra samples to be added to the original data. Samples can be synthetic data.
+            It is required only if the 'add' approach is used.
+        fitness_functions: list of callable, optional (default=(statistical_parity_abs_diff_max,))
+            The objectives. Each takes in x (features), y (labels), and z (protected attributes) and returns a
+            numeric value.
+        penalty: callable, optional (default=None)
+            A function that takes a dictionary of keyword arguments and returns a numeric value.
+            It is added to every objective.
+        """
+        self.objectives = [DatasetObjective(dataset=dataset,
+                                            label=label,
+                                            protected_attributes=protected_attributes,
+                                            approach=approach,
+                                            synthetic_dataset=synthetic_dataset,
+                                            fitness_function=fitness_function,
+                                            penalty=penalty) for fitness_function in fitness_functions]
+        vectorized = [objective for objective in self.objectives if objective.vectorized]
+        # vectorized objectives share the encoding of the first one
+        for objective in vectorized[1:]:
+            for name in ['_groups', '_encoding', '_base_counts', '_packed_encoding']:
+                setattr(objective, name, getattr(vectorized[0], name))
+        self.vectorized = len(vectorized) == len(self.objectives)
+        self.batched = all(objective.batched for objective in self.objectives)
+        self.dims = self.objectives[0].dims if self.objectives else None
+
+    def __len__(self):
+        return len(self.objectives)
+
+    def __getitem__(self, index):
+        return self.objectives[index]
+
+    def __iter__(self):
+        return iter(self.objectives)
+
+    def __call__(self, binary_vector):
+        """
+        Evaluate all objectives on a single binary mask.
+
+        Parameters
+        ----------
+        binary_vector: np.array
+            Binary vector indicating which rows to include in the discrimination measure calculation.
+
+        Returns
+        -------
+        ndarray, shape (n_objectives,)
+            The value of each objective.
+        """
+        return self.evaluate_population(np.asarray(binary_vector).reshape(1, -1))[0]
+
+    def evaluate_population(self, population, packed=False):
+        """
+        Evaluate all objectives on all binary masks of a population.
+
+        Parameters
+        ----------
+        population: ndarray, shape (pop_size, d)
+            The population of binary masks.
+        packed: bool, optional
+            Whether the masks are bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+
+        Returns
+        -------
+        fitness_values: ndarray, shape (pop_size, n_objectives)
+            The value of each objective for each individual.
+        """
+        population = np.asarray(population)
+        fitness_values = np.empty((len(population), len(self.objectives)))
+        vectorized = [i for i, objective in enumerate(self.objectives) if objective.vectorized]
+        if vectorized:
+            counts = self.objectives[vectorized[0]].counts(population, packed=packed)
+            for i in vectorized:
+                fitness_values[:, i] = self.objectives[i].evaluate_counts(counts)
+
+        masked = [i for i, objective in enumerate(self.objectives) if objective.masked]
+        for i in masked:
+            fitness_values[:, i] = self.objectives[i].evaluate_population(population, packed=packed)
+
+        materialized = [i for i, objective in enumerate(self.objectives)
+                        if not objective.vectorized and not objective.masked]
+        if materialized:
+            first = self.objectives[materialized[0]]
+            for j, individual in enumerate(population):
+                x, y, z, dims = masked_data(first._unpack(individual, packed), first.dataset, first.label, first.protected_attributes,
+                                            approach=first.approach, synthetic_dataset=first.synthetic_dataset)
+                for i in materialized:
+                    fitness_values[j, i] = _apply(self.objectives[i].fitness_function, self.objectives[i].penalty,
+                                                  x, y, z, dims)
+        return fitness_values
+
+    def share_memory(self):
+        """
+        Move the data of all objectives into shared memory, see :meth:`DatasetObjective.share_memory`.
+
+        Returns
+        -------
+        self
+        """
+        for objective in self.objectives:
+            objective.share_memory()
+        return self
+
+    def release_memory(self):
+        """
+        Free the shared memory of all objectives.
+        """
+        for objective in self.objectives:
+            objective.release_memory()
+
+
+class CompressedObjective:
+    """
+    Objective over the number of selected rows of each group of interchangeable rows.
+
+    Rows are interchangeable if they are identical, or, for objectives that only depend on the group counts
+    (``objective.incremental``), if they have the same label and protected attributes.
+    Instead of one bit per row, the number of selected rows of a group of `m` rows is encoded in binary with
+    ``m.bit_length()`` bits and scaled to `0, ..., m`.
+    This shrinks the number of dimensions from the number of rows to roughly
+    ``n_row_groups * log2(rows per group)``, and any binary solver searches the counts per group.
+    `expand` turns a solution into a binary mask over the rows.
+
+    Attributes
+    ----------
+    objective: DatasetObjective
+        The objective over the rows.
+    by: str
+        Either 'cells' (rows with the same label and protected attributes) or 'rows' (identical rows).
+    dims: int
+        The number of dimensions of a compressed binary vector.
+    sizes: ndarray, shape (n_row_groups,)
+        The number of rows of each group.
+    vectorized: bool
+        Whether whole populations are evaluated from group counts, see :meth:`DatasetObjective.evaluate_population`.
+    batched: bool
+        Whether whole populations are evaluated at once, see :attr:`DatasetObjective.batched`.
+    """
+
+    def __init__(self, objective, by=None, random_state=None):
+        """
+        Parameters
+        ----------
+        objective: DatasetObjective
+            The objective over the rows.
+        by: str, optional
+            Either 'cells' or 'rows'. Default is 'cells' if the objective only depends on the group counts,
+            otherwise 'rows'.
+        random_state: None, int or np.random.Generator, optional
+            The random state that orders the rows of each group, see :func:`fairdo.utils.helper.check_random_state`.
+            Default is None.
+        """
+        if by is None:
+            by = 'cells' if objective.incremental else 'rows'
+        if by == 'cells':
+            if not objective.incremental:
+                raise ValueError('Compressing by cells requires an objective that only depends on the group counts.')
+            self._group_counts, groups = objective.cells()
+        elif by == 'rows':
+            searched = objective.synthetic_dataset if objective.approach == 'add' else objective.dataset
+            groups = searched.groupby(list(searched.columns), sort=False, dropna=False).ngroup().to_numpy()
+            self._group_counts = None
+        else:
+            raise ValueError('Invalid compression. It can be either \'cells\' or \'rows\'.')
+        self.objective = objective
+        self.by = by
+        self.groups = groups
+        self.sizes = np.bincount(groups)
+        self.vectorized = objective.vectorized
+        self.batched = objective.batched
+        self.incremental = False
+
+        # bit j of a group is worth 2 ** j
+        n_bits = np.array([int(size).bit_length() for size in self.sizes])
+        self.dims = int(n_bits.sum())
+        self._starts = np.concatenate([[0], np.cumsum(n_bits)[:-1]])
+        self._weights = 2.0 ** (np.arange(self.dims) - np.repeat(self._starts, n_bits))
+        self._max_values = 2.0 ** n_bits - 1
+        # the rows of each group in random order
+        self._order = np.lexsort((check_random_state(random_state).random(len(groups)), groups))
+        self._base_counts = objective.counts(np.zeros((1, objective.dims)))[0] if by == 'cells' else None
+
+    def __call__(self, binary_vector):
+        """
+        Evaluate a single compressed binary vector.
+
+        Parameters
+        ----------
+        binary_vector: np.array
+            Compressed binary vector, see `decode`.
+
+        Returns
+        -------
+        float
+            The calculated discrimination measure.
+        """
+        return self.evaluate_population(np.asarray(binary_vector).reshape(1, -1))[0]
+
+    def evaluate_population(self, population, packed=False):
+        """
+        Evaluate all compressed binary vectors of a population.
+
+        Parameters
+        ----------
+        population: ndarray, shape (pop_size, dims)
+            The population of compressed binary vectors.
+        packed: bool, optional
+            Whether the vectors are bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+
+        Returns
+        -------
+        fitness: ndarray, shape (pop_size,)
+            The calculated discrimination measure of each individual.
+        """
+        kept = self.decode(population, packed=packed)
+        if self.by == 'cells':
+            # the group counts follow from the counts per cell, no mask over the rows is needed
+            return self.objective.evaluate_counts(self._base_counts + kept @ self._group_counts)
+        return np.asarray(self.objective.evaluate_population(self._expand(kept)), dtype=float)
+
+    def decode(self, population, packed=False):
+        """
+        Number of selected rows of each group.
+
+        Parameters
+        ----------
+        population: ndarray, shape (pop_size, dims) or (dims,)
+            Compressed binary vectors.
+        packed: bool, optional
+            Whether the vectors are bit-packed with :func:`fairdo.utils.helper.pack_bits`. Default is False.
+
+        Returns
+        -------
+        kept: ndarray, shape (pop_size, n_row_groups) or (n_row_groups,)
+            The number of selected rows of each group.
+        """
+        population = unpack_bits(population, self.dims) if packed else np.asarray(population)
+        values = np.add.reduceat(population * self._weights, self._starts, axis=-1)
+        return np.rint(values * self.sizes / self._max_values).astype(np.int64)
+
+    def expand(self, binary_vector):
+        """
+        Binary mask over the rows that selects the rows encoded by a compressed binary vector.
+
+        Parameters
+        ----------
+        binary_vector: np.array
+            Compressed binary vector.
+
+        Returns
+        -------
+        np.array, shape (objective.dims,)
+            Binary mask over the rows of the dataset.
+        """
+        return self._expand(self.decode(binary_vector)[np.newaxis])[0]
+
+    def _expand(self, kept):
+        """
+        Binary masks of the rows for the number of selected rows of each group.
+        """
+        return np.array([select_cell_rows(self.groups, k, self._order) for k in kept])
+
+    def share_memory(self):
+        """
+        Move the data of the objective into shared memory, see :meth:`DatasetObjective.share_memory`.
+
+        Returns
+        -------
+        self
+        """
+        self.objective.share_memory()
+        return self
+
+    def release_memory(self):
+        """
+        Free the shared memory of the objective.
+        """
+        self.objective.release_memory()
+
+
+def accepts_contingency(func):
+    """
+    Check whether a discrimination measure can be evaluated on a `GroupContingency`,
+    i.e., whether it has the keyword argument `contingency`.
+
+    Parameters
+    ----------
+    func: callable
+        The discrimination measure.
+
+    Returns
+    -------
+    bool
+    """
+    try:
+        return 'contingency' in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def accepts_mask(func):
+    """
+    Check whether a discrimination measure can be evaluated on binary masks over all rows,
+    i.e., whether it has the keyword argument `mask`. Such a measure returns one value per row of a 2-D mask.
+
+    Parameters
+    ----------
+    func: callable
+        The discrimination measure.
+
+    Returns
+    -------
+    bool
+    """
+    try:
+        return 'mask' in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def f(binary_vector, dataset, label, protected_attributes,
+      approach='remove',
+      synthetic_dataset=None,
+      fitness_function=statistical_parity_abs_diff_max,
+      penalty=None):
+    """
+    Two different approaches can be used for the heuristic method:
+    1. 'remove': The data points from the given `dataset` are removed to promote fairness.
+    2. 'add': Additional samples are added to the original data to promote fairness.
+    The sample data can be synthetic data.
+    Approach addresses this question: Which of the data points from the `synthetic_dataframe` should be added to the
+    original data to prevent discrimination?
+
+    Parameters
+    ----------
+    binary_vector: np.array
+        Binary vector indicating which columns to include in the discrimination measure calculation.
+    dataset: pd.DataFrame
+        The data to calculate the discrimination measure on.
+    label: str
+        The column in the dataset to use as the target variable.
+    protected_attributes: Union[str, List[str]]
+        The column or columns in the dataset to consider as protected attributes.
+    approach: str
+        The approach to be used for the heuristic method.
+        It can be either 'remove' or 'add'.
+    synthetic_dataset: pd.DataFrame, optional
+        Extra samples to be added to the original data. Samples can be synthetic data.
+        It is required only if the 'add' approach is used.
+    fitness_function: callable, optional (default=statistical_parity_abs_diff_max)
+        A function that takes in x (features), y (labels), and z (protected attributes) and returns a numeric value.
+        Default is `statistical_parity_abs_diff_max` which is the absolute difference between the maximum and minimum statistical parity values.
+    penalty: callable, optional (default=None)
+        A function that takes a dictionary of keyword arguments and returns a numeric value.
+        This function is used to penalize the discrimination loss.
+        Default is None which means no penalty is applied.
+
+    Returns
+    -------
+    float
+        The calculated discrimination measure.
+    """
+    x, y, z, dims = masked_data(binary_vector, dataset, label, protected_attributes,
+                                approach=approach, synthetic_dataset=synthetic_dataset)
+    return _apply(fitness_function, penalty, x, y, z, dims)
+
+
+def masked_data(binary_vector, dataset, label, protected_attributes,
+                approach='remove',
+                synthetic_dataset=None):
+    """
+    Materialize the dataset selected by a binary mask and split it into features, labels and protected attributes.
+
+    Parameters
+    ----------
+    binary_vector: np.array
+        Binary vector indicating which rows to include.
+    dataset: pd.DataFrame
+        The original data.
+    label: str
+        The column in the dataset to use as the target variable.
+    protected_attributes: Union[str, List[str]]
+        The column or columns in the dataset to consider as protected attributes.
+    approach: str
+        Either 'remove' (the mask selects rows of `dataset`) or 'add' (the mask selects rows of `synthetic_dataset`
+        that are added to `dataset`).
+    synthetic_dataset: pd.DataFrame, optional
+        Extra samples to be added to the original data. It is required only if the 'add' approach is used.
+
+    Returns
+    -------
+    x: pd.DataFrame
+        The features of the masked dataset.
+    y: np.array
+        The labels of the masked dataset.
+    z: np.array
+        The protected attributes of the masked dataset. Flattened if there is only one protected attribute.
+    dims: int
+        The length of the binary vector.
+    """
+    if isinstance(protected_attributes, str):
+        protected_attributes = [protected_attributes]
+
+    # Create mask
+    mask = np.array(binary_vector) == 1
+
+    if approach == 'add' and synthetic_dataset is not None:
+        # mask on sample data
+        synthetic_dataset = synthetic_dataset[mask]
+
+        # concatenate synthetic data with original data
+        dataset = pd.concat([dataset, synthetic_dataset], axis=0)
+    elif approach == 'remove':
+        # only keep the columns that are selected by the heuristic
+        dataset = dataset[mask]
+    else:
+        raise ValueError('Invalid approach. It can be either \'remove\' or \'add\'.')
+
+    # evaluate on masked dataset
+    y = dataset[label]
+    z = dataset[protected_attributes]
+    cols_to_drop = protected_attributes + [label]
+    x = dataset.drop(columns=cols_to_drop)
+
+    # We handle multiple protected attributes by not flattening the z array
+    y = y.to_numpy().flatten()
+    z = z.to_numpy()
+    if len(protected_attributes) == 1:
+        z = z.flatten()
+    return x, y, z, len(mask)
+
+
+def _apply(fitness_function, penalty, x, y, z, dims):
+    """
+    Evaluate a discrimination measure and its penalty on a materialized dataset.
+    """
+    if penalty is not None:
+        return fitness_function(x=x, y=y, z=z, dims=dims) + penalty(x=x, y=y, z=z)
+    else:
+        return fitness_function(x=x, y=y, z=z)
@@ -1,4 +1,5 @@
 # Standard library imports
+import inspect
 from functools import partial
 
 # Related third-party imports
@@ -12,6 +13,9 @@ from fairdo.optimize import genetic_algorithm
 # fairdo metrics
 from fairdo.metrics import statistical_parity_abs_diff_max, data_loss
 from fairdo.metrics.penalty import group_missing_penalty
+from fairdo.preprocessing.objective import CompressedObjective, DatasetObjective, MultiDatasetObjective
+# `f` moved to fairdo.preprocessing.objective, re-exported for code that imports it from here
+from fairdo.preprocessing.objective import f  # noqa: F401
 
 
 class MultiObjectiveWrapper(Preprocessing):
@@ -33,7 +37,7 @@ class MultiObjectiveWrapper(Preprocessing):
         It returns solutions in the Pareto front and their corresponding fitness values.
         All fronts can be returned if requested.
         The solution has a shape of `(n, dims)` where `n` is the number of solutions and `dims` is the number of dimensions.
-    funcs: callable
+    funcs: MultiDatasetObjective
         List of objective function to be minimized. Wrapper for user-given `fitness_functions`.
         It is defined within the `fit`
         method.
@@ -130,14 +134,13 @@ class MultiObjectiveWrapper(Preprocessing):
         penalty = partial(group_missing_penalty,
                           n_groups=n_groups)
 
-        self.funcs = [partial(f,
-                              dataset=self.dataset,
-                              label=self.label,
-                              protected_attributes=self.protected_attribute,
-                              approach=approach,
-                              synthetic_dataset=self.synthetic_dataset,
-                              fitness_function=fitness_function,
-                              penalty=penalty) for fitness_function in self.fitness_functions]
+        self.funcs = MultiDatasetObjective(dataset=self.dataset,
+                                           label=self.label,
+                                           protected_attributes=self.protected_attribute,
+                                           approach=approach,
+                                           synthetic_dataset=self.synthetic_dataset,
+                                           fitness_functions=self.fitness_functions,
+                                           penalty=penalty)
 
         return self
     
@@ -241,6 +244,11 @@ class HeuristicWrapper(Preprocessing):
         (y), and protected attributes (z) and returns a numeric value.
     dataset: pd.DataFrame
         The dataset to be preprocessed. It is defined within the `fit` method.
+    n_keep: int or float
+        The number of selected rows, or their fraction of `dims` if float. None if the size is not fixed.
+    compress: bool or str
+        Whether the heuristic searches the number of selected rows per group of interchangeable rows,
+        see :class:`fairdo.preprocessing.objective.CompressedObjective`.
     """
 
     def __init__(self,
@@ -248,6 +256,8 @@ class HeuristicWrapper(Preprocessing):
                  protected_attribute,
                  label,
                  disc_measure=statistical_parity_abs_diff_max,
+                 n_keep=None,
+                 compress=False,
                  **kwargs):
         """
         Constructs all the necessary attributes for the HeuristicWrapper object.
@@ -264,6 +274,17 @@ class HeuristicWrapper(Preprocessing):
             The discrimination measure to be optimized.
             Default is `statistical_parity_abs_diff_max` which is the absolute difference between the maximum and
             minimum statistical parity values.
+        n_keep: int or float, optional (default=None)
+            If given, the heuristic selects exactly this number of rows, e.g., with
+            :func:`fairdo.optimize.genetic_algorithm`. A float between 0 and 1 is the fraction of rows to select.
+            The heuristic must accept the keyword argument `n_keep`.
+        compress: bool or str, optional (default=False)
+            If True, interchangeable rows are collapsed into groups and the heuristic searches the number of
+            selected rows per group instead of one bit per row, see
+            :class:`fairdo.preprocessing.objective.CompressedObjective`.
+            Rows are interchangeable if they have the same label and protected attributes and the
+            discrimination measure only depends on those, otherwise if they are identical.
+            Use 'cells' or 'rows' to choose the grouping. Cannot be combined with `n_keep`.
         kwargs: dict
             Additional arguments for the heuristic method.
         """
@@ -271,6 +292,10 @@ class HeuristicWrapper(Preprocessing):
         self.func = None
         self.dims = None
         self.disc_measure = disc_measure
+        self.n_keep = n_keep
+        self.compress = compress
+        if n_keep is not None and compress:
+            raise ValueError('n_keep cannot be combined with compress.')
 
         # required by Preprocessing
         self.dataset = None
@@ -319,14 +344,16 @@ class HeuristicWrapper(Preprocessing):
         penalty = partial(group_missing_penalty,
                           n_groups=n_groups)
 
-        self.func = partial(f,
-                            dataset=self.dataset,
-                            label=self.label,
-                            protected_attributes=self.protected_attribute,
-                            approach=approach,
-                            synthetic_dataset=self.synthetic_dataset,
-                            fitness_function=self.disc_measure,
-                            penalty=penalty)
+        self.func = DatasetObjective(dataset=self.dataset,
+                                     label=self.label,
+                                     protected_attributes=self.protected_attribute,
+                                     approach=approach,
+                                     synthetic_dataset=self.synthetic_dataset,
+                                     fitness_function=self.disc_measure,
+                                     penalty=penalty)
+        if self.compress:
+            self.func = CompressedObjective(self.func, by=None if self.compress is True else self.compress)
+            self.dims = self.func.dims
 
         return self
 
@@ -339,7 +366,13 @@ class HeuristicWrapper(Preprocessing):
         pd.DataFrame
             The preprocessed (fair) dataset.
         """
-        mask = self.heuristic(f=self.func, d=self.dims)[0] == 1
+        kwargs = {}
+        if self.n_keep is not None:
+            kwargs['n_keep'] = self.size()
+        solution = self.heuristic(f=self.func, d=self.dims, **kwargs)[0]
+        if self.compress:
+            solution = self.func.expand(solution)
+        mask = solution == 1
 
         # apply the mask to the dataset
         if self.approach == 'add':
@@ -349,6 +382,21 @@ class HeuristicWrapper(Preprocessing):
 
         return self.transformed_data
 
+    def size(self):
+        """
+        The number of rows the heuristic selects, i.e., `n_keep` as a number of rows.
+
+        Returns
+        -------
+        int or None
+            The number of selected rows, or None if the size is not fixed.
+        """
+        if self.n_keep is None:
+            return None
+        if isinstance(self.n_keep, float):
+            return int(round(self.n_keep * self.dims))
+        return int(self.n_keep)
+
 
 class DefaultPreprocessing(HeuristicWrapper):
     """
@@ -383,6 +431,11 @@ class DefaultPreprocessing(HeuristicWrapper):
                  disc_measure=statistical_parity_abs_diff_max,
                  pop_size=100,
                  num_generations=500,
+                 random_state=None,
+                 max_time=None,
+                 max_evaluations=None,
+                 target_fitness=None,
+                 n_keep=None,
                  **kwargs):
         """
         Constructs all the necessary attributes for the HeuristicWrapper object.
@@ -401,93 +454,48 @@ class DefaultPreprocessing(HeuristicWrapper):
             The population size for the genetic algorithm.
         num_generations: int, optional (default=500)
             The number of generations for the genetic algorithm.
+        random_state: None, int or np.random.Generator, optional (default=None)
+            The random state of the genetic algorithm.
+        max_time: float, optional (default=None)
+            The maximum run time of the genetic algorithm in seconds.
+        max_evaluations: int, optional (default=None)
+            The maximum number of fitness evaluations of the genetic algorithm.
+        target_fitness: float, optional (default=None)
+            The genetic algorithm stops as soon as the discrimination is at most `target_fitness`.
+        n_keep: int or float, optional (default=None)
+            The number of rows to select, or their fraction if float. Default is None, i.e., any number of rows.
         kwargs: dict
-            Additional arguments for the heuristic method.
+            Additional arguments of :class:`HeuristicWrapper`, e.g., `compress`, or of
+            :func:`fairdo.optimize.genetic_algorithm`, e.g., `patience` or `cache`.
+
+        Raises
+        ------
+        TypeError
+            If a keyword argument is accepted by neither of them.
         """
+        # the arguments that are not set by DefaultPreprocessing itself
+        wrapper_parameters = (set(inspect.signature(HeuristicWrapper.__init__).parameters)
+                              - {'self', 'heuristic', 'kwargs'})
+        heuristic_parameters = set(inspect.signature(genetic_algorithm).parameters) - {'f', 'd'}
+        wrapper_kwargs = {key: value for key, value in kwargs.items() if key in wrapper_parameters}
+        heuristic_kwargs = {key: value for key, value in kwargs.items()
+                            if key in heuristic_parameters and key not in wrapper_kwargs}
+        unknown = set(kwargs) - set(wrapper_kwargs) - set(heuristic_kwargs)
+        if unknown:
+            raise TypeError(f'Unexpected keyword arguments: {", ".join(sorted(unknown))}')
         # set default heuristic method
         heuristic = partial(genetic_algorithm,
                             pop_size=pop_size,
-                            num_generations=num_generations)
+                            num_generations=num_generations,
+                            random_state=random_state,
+                            max_time=max_time,
+                            max_evaluations=max_evaluations,
+                            target_fitness=target_fitness,
+                            **heuristic_kwargs)
         super().__init__(heuristic=heuristic,
                          protected_attribute=protected_attribute,
                          label=label,
-                         disc_measure=disc_measure)
-
+                         disc_measure=disc_measure,
+                         n_keep=n_keep,
+                         **wrapper_kwargs)
 
-def f(binary_vector, dataset, label, protected_attributes,
-      approach='remove',
-      synthetic_dataset=None,
-      fitness_function=statistical_parity_abs_diff_max,
-      penalty=None):
-    """
-    Two different approaches can be used for the heuristic method:
-    1. 'remove': The data points from the given `dataset` are removed to promote fairness.
-    2. 'add': Additional samples are added to the original data to promote fairness.
-    The sample data can be synthetic data.
-    Approach addresses this question: Which of the data points from the `synthetic_dataframe` should be added to the
-    original data to prevent discrimination?
-
-    Parameters
-    ----------
-    binary_vector: np.array
-        Binary vector indicating which columns to include in the discrimination measure calculation.
-    dataset: pd.DataFrame
-        The data to calculate the discrimination measure on.
-    label: str
-        The column in the dataset to use as the target variable.
-    protected_attributes: Union[str, List[str]]
-        The column or columns in the dataset to consider as protected attributes.
-    approach: str
-        The approach to be used for the heuristic method.
-        It can be either 'remove' or 'add'.
-    synthetic_dataset: pd.DataFrame, optional
-        Extra samples to be added to the original data. Samples can be synthetic data.
-        It is required only if the 'add' approach is used.
-    fitness_function: callable, optional (default=statistical_parity_abs_diff_max)
-        A function that takes in x (features), y (labels), and z (protected attributes) and returns a numeric value.
-        Default is `statistical_parity_abs_diff_max` which is the absolute difference between the maximum and minimum statistical parity values.
-    penalty: callable, optional (default=None)
-        A function that takes a dictionary of keyword arguments and returns a numeric value.
-        This function is used to penalize the discrimination loss.
-        Default is None which means no penalty is applied.
-
-    Returns
-    -------
-    float
-        The calculated discrimination measure.
-    """
-    if isinstance(protected_attributes, str):
-        protected_attributes = [protected_attributes]
-
-    # Create mask
-    mask = np.array(binary_vector) == 1
-
-    if approach == 'add' and synthetic_dataset is not None:
-        # mask on sample data
-        synthetic_dataset = synthetic_dataset[mask]
-
-        # concatenate synthetic data with original data
-        dataset = pd.concat([dataset, synthetic_dataset], axis=0)
-    elif approach == 'remove':
-        # only keep the columns that are selected by the heuristic
-        dataset = dataset[mask]
-    else:
-        raise ValueError('Invalid approach. It can be either \'remove\' or \'add\'.')
-
-    # evaluate on masked dataset
-    y = dataset[label]
-    z = dataset[protected_attributes]
-    cols_to_drop = protected_attributes + [label]
-    x = dataset.drop(columns=cols_to_drop)
-
-    # We handle multiple protected attributes by not flattening the z array
-    y = y.to_numpy().flatten()
-    z = z.to_numpy()
-    if len(protected_attributes) == 1:
-        z = z.flatten()
-
-    if penalty is not None:
-        return fitness_function(x=x, y=y, z=z, dims=len(mask)) + penalty(x=x, y=y, z=z)
-    else:
-        return fitness_function(x=x, y=y, z=z)
-    
\ No newline at end of file
@@ -1,3 +1,5 @@
+import inspect
+from functools import partial
 from itertools import combinations
 import numpy as np
 # Attempt to import (optional) sdv libraries
@@ -60,6 +62,238 @@ def generate_pairs(lst):
     return list(combinations(lst, 2))
 
 
+def pack_bits(a):
+    """
+    Pack a binary array of shape (n, d) into bits.
+    The bits of each row are padded with zeros to whole 64-bit words,
+    i.e., the result is an uint8 array of shape (n, 8 * ceil(d / 64)).
+
+    Parameters
+    ----------
+    a: np.array
+        Binary array of shape (n, d) or (d,).
+
+    Returns
+    -------
+    np.array
+        The packed array.
+    """
+    packed = np.packbits(np.asarray(a).astype(bool, copy=False), axis=-1)
+    padding = -packed.shape[-1] % 8
+    if padding:
+        packed = np.concatenate([packed, np.zeros(packed.shape[:-1] + (padding,), dtype=np.uint8)], axis=-1)
+    return packed
+
+
+def unpack_bits(a, d):
+    """
+    Unpack an array packed with `pack_bits`.
+
+    Parameters
+    ----------
+    a: np.array
+        Packed uint8 array of shape (n, 8 * ceil(d / 64)) or (8 * ceil(d / 64),).
+    d: int
+        The number of bits of each row.
+
+    Returns
+    -------
+    np.array
+        Binary uint8 array of shape (n, d) or (d,).
+    """
+    return np.unpackbits(a, axis=-1, count=d)
+
+
+def popcount(a):
+    """
+    Count the set bits of each row of an array packed with `pack_bits`.
+
+    Parameters
+    ----------
+    a: np.array
+        Packed uint8 array of shape (n, 8 * k) or (8 * k,).
+
+    Returns
+    -------
+    np.array
+        The number of set bits of each row.
+    """
+    # count the bits of 64-bit words in parallel (SWAR)
+    x = np.ascontiguousarray(a).view(np.uint64)
+    x = x - ((x >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    x = (x & np.uint64(0x3333333333333333)) + ((x >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    x = (x + (x >> np.uint64(4))) & np.uint64(0x0f0f0f0f0f0f0f0f)
+    x = (x * np.uint64(0x0101010101010101)) >> np.uint64(56)
+    return x.sum(axis=-1, dtype=np.int64)
+
+
+def select_cell_rows(cells, kept, order):
+    """
+    Binary vector that selects the first `kept[c]` rows of each cell `c` in the given order.
+
+    Parameters
+    ----------
+    cells: ndarray, shape (d,)
+        The cell of each row, see :meth:`fairdo.preprocessing.objective.DatasetObjective.cells`.
+    kept: ndarray, shape (n_cells,)
+        The number of selected rows of each cell.
+    order: ndarray, shape (d,)
+        The rows sorted by cell, e.g., ``np.lexsort((rng.random(d), cells))`` for random rows of each cell.
+
+    Returns
+    -------
+    solution: ndarray, shape (d,)
+        The binary vector.
+    """
+    sizes = np.bincount(cells, minlength=len(kept))
+    starts = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+    sorted_cells = cells[order]
+    solution = np.zeros(len(cells), dtype=int)
+    solution[order] = np.arange(len(cells)) - starts[sorted_cells] < kept[sorted_cells]
+    return solution
+
+
+# largest fraction of flipped bits for which updating the counts of the parents is cheaper than counting
+# the offspring from scratch
+MAX_SPARSE_FLIPS = 1 / 32
+
+
+def merge_flips(d, *flips):
+    """
+    Merge the bits flipped by several operators. Bits that are flipped an even number of times are unchanged.
+
+    Parameters
+    ----------
+    d: int
+        The number of dimensions.
+    *flips: tuple of ndarray
+        The individual and the position of each flipped bit, one pair of arrays per operator.
+
+    Returns
+    -------
+    rows, positions: ndarray
+        The individual and the position of each changed bit.
+    """
+    keys = np.concatenate([np.asarray(rows, dtype=np.int64) * d + positions for rows, positions in flips])
+    keys, times = np.unique(keys, return_counts=True)
+    keys = keys[times % 2 == 1]
+    return keys // d, keys % d
+
+
+def check_random_state(random_state=None):
+    """
+    Turn `random_state` into a numpy random Generator.
+
+    Parameters
+    ----------
+    random_state: None, int, array_like, np.random.SeedSequence, np.random.BitGenerator or np.random.Generator
+        If None, a Generator is seeded from numpy's global random state, i.e., ``np.random.seed`` still makes
+        the results reproducible.
+        If a Generator, it is returned as is, which allows other bit generators,
+        e.g., ``np.random.Generator(np.random.PCG64DXSM(seed))``.
+        Otherwise, it is passed to ``np.random.default_rng``.
+
+    Returns
+    -------
+    np.random.Generator
+    """
+    if isinstance(random_state, np.random.Generator):
+        return random_state
+    if random_state is None:
+        return np.random.default_rng(np.random.randint(2 ** 31, size=4))
+    return np.random.default_rng(random_state)
+
+
+def spawn_random_states(random_state, n):
+    """
+    Create `n` independent Generators from a random state, e.g., one per worker or per chunk of work.
+    The children are spawned from the seed sequence of the random state, which does not change the numbers
+    it draws afterwards.
+
+    Parameters
+    ----------
+    random_state: None, int or np.random.Generator
+        The parent random state, see `check_random_state`.
+    n: int
+        The number of Generators.
+
+    Returns
+    -------
+    list of np.random.Generator
+    """
+    rng = check_random_state(random_state)
+    bit_generator = type(rng.bit_generator)
+    seed_sequence = getattr(rng.bit_generator, 'seed_seq', getattr(rng.bit_generator, '_seed_seq', None))
+    if not isinstance(seed_sequence, np.random.SeedSequence):
+        # bit generators without a seed sequence, e.g., restored from a state
+        seed_sequence = np.random.SeedSequence(rng.integers(2 ** 63, size=4))
+    return [np.random.Generator(bit_generator(child)) for child in seed_sequence.spawn(n)]
+
+
+def is_batched(f):
+    """
+    Whether a fitness function evaluates whole populations at once with its method ``evaluate_population``,
+    i.e., it has the attribute ``batched=True`` or ``vectorized=True``.
+    Batched fitness functions are not distributed to worker processes.
+
+    Parameters
+    ----------
+    f: callable
+        The fitness function.
+
+    Returns
+    -------
+    bool
+    """
+    return bool(getattr(f, 'batched', False) or getattr(f, 'vectorized', False))
+
+
+def bind_random_state(func, random_state):
+    """
+    Bind a random state to a function if it has the keyword argument `random_state`.
+
+    Parameters
+    ----------
+    func: callable
+        The function, e.g., a genetic operator.
+    random_state: np.random.Generator
+        The random state.
+
+    Returns
+    -------
+    callable
+        The function with `random_state` bound, or `func` if it has no keyword argument `random_state`.
+    """
+    return bind_keyword(func, 'random_state', random_state)
+
+
+def bind_keyword(func, name, value):
+    """
+    Bind a value to a function if it has the keyword argument `name`.
+
+    Parameters
+    ----------
+    func: callable
+        The function, e.g., a genetic operator.
+    name: str
+        The name of the keyword argument, e.g., `random_state` or `n_keep`.
+    value: object
+        The value to bind.
+
+    Returns
+    -------
+    callable
+        The function with `name` bound, or `func` if it has no keyword argument `name`.
+    """
+    try:
+        parameters = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return func
+    if name not in parameters:
+        return func
+    return partial(func, **{name: value})
+
+
 def generate_data(data, num_rows=100):
     """
     Generate synthetic data using the sdv library.
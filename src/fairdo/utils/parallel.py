@@ -0,0 +1,287 @@
+"""
+Parallel Evaluation
+===================
+
+This module provides the machinery to evaluate populations in worker processes.
+
+`EvaluationPool` is a pool of worker processes that lives as long as an optimizer run.
+The fitness function is sent to each worker once, when the worker starts,
+and the workers only receive chunks of the population afterwards.
+Fitness functions that release the GIL, e.g., numpy-heavy objectives, can use a pool of threads instead.
+
+`SharedArray` and `SharedFrame` place numpy arrays and data frames in shared memory
+(:mod:`multiprocessing.shared_memory`). When pickled, they only transfer the name of the shared memory block,
+so that the workers attach to the data instead of receiving a copy.
+Fitness functions that hold a dataset can implement ``share_memory()`` and ``release_memory()``
+to move their data into shared memory while a pool is open,
+see :class:`fairdo.preprocessing.objective.DatasetObjective`.
+
+Stochastic fitness functions are reproducible in worker processes if the pool has a random state:
+every chunk of a population gets its own random stream spawned from it,
+and the global numpy random state of the worker is seeded from that stream before the chunk is evaluated.
+"""
+import inspect
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pathos.multiprocessing as mp
+# the shared memory of the multiprocessing fork used by pathos shares its resource tracker with the workers
+from multiprocess import shared_memory
+
+from fairdo.utils.helper import check_random_state, spawn_random_states, unpack_bits
+
+
+class SharedArray:
+    """
+    A numpy array in shared memory. Pickling transfers a reference to the shared memory instead of the data.
+
+    Attributes
+    ----------
+    array: ndarray
+        View of the shared memory.
+    """
+
+    def __init__(self, array):
+        """
+        Parameters
+        ----------
+        array: ndarray
+            The array to copy into shared memory.
+        """
+        array = np.ascontiguousarray(array)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._owner = True
+        self.array = np.ndarray(array.shape, dtype=array.dtype, buffer=self._shm.buf)
+        self.array[...] = array
+
+    def __getstate__(self):
+        return {'name': self._shm.name, 'shape': self.array.shape, 'dtype': self.array.dtype.str}
+
+    def __setstate__(self, state):
+        self._shm = shared_memory.SharedMemory(name=state['name'])
+        self._owner = False
+        self.array = np.ndarray(state['shape'], dtype=np.dtype(state['dtype']), buffer=self._shm.buf)
+
+    def release(self):
+        """
+        Detach from the shared memory. The process that created the array also frees it.
+        """
+        self.array = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+
+class SharedFrame:
+    """
+    A data frame whose columns are stored in shared memory, one block per data type.
+    """
+
+    def __init__(self, frame):
+        """
+        Parameters
+        ----------
+        frame: pd.DataFrame
+            The data frame to copy into shared memory.
+        """
+        self.columns = list(frame.columns)
+        self.index = frame.index if not isinstance(frame.index, pd.RangeIndex) else len(frame)
+        self.blocks = []
+        for dtype in pd.unique(frame.dtypes):
+            columns = [c for c in self.columns if frame[c].dtype == dtype]
+            self.blocks.append((columns, SharedArray(frame[columns].to_numpy())))
+
+    def to_frame(self):
+        """
+        Data frame backed by the shared memory. Data frames with mixed data types are copied once.
+
+        Returns
+        -------
+        pd.DataFrame
+        """
+        index = pd.RangeIndex(self.index) if isinstance(self.index, int) else self.index
+        frames = [pd.DataFrame(block.array, columns=columns, index=index, copy=False)
+                  for columns, block in self.blocks]
+        frame = frames[0] if len(frames) == 1 else pd.concat(frames, axis=1)
+        return frame[self.columns]
+
+    def release(self):
+        """
+        Detach from the shared memory.
+        """
+        for _, block in self.blocks:
+            block.release()
+
+
+class EvaluationPool:
+    """
+    Pool of worker processes that evaluate a fixed fitness function on chunks of populations.
+
+    The pool is meant to be opened once per optimizer run and used as a context manager:
+
+    >>> with EvaluationPool(f) as pool:
+    ...     fitness = pool.map(population)
+    """
+
+    def __init__(self, f, processes=None, chunks_per_process=4, backend='processes', random_state=None):
+        """
+        Parameters
+        ----------
+        f: callable
+            The fitness function. If it has a method ``share_memory``, it is called before the workers start.
+        processes: int, optional
+            Number of worker processes. Default is the number of CPUs.
+        chunks_per_process: int, optional
+            Number of chunks a population is split into per worker process. Default is 4.
+        backend: str, optional
+            Either 'processes' or 'threads'. Default is 'processes'.
+        random_state: None, int or np.random.Generator, optional
+            The random state from which the random streams of the chunks are spawned.
+            Default is None, i.e., the workers are not seeded.
+            Threads share the global random state and are never seeded.
+        """
+        self.f = f
+        self.rng = None if random_state is None else check_random_state(random_state)
+        self.processes = processes or mp.cpu_count()
+        self.chunks_per_process = chunks_per_process
+        self.backend = backend
+        if backend == 'threads':
+            # threads share the fitness function with the caller
+            self._pool = mp.ThreadPool(self.processes)
+            self._evaluate = partial(_evaluate, f)
+        elif backend == 'processes':
+            if hasattr(f, 'share_memory'):
+                f.share_memory()
+            self._pool = mp.Pool(self.processes, initializer=_init_worker, initargs=(f,))
+            self._evaluate = _evaluate_chunk
+        else:
+            raise ValueError('Invalid backend. It can be either \'processes\' or \'threads\'.')
+
+    def map(self, population, d=None):
+        """
+        Evaluate each individual of a population in the workers.
+
+        Parameters
+        ----------
+        population: ndarray, shape (pop_size, d)
+            The population of vectors to evaluate.
+        d: int, optional
+            The number of bits if the individuals are bit-packed. Default is None, i.e., not packed.
+            Only the packed chunks are sent to the workers.
+
+        Returns
+        -------
+        fitness: ndarray, shape (pop_size,) or (pop_size, n_objectives)
+            The fitness values of the population.
+        """
+        n_chunks = min(len(population), self.processes * self.chunks_per_process)
+        chunks = np.array_split(np.asarray(population), max(n_chunks, 1))
+        if self.rng is None or self.backend == 'threads':
+            return np.concatenate(self._pool.map(partial(self._evaluate, d=d), chunks))
+        seeds = [rng.integers(2 ** 32, dtype=np.uint64) for rng in spawn_random_states(self.rng, len(chunks))]
+        return np.concatenate(self._pool.starmap(partial(self._evaluate, d=d), zip(chunks, seeds)))
+
+    def submit(self, population, callback, error_callback=None, d=None):
+        """
+        Evaluate a (small) population in a worker without waiting for the result,
+        e.g., a single offspring of :func:`fairdo.optimize.steadystate.steady_state_genetic_algorithm`.
+
+        Parameters
+        ----------
+        population: ndarray, shape (n, d)
+            The individuals to evaluate.
+        callback: callable
+            Called with the fitness values, shape (n,), as soon as they are available.
+            It runs in a thread of the pool and should return quickly, e.g., put the result into a queue.
+        error_callback: callable, optional
+            Called with the exception if the evaluation fails.
+        d: int, optional
+            The number of bits if the individuals are bit-packed. Default is None, i.e., not packed.
+
+        Returns
+        -------
+        AsyncResult
+        """
+        return self._pool.apply_async(self._evaluate, (np.asarray(population),), {'d': d},
+                                      callback=callback, error_callback=error_callback)
+
+    def starmap(self, func, tasks):
+        """
+        Call ``func(f, *task)`` in the workers for each task, where `f` is the fitness function of the pool.
+        This runs whole steps of an optimizer in the workers, e.g., the generations of an island of
+        :func:`fairdo.optimize.island.island_genetic_algorithm`.
+
+        Parameters
+        ----------
+        func: callable
+            Function that takes the fitness function and the arguments of a task.
+        tasks: iterable of tuples
+            The arguments of each call.
+
+        Returns
+        -------
+        list
+            The results of the calls in the order of the tasks.
+        """
+        if self.backend == 'threads':
+            return self._pool.starmap(partial(func, self.f), tasks)
+        return self._pool.starmap(partial(_call_worker, func), tasks)
+
+    def close(self):
+        """
+        Stop the worker processes and release the shared memory of the fitness function.
+        """
+        self._pool.close()
+        self._pool.join()
+        if self.backend == 'processes' and hasattr(self.f, 'release_memory'):
+            self.f.release_memory()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+# fitness function of the worker process, set once by the initializer of the pool
+_worker_f = None
+
+
+def _init_worker(f):
+    global _worker_f
+    _worker_f = f
+
+
+def _call_worker(func, *args):
+    """
+    Call a function with the fitness function of the worker.
+    """
+    return func(_worker_f, *args)
+
+
+def _evaluate_chunk(chunk, seed=None, d=None):
+    """
+    Evaluate a chunk of a population with the fitness function of the worker.
+    The global random state of the worker is seeded with `seed` if given.
+    """
+    if seed is not None:
+        np.random.seed(seed)
+    return _evaluate(_worker_f, chunk, d=d)
+
+
+def _evaluate(f, chunk, d=None):
+    """
+    Evaluate a chunk of a population, at once if `f` evaluates whole populations.
+    Bit-packed chunks are unpacked unless `f` evaluates packed populations.
+    """
+    if hasattr(f, 'evaluate_population'):
+        if d is None:
+            return np.asarray(f.evaluate_population(chunk), dtype=float)
+        if 'packed' in inspect.signature(f.evaluate_population).parameters:
+            return np.asarray(f.evaluate_population(chunk, packed=True), dtype=float)
+    if d is not None:
+        chunk = unpack_bits(chunk, d)
+    if hasattr(f, 'evaluate_population'):
+        return np.asarray(f.evaluate_population(chunk), dtype=float)
+    return np.array([f(individual) for individual in chunk], dtype=float)
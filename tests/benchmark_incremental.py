@@ -0,0 +1,61 @@
+import time
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from fairdo.optimize.geneticoperators import uniform_crossover, fractional_flip_mutation
+from fairdo.optimize.single import genetic_algorithm
+from fairdo.preprocessing.objective import DatasetObjective
+
+
+def benchmark(func, repeats=3):
+    """
+    Benchmark the execution time of a function.
+
+    Parameters
+    ----------
+    func: callable
+        The function to benchmark.
+    repeats: int, optional
+        The number of times to repeat the benchmark.
+
+    Returns
+    -------
+    float
+        The average execution time in seconds.
+    """
+    total_time = 0
+    for _ in range(repeats):
+        start_time = time.time()
+        func()
+        end_time = time.time()
+        total_time += (end_time - start_time)
+    return total_time / repeats
+
+
+def run(objective, p, mutation_rate, incremental):
+    """
+    Run the genetic algorithm for a fixed number of generations.
+    """
+    genetic_algorithm(objective, objective.dims,
+                      pop_size=150,
+                      num_generations=20,
+                      crossover=partial(uniform_crossover, p=p),
+                      mutation=partial(fractional_flip_mutation, mutation_rate=mutation_rate),
+                      patience=np.inf,
+                      random_state=0,
+                      incremental=incremental)
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    n = 200_000
+    data = pd.DataFrame({'x': rng.random(n), 'y': rng.integers(0, 2, n), 'z': rng.integers(0, 4, n)})
+    objective = DatasetObjective(data, label='y', protected_attributes='z')
+
+    for p, mutation_rate in [(0.5, 0.05), (0.5, 0.01), (0.99, 0.01), (0.999, 0.001)]:
+        full = benchmark(partial(run, objective, p, mutation_rate, False))
+        incremental = benchmark(partial(run, objective, p, mutation_rate, True))
+        print(f"p={p}, mutation_rate={mutation_rate}: "
+              f"from scratch {full:.3f}s, incremental {incremental:.3f}s")
@@ -1,6 +1,7 @@
 import numpy as np
 import time
-from fairdo.optimize.multi import dom_counts_indices, dom_counts_indices_fast
+from fairdo.optimize.multi import dom_counts_indices, dom_counts_indices_fast, non_dominated_sort, \
+    non_dominated_sort_fast
 
 
 def benchmark(func, repeats=10):
@@ -57,7 +58,22 @@ def test2(pop_size, num_objectives):
     print(dom_list)
     print(dom_list_broadcast)
 
+def test_sort(pop_size, num_objectives):
+    repeats = 5
+
+    fitness_values = np.random.rand(pop_size, num_objectives)
+
+    time = benchmark(lambda: non_dominated_sort(fitness_values), repeats=repeats)
+    time_fast = benchmark(lambda: non_dominated_sort_fast(fitness_values), repeats=repeats)
+
+    print(f"Non-dominated sort of {pop_size} individuals with {num_objectives} objectives")
+    print(f"Average execution time over {repeats} runs: {time:.4f} seconds")
+    print(f"Average execution time over {repeats} runs (fast): {time_fast:.4f} seconds")
+    print(f"Speedup: {time / time_fast:.2f}")
+
 # Main
 pop_size = 1000
 num_objectives = 2
 test(pop_size, num_objectives)
+for num_objectives in [2, 3, 4]:
+    test_sort(pop_size, num_objectives)
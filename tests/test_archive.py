@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from fairdo.optimize.archive import ParetoArchive
+from fairdo.optimize.multi import nsga2, non_dominated_sort
+from fairdo.utils.helper import pack_bits
+
+
+def first_front(fitness_values):
+    return np.unique(fitness_values[non_dominated_sort(fitness_values)[0]], axis=0)
+
+
+@pytest.mark.parametrize('num_objectives', [2, 3])
+def test_archive_keeps_first_front(num_objectives):
+    rng = np.random.default_rng(num_objectives)
+    d = 70
+    archive = ParetoArchive()
+    all_fitness_values = []
+    for _ in range(5):
+        population = rng.integers(0, 2, (40, d))
+        fitness_values = rng.integers(0, 20, (40, num_objectives)).astype(float)
+        archive.update(population, fitness_values)
+        all_fitness_values.append(fitness_values)
+
+    expected = first_front(np.concatenate(all_fitness_values))
+    np.testing.assert_array_equal(np.unique(archive.fitness_values, axis=0), expected)
+    assert archive.solutions.shape == (len(expected), d)
+
+
+@pytest.mark.parametrize('num_objectives', [2, 3])
+def test_max_size_keeps_extremes(num_objectives):
+    rng = np.random.default_rng(0)
+    # all solutions are non-dominated
+    f1 = rng.permutation(200).astype(float)
+    fitness_values = np.column_stack([f1, 200 - f1] + [rng.random(200)] * (num_objectives - 2))
+    archive = ParetoArchive(max_size=10)
+    archive.update(rng.integers(0, 2, (200, 5)), fitness_values)
+
+    assert len(archive) == 10
+    assert archive.fitness_values[:, 0].min() == 0 and archive.fitness_values[:, 0].max() == 199
+
+
+def test_solutions_round_trip_packed():
+    rng = np.random.default_rng(0)
+    d = 100
+    population = rng.integers(0, 2, (2, d))
+    fitness_values = np.array([[0., 1.], [1., 0.]])
+
+    archive = ParetoArchive()
+    archive.update(population, fitness_values)
+    packed_archive = ParetoArchive(d=d)
+    packed_archive.update(pack_bits(population), fitness_values)
+
+    np.testing.assert_array_equal(archive.solutions, population)
+    np.testing.assert_array_equal(packed_archive.solutions, population)
+    assert archive._solutions[0].nbytes < population[0].nbytes
+
+
+def test_nsga2_returns_last_front_by_default():
+    d = 30
+    fitness_functions = [lambda x: np.sum(x), lambda x: d - np.sum(x)]
+    kwargs = dict(pop_size=10, num_generations=3, random_state=0)
+    solutions, fitness_values = nsga2(fitness_functions, d, **kwargs)
+    population, all_fitness_values, fronts = nsga2(fitness_functions, d, return_all_fronts=True, **kwargs)
+    np.testing.assert_array_equal(solutions, population[fronts[0]])
+
+    solutions, fitness_values = nsga2(fitness_functions, d, archive=5, **kwargs)
+    assert len(solutions) <= 5
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairdo.metrics import data_loss
+from fairdo.metrics.independence import RandomizedDependence, RDCObjective
+from fairdo.optimize import single
+from fairdo.optimize.multi import nsga2, open_pool as open_multi_pool
+from fairdo.optimize.single import genetic_algorithm, open_pool
+from fairdo.preprocessing.objective import DatasetObjective, MultiDatasetObjective
+from fairdo.utils.helper import is_batched
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    n = 300
+    return pd.DataFrame({'x': rng.random(n), 'y': rng.integers(0, 2, n), 'z': rng.integers(0, 3, n)})
+
+
+@pytest.fixture
+def score_calls(monkeypatch):
+    calls = []
+    score_population = RandomizedDependence.score_population
+
+    def counted(self, masks, *args, **kwargs):
+        calls.append(len(masks))
+        return score_population(self, masks, *args, **kwargs)
+
+    monkeypatch.setattr(RandomizedDependence, 'score_population', counted)
+    return calls
+
+
+def test_masked_objective_is_batched(data):
+    objective = DatasetObjective(data, label='y', protected_attributes='z', fitness_function=RDCObjective())
+    assert objective.masked and not objective.vectorized
+    assert objective.batched and is_batched(objective)
+    assert is_batched(DatasetObjective(data, label='y', protected_attributes='z'))
+
+
+def test_genetic_algorithm_scores_each_generation_once(data, score_calls):
+    objective = DatasetObjective(data, label='y', protected_attributes='z',
+                                 fitness_function=RDCObjective(random_state=0))
+    genetic_algorithm(objective, objective.dims, pop_size=20, num_generations=5, patience=100, random_state=0)
+    # the initial population and the offspring of each generation
+    assert len(score_calls) == 6
+    assert score_calls[0] == 20
+
+
+def test_genetic_algorithm_with_packed_population(data, score_calls):
+    objective = DatasetObjective(data, label='y', protected_attributes='z',
+                                 fitness_function=RDCObjective(random_state=0))
+    solution, fitness = genetic_algorithm(objective, objective.dims, pop_size=20, num_generations=3, patience=100,
+                                          packed=True, random_state=0)
+    assert len(score_calls) == 4
+    assert fitness == pytest.approx(objective(solution))
+
+
+def test_nsga2_scores_each_generation_once(data, score_calls):
+    objectives = [DatasetObjective(data, label='y', protected_attributes='z',
+                                   fitness_function=RDCObjective(random_state=0)),
+                  DatasetObjective(data, label='y', protected_attributes='z', fitness_function=data_loss)]
+    nsga2(objectives, len(data), pop_size=20, num_generations=4, random_state=0)
+    assert len(score_calls) == 5
+
+    score_calls.clear()
+    objectives = MultiDatasetObjective(data, label='y', protected_attributes='z',
+                                       fitness_functions=[RDCObjective(random_state=0), data_loss])
+    nsga2(objectives, len(data), pop_size=20, num_generations=4, random_state=0)
+    assert len(score_calls) == 5
+
+
+def test_batched_objectives_get_no_pool(data, monkeypatch):
+    monkeypatch.setattr(single.mp, 'cpu_count', lambda: 2)
+    objective = DatasetObjective(data, label='y', protected_attributes='z', fitness_function=RDCObjective())
+    assert open_pool(objective, pop_size=1000) is None
+    assert open_multi_pool([objective, objective], n_jobs=2, backend='threads') is None
+    objectives = MultiDatasetObjective(data, label='y', protected_attributes='z',
+                                       fitness_functions=[RDCObjective(), data_loss])
+    assert objectives.batched
+    assert open_multi_pool(objectives, n_jobs=2, backend='threads') is None
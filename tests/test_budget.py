@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairdo.optimize.multi import nsga2
+from fairdo.optimize.single import genetic_algorithm
+from fairdo.preprocessing import DefaultPreprocessing
+
+
+def counting(f):
+    def counted(x):
+        counted.calls += 1
+        return f(x)
+    counted.calls = 0
+    return counted
+
+
+def test_nsga2_stops_at_target_fitness():
+    d = 20
+    fitness_functions = [counting(lambda x: np.sum(x)), lambda x: d - np.sum(x)]
+    kwargs = dict(pop_size=10, num_generations=50, random_state=0)
+    nsga2(fitness_functions, d, **kwargs)
+    full = fitness_functions[0].calls
+
+    fitness_functions[0].calls = 0
+    solutions, fitness_values = nsga2(fitness_functions, d, target_fitness=[d, d], **kwargs)
+    # every individual reaches the target, so only the initial population is evaluated
+    assert fitness_functions[0].calls == 10 < full
+    assert np.all(fitness_values <= d)
+
+
+def test_genetic_algorithm_stops_at_target_fitness():
+    d = 20
+    f = counting(lambda x: np.sum(x))
+    genetic_algorithm(f, d, pop_size=10, num_generations=50, random_state=0, target_fitness=d)
+    assert f.calls == 10
+
+
+def test_default_preprocessing_forwards_arguments():
+    preprocessor = DefaultPreprocessing(protected_attribute='z', label='y', target_fitness=0.1, patience=5,
+                                        compress=True)
+    assert preprocessor.heuristic.keywords['target_fitness'] == 0.1
+    assert preprocessor.heuristic.keywords['patience'] == 5
+    assert preprocessor.compress is True
+
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({'x': rng.random(100), 'y': rng.integers(0, 2, 100), 'z': rng.integers(0, 2, 100)})
+    preprocessor = DefaultPreprocessing(protected_attribute='z', label='y', num_generations=100,
+                                        target_fitness=1., random_state=0)
+    assert len(preprocessor.fit_transform(data)) > 0
+
+
+def test_default_preprocessing_rejects_unknown_arguments():
+    with pytest.raises(TypeError, match='pop_sizes'):
+        DefaultPreprocessing(protected_attribute='z', label='y', pop_sizes=10)
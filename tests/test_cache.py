@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairdo.optimize.baseline import random_method
+from fairdo.optimize.cache import FitnessCache
+from fairdo.optimize.geneticoperators import simulated_binary_crossover
+from fairdo.optimize.multi import nsga2
+from fairdo.optimize.single import genetic_algorithm
+from fairdo.preprocessing.objective import DatasetObjective
+
+
+def test_keys_are_exact():
+    population = np.array([[1., 0.7, 0.], [1., 0., 0.], [1., 1., 0.], [1., 0.7, 0.], [1., 0.2, 0.]])
+    keys = FitnessCache.keys(population)
+    assert len(set(keys[:3])) == 3
+    assert keys[0] == keys[3]
+    assert keys[0] != keys[4]
+    # binary individuals share the key whatever their dtype
+    assert FitnessCache.keys(population[1:3].astype(int)) == keys[1:3]
+
+
+def test_non_binary_individuals_are_not_stale():
+    population = np.array([[1., 0.7, 0.], [1., 0., 0.], [1., 0.2, 0.]])
+    cache = FitnessCache()
+    fitness = cache.evaluate(lambda p: p.sum(axis=1), population)
+    np.testing.assert_allclose(fitness, [1.7, 1., 1.2])
+    assert cache.misses == 3
+
+
+def test_hits_and_misses():
+    calls = []
+
+    def evaluate(population):
+        calls.append(len(population))
+        return population.sum(axis=1)
+
+    population = np.array([[1, 0, 1], [0, 0, 1], [1, 0, 1]])
+    cache = FitnessCache()
+    np.testing.assert_array_equal(cache.evaluate(evaluate, population), [2, 1, 2])
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert calls == [2]
+    np.testing.assert_array_equal(cache.evaluate(evaluate, population[::-1]), [2, 1, 2])
+    assert (cache.hits, cache.misses) == (4, 2)
+    assert calls == [2]
+    assert cache.hit_rate == 4 / 6
+
+
+def test_lru_eviction():
+    cache = FitnessCache(maxsize=2)
+    evaluate = lambda population: population.sum(axis=1)
+    a, b, c = np.eye(3, dtype=int)
+    cache.evaluate(evaluate, np.array([a, b]))
+    # a is used more recently than b, so b is evicted
+    cache.evaluate(evaluate, np.array([a]))
+    cache.evaluate(evaluate, np.array([c]))
+    assert len(cache) == 2
+    keys = FitnessCache.keys(np.array([a, b, c]))
+    assert keys[0] in cache._values and keys[2] in cache._values
+    assert keys[1] not in cache._values
+    misses = cache.misses
+    cache.evaluate(evaluate, np.array([b]))
+    assert cache.misses == misses + 1
+
+
+@pytest.mark.parametrize('method', ['genetic_algorithm', 'nsga2', 'random_method'])
+def test_optimizer_with_cache_matches_without(method):
+    d = 20
+    weights = np.random.default_rng(0).random(d)
+    f = lambda x: abs(weights @ x - 3.)
+    if method == 'genetic_algorithm':
+        run = lambda cache: genetic_algorithm(f, d, pop_size=20, num_generations=10, random_state=1, cache=cache)
+    elif method == 'nsga2':
+        run = lambda cache: nsga2([f, lambda x: np.sum(x)], d, pop_size=20, num_generations=10,
+                                  random_state=1, cache=cache)
+    else:
+        run = lambda cache: random_method(f, d, num_generations=50, random_state=1, cache=cache)
+
+    expected = run(None)
+    cache = FitnessCache()
+    actual = run(cache)
+    np.testing.assert_array_equal(actual[0], expected[0])
+    np.testing.assert_array_equal(actual[1], expected[1])
+    assert cache.misses > 0
+
+
+def test_cache_with_simulated_binary_crossover():
+    rng = np.random.default_rng(0)
+    n = 300
+    data = pd.DataFrame({'x': rng.random(n), 'y': rng.integers(0, 2, n), 'z': rng.integers(0, 3, n)})
+    objective = DatasetObjective(data, label='y', protected_attributes='z')
+
+    parents = rng.integers(0, 2, (2, n)).astype(float)
+    offspring = simulated_binary_crossover(parents, 20, random_state=rng)
+    # binary and non-binary individuals in the same population
+    population = np.concatenate((parents, offspring, np.round(offspring)))
+    assert np.any((population != 0) & (population != 1))
+
+    cache = FitnessCache()
+    for _ in range(2):
+        fitness = cache.evaluate(objective.evaluate_population, population)
+        np.testing.assert_allclose(fitness, objective.evaluate_population(population))
+    assert cache.hits >= len(population)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairdo.metrics import statistical_parity_abs_diff_multi
+from fairdo.preprocessing.objective import CompressedObjective, DatasetObjective
+
+
+@pytest.fixture
+def objective():
+    rng = np.random.default_rng(0)
+    n = 500
+    # few distinct rows, so that the rows are compressed by 'rows' as well
+    data = pd.DataFrame({'x': rng.integers(0, 3, n),
+                         'y': rng.integers(0, 2, n),
+                         'z': rng.integers(0, 3, n),
+                         'w': rng.integers(0, 2, n)})
+    return DatasetObjective(data, label='y', protected_attributes=['z', 'w'],
+                            fitness_function=statistical_parity_abs_diff_multi)
+
+
+@pytest.mark.parametrize('by', ['cells', 'rows'])
+def test_expand_matches_uncompressed_fitness(objective, by):
+    compressed = CompressedObjective(objective, by=by, random_state=0)
+    assert compressed.dims < objective.dims
+    rng = np.random.default_rng(1)
+    population = rng.integers(0, 2, (30, compressed.dims))
+    fitness = compressed.evaluate_population(population)
+
+    for individual, individual_fitness in zip(population, fitness):
+        mask = compressed.expand(individual)
+        assert mask.shape == (objective.dims,)
+        # each group keeps the decoded number of rows
+        np.testing.assert_array_equal(np.bincount(compressed.groups, weights=mask, minlength=len(compressed.sizes)),
+                                      compressed.decode(individual))
+        assert individual_fitness == pytest.approx(objective(mask), rel=1e-12)
+        assert compressed(individual) == pytest.approx(individual_fitness, rel=1e-12)
+
+
+@pytest.mark.parametrize('by', ['cells', 'rows'])
+def test_all_ones_select_all_rows(objective, by):
+    compressed = CompressedObjective(objective, by=by, random_state=0)
+    np.testing.assert_array_equal(compressed.expand(np.ones(compressed.dims)), np.ones(objective.dims))
+    assert compressed(np.ones(compressed.dims)) == pytest.approx(objective(np.ones(objective.dims)))
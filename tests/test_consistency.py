@@ -0,0 +1,21 @@
+import numpy as np
+import pytest
+
+from fairdo.metrics.individual import ConsistencyGraph, consistency_score
+
+
+@pytest.mark.parametrize('n_neighbors', [1, 5])
+@pytest.mark.parametrize('density', [0.05, 0.3, 0.9, 1.0])
+def test_graph_score_matches_consistency_score(n_neighbors, density):
+    rng = np.random.default_rng(0)
+    n = 300
+    x = rng.random((n, 3))
+    y = rng.integers(0, 2, n)
+    graph = ConsistencyGraph(x, y, n_neighbors=n_neighbors)
+    for _ in range(10):
+        mask = (rng.random(n) < density).astype(int)
+        if mask.sum() <= n_neighbors:
+            continue
+        expected = consistency_score(x[mask == 1], y[mask == 1], n_neighbors=n_neighbors)
+        assert graph.score(mask) == pytest.approx(expected, rel=1e-12)
+        assert consistency_score(graph=graph, mask=mask) == pytest.approx(expected, rel=1e-12)
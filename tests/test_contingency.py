@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from fairdo.metrics import (GroupContingency, statistical_parity_abs_diff_multi, statistical_parity_abs_diff,
+                            statistical_parity_difference, disparate_impact_ratio)
+
+
+# per-group implementations of the metrics before the introduction of GroupContingency
+def reference_parity_multi(y, z, agg_attribute=np.max, agg_group=np.max, positive_label=1):
+    if z.ndim < 2:
+        z = z.reshape(-1, 1)
+    if positive_label == 0:
+        y = 1 - y
+    y = y.astype(int)
+    z = z.astype(int)
+    attributes_disparity = []
+    for k in range(z.shape[1]):
+        zk = np.unique(z[:, k])
+        parities = {i: np.sum(y & (z[:, k] == i)) / np.sum(z[:, k] == i) for i in zk}
+        try:
+            attributes_disparity.append(agg_group([np.abs(parities[i] - parities[j])
+                                                   for a, i in enumerate(zk) for j in zk[a + 1:]]))
+        except ValueError:
+            attributes_disparity.append(0)
+    return agg_attribute(attributes_disparity)
+
+
+def reference_binary_parities(y, z, positive_label=1, privileged_group=1):
+    if privileged_group == 0:
+        z = 1 - z
+    if positive_label == 0:
+        y = 1 - y
+    y = y.astype(int)
+    z = z.astype(int)
+    return np.sum(y & (1 - z)) / np.sum(1 - z), np.sum(y & z) / np.sum(z)
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    n = 500
+    y = rng.integers(0, 2, n)
+    z = np.column_stack([rng.integers(0, 2, n), rng.integers(0, 4, n), rng.integers(0, 3, n)])
+    return y, z
+
+
+@pytest.mark.parametrize('agg_group', [np.max, np.min, np.sum, np.mean])
+@pytest.mark.parametrize('agg_attribute', [np.max, np.sum])
+@pytest.mark.parametrize('positive_label', [0, 1])
+def test_parity_multi_matches_reference(data, agg_group, agg_attribute, positive_label):
+    y, z = data
+    expected = reference_parity_multi(y, z, agg_attribute, agg_group, positive_label)
+    kwargs = dict(agg_attribute=agg_attribute, agg_group=agg_group, positive_label=positive_label)
+    assert statistical_parity_abs_diff_multi(y, z, **kwargs) == pytest.approx(expected, rel=1e-12)
+    contingency = GroupContingency.from_arrays(y, z)
+    assert statistical_parity_abs_diff_multi(contingency=contingency, **kwargs) == pytest.approx(expected,
+                                                                                                 rel=1e-12)
+
+
+@pytest.mark.parametrize('agg_group', [np.max, np.sum, np.mean])
+def test_parity_single_attribute_matches_reference(data, agg_group):
+    y, z = data
+    for k in range(z.shape[1]):
+        expected = reference_parity_multi(y, z[:, k], agg_group=agg_group)
+        assert statistical_parity_abs_diff(y, z[:, k], agg_group=agg_group) == pytest.approx(expected, rel=1e-12)
+
+
+@pytest.mark.parametrize('positive_label', [0, 1])
+@pytest.mark.parametrize('privileged_group', [0, 1])
+def test_binary_metrics_match_reference(data, positive_label, privileged_group):
+    y, z = data
+    unpriv, priv = reference_binary_parities(y, z[:, 0], positive_label, privileged_group)
+    kwargs = dict(positive_label=positive_label, privileged_group=privileged_group)
+    assert statistical_parity_difference(y, z[:, 0], **kwargs) == pytest.approx(unpriv - priv, rel=1e-12)
+    assert disparate_impact_ratio(y, z[:, 0], **kwargs) == pytest.approx(unpriv / priv, rel=1e-12)
+
+
+@pytest.mark.parametrize('agg_group', [np.max, np.min, np.sum, np.mean])
+def test_batched_masks_with_missing_groups(data, agg_group):
+    y, z = data
+    rng = np.random.default_rng(1)
+    masks = rng.integers(0, 2, (20, len(y)))
+    # remove whole groups from some subsets
+    masks[:5, z[:, 1] == 2] = 0
+    masks[5:10, (z[:, 1] == 0) | (z[:, 2] == 1)] = 0
+    masks[10, z[:, 0] == 1] = 0
+
+    # the float32 encoding of from_masks yields the float64 values of the reference
+    contingency = GroupContingency.from_masks(masks, y, z)
+    batched = statistical_parity_abs_diff_multi(contingency=contingency, agg_group=agg_group)
+    expected = [reference_parity_multi(y[mask == 1], z[mask == 1], agg_group=agg_group) for mask in masks]
+    np.testing.assert_allclose(batched, expected, rtol=1e-12)
+
+
+def test_group_of_missing_value_has_zero_counts(data):
+    y, z = data
+    contingency = GroupContingency.from_arrays(y[z[:, 1] != 3], z[z[:, 1] != 3])
+    totals, positives = contingency.group(1, 3)
+    assert totals == 0 and positives == 0
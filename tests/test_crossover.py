@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+from scipy.stats import chi2_contingency, ks_2samp
+
+from fairdo.optimize.geneticoperators import kpoint_crossover, simulated_binary_crossover, uniform_crossover
+from fairdo.utils.helper import pack_bits, unpack_bits
+
+
+# per-row implementations of the crossovers before they were vectorized
+def reference_uniform_crossover(parents, num_offspring, p=0.5):
+    offspring = np.empty((num_offspring, parents.shape[1]))
+    for k in range(num_offspring):
+        mask = np.random.uniform(size=parents.shape[1]) < p
+        offspring[k] = np.where(mask, parents[0], parents[1])
+    return offspring
+
+
+def reference_kpoint_crossover(parents, num_offspring, k=2):
+    d = parents.shape[1]
+    offspring = np.empty((num_offspring, d))
+    for i in range(num_offspring):
+        parent1_idx = i % parents.shape[0]
+        parent2_idx = (i + 1) % parents.shape[0]
+        crossover_points = np.sort(np.random.choice(d - 1, k, replace=False)) + 1
+        crossover_points = np.concatenate(([0], crossover_points, [d]))
+        for j in range(len(crossover_points) - 1):
+            start, end = crossover_points[j], crossover_points[j + 1]
+            parent_idx = parent1_idx if j % 2 == 0 else parent2_idx
+            offspring[i, start:end] = parents[parent_idx, start:end]
+    return offspring
+
+
+def reference_simulated_binary_crossover(parents, num_offspring, eta=15):
+    d = parents.shape[1]
+    offspring = np.empty((num_offspring, d))
+    for i in range(num_offspring):
+        parent1, parent2 = parents[np.random.choice(2, 2, replace=False)]
+        u = np.random.rand(d)
+        beta = np.empty(d)
+        beta[u <= 0.5] = (2 * u[u <= 0.5]) ** (1 / (eta + 1))
+        beta[u > 0.5] = (1 / (2 * (1 - u[u > 0.5]))) ** (1 / (eta + 1))
+        offspring[i] = 0.5 * ((1 + beta) * parent1 + (1 - beta) * parent2)
+    return offspring
+
+
+def assert_same_rates(counts, reference_counts, n, reference_n):
+    # two-sample test of the rates with a generous bound, rates of 0 and 1 must match exactly
+    rates, reference_rates = counts / n, reference_counts / reference_n
+    pooled = (counts + reference_counts) / (n + reference_n)
+    std = np.sqrt(pooled * (1 - pooled) * (1 / n + 1 / reference_n))
+    assert np.all(np.abs(rates - reference_rates) <= 5 * std + 1e-12)
+
+
+@pytest.fixture
+def parents():
+    rng = np.random.default_rng(0)
+    d = 150
+    # the parents differ in the first 100 genes and agree in the remaining ones
+    first = rng.integers(0, 2, d).astype(float)
+    second = first.copy()
+    second[:100] = 1 - second[:100]
+    return np.array([first, second])
+
+
+@pytest.mark.parametrize('p', [0.5, 0.3, 0.8, 0.95, 0.999, 0.02])
+@pytest.mark.parametrize('packed', [False, True])
+def test_uniform_crossover_matches_reference(parents, p, packed):
+    num_offspring = 4000
+    np.random.seed(0)
+    reference = reference_uniform_crossover(parents, num_offspring, p=p)
+    d = parents.shape[1]
+    if packed:
+        offspring = unpack_bits(uniform_crossover(pack_bits(parents), num_offspring, p=p, packed=True, d=d,
+                                                  random_state=0), d)
+    else:
+        offspring = uniform_crossover(parents, num_offspring, p=p, random_state=0)
+
+    # genes in which the parents agree are inherited
+    np.testing.assert_array_equal(offspring[:, 100:], np.broadcast_to(parents[0, 100:], (num_offspring, 50)))
+    # the rate at which each gene is inherited from the first parent
+    from_first = offspring[:, :100] == parents[0, :100]
+    reference_from_first = reference[:, :100] == parents[0, :100]
+    assert_same_rates(from_first.sum(axis=0), reference_from_first.sum(axis=0), num_offspring, num_offspring)
+    # the number of genes inherited from the first parent per offspring
+    assert ks_2samp(from_first.sum(axis=1), reference_from_first.sum(axis=1)).pvalue > 1e-4
+
+
+@pytest.mark.parametrize('k', [1, 2, 3])
+def test_kpoint_crossover_matches_reference(k):
+    d, num_offspring = 40, 6000
+    # the parents differ in every gene, so the cut points are the positions where the genes change
+    parents = np.array([np.zeros(d), np.ones(d)])
+    np.random.seed(0)
+    reference = reference_kpoint_crossover(parents, num_offspring, k=k)
+    offspring = kpoint_crossover(parents, num_offspring, k=k, random_state=0)
+
+    # every offspring starts with its first parent and has exactly k cut points
+    np.testing.assert_array_equal(offspring[:, 0], np.arange(num_offspring) % 2)
+    changes = offspring[:, 1:] != offspring[:, :-1]
+    assert np.all(changes.sum(axis=1) == k)
+    cuts = np.nonzero(changes)[1].reshape(num_offspring, k)
+    reference_cuts = np.nonzero(reference[:, 1:] != reference[:, :-1])[1].reshape(num_offspring, k)
+    # the distribution of each sorted cut point
+    for j in range(k):
+        table = np.array([np.bincount(cuts[:, j], minlength=d - 1), np.bincount(reference_cuts[:, j], minlength=d - 1)])
+        table = table[:, table.sum(axis=0) > 0]
+        assert chi2_contingency(table).pvalue > 1e-4
+
+
+def test_simulated_binary_crossover_matches_reference():
+    d, num_offspring = 20, 3000
+    parents = np.array([np.full(d, 0.2), np.full(d, 0.9)])
+    np.random.seed(0)
+    reference = reference_simulated_binary_crossover(parents, num_offspring)
+    offspring = simulated_binary_crossover(parents, num_offspring, random_state=0)
+    assert ks_2samp(offspring.ravel(), reference.ravel()).pvalue > 1e-4
+    # each offspring is drawn around one of the parents
+    assert ks_2samp(offspring.mean(axis=1), reference.mean(axis=1)).pvalue > 1e-4
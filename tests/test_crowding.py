@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from fairdo.optimize.multi import (crowded_tournament, crowding_distance, crowding_distance_fronts,
+                                   non_dominated_sort_fast, nsga2)
+
+
+def crowding_distance_loop(fitness_values):
+    # previous implementation, with a stable sort so that tied values are visited in the same order
+    pop_size, num_objectives = fitness_values.shape
+    crowding_distances = np.zeros(pop_size)
+    for obj_index in range(num_objectives):
+        sorted_indices = np.argsort(fitness_values[:, obj_index], kind='stable')
+        crowding_distances[sorted_indices[0]] = np.inf
+        crowding_distances[sorted_indices[-1]] = np.inf
+        f_max = fitness_values[sorted_indices[-1], obj_index]
+        f_min = fitness_values[sorted_indices[0], obj_index]
+        if f_max == f_min:
+            continue
+        for i in range(1, pop_size - 1):
+            crowding_distances[sorted_indices[i]] += (fitness_values[sorted_indices[i + 1], obj_index]
+                                                      - fitness_values[sorted_indices[i - 1], obj_index]) / (f_max - f_min)
+    return crowding_distances
+
+
+def populations():
+    rng = np.random.default_rng(0)
+    yield rng.random((50, 2))
+    yield rng.random((30, 3))
+    # duplicate objective values
+    yield rng.integers(0, 4, (40, 2)).astype(float)
+    yield rng.integers(0, 3, (25, 3)).astype(float)
+    # objective without range
+    yield np.column_stack([rng.random(20), np.full(20, 0.5)])
+    yield np.ones((5, 2))
+    # tiny populations
+    yield rng.random((1, 2))
+    yield rng.random((2, 2))
+    yield rng.random((3, 2))
+
+
+@pytest.mark.parametrize('fitness_values', list(populations()))
+def test_crowding_distance_matches_loop(fitness_values):
+    expected = crowding_distance_loop(fitness_values)
+    actual = crowding_distance(fitness_values)
+    np.testing.assert_array_equal(np.isinf(actual), np.isinf(expected))
+    np.testing.assert_allclose(actual, expected)
+
+
+@pytest.mark.parametrize('fitness_values', list(populations()))
+def test_crowding_distance_fronts_matches_loop_per_front(fitness_values):
+    fronts = non_dominated_sort_fast(fitness_values)
+    actual = crowding_distance_fronts(fitness_values, fronts)
+    for front in fronts:
+        expected = crowding_distance_loop(fitness_values[front])
+        np.testing.assert_array_equal(np.isinf(actual[front]), np.isinf(expected))
+        np.testing.assert_allclose(actual[front], expected)
+
+
+def test_boundaries_are_infinite():
+    fitness_values = np.array([[0., 3.], [1., 2.], [2., 1.], [3., 0.], [1., 2.]])
+    distances = crowding_distance(fitness_values)
+    assert np.isinf(distances[[0, 3]]).all()
+    assert np.isfinite(distances[[1, 2, 4]]).all()
+
+
+def test_individuals_outside_fronts_have_zero_distance():
+    fitness_values = np.random.default_rng(0).random((10, 2))
+    distances = crowding_distance_fronts(fitness_values, [np.arange(5)])
+    assert (distances[5:] == 0).all()
+
+
+def test_crowded_tournament_prefers_rank_then_distance():
+    ranks = np.array([0, 1, 0, 1])
+    crowding_distances = np.array([1., np.inf, 2., np.inf])
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        parents = crowded_tournament(ranks, crowding_distances, random_state=rng)
+        assert len(set(parents)) == 2
+        # all four individuals compete, so a dominated individual wins only against the other one
+        assert ranks[parents].min() == 0
+    # same front, larger distance wins
+    ranks = np.zeros(4, dtype=int)
+    crowding_distances = np.array([0., 0., 0., 1.])
+    wins = sum(3 in crowded_tournament(ranks, crowding_distances, random_state=rng) for _ in range(200))
+    # individual 3 wins whenever it is drawn, i.e., in every draw of 4 distinct contestants
+    assert wins == 200
+
+
+def test_nsga2_is_reproducible():
+    d = 30
+    fitness_functions = [lambda x: np.sum(x), lambda x: d - np.sum(x)]
+    first = nsga2(fitness_functions, d, pop_size=10, num_generations=5, random_state=3)
+    second = nsga2(fitness_functions, d, pop_size=10, num_generations=5, random_state=3)
+    np.testing.assert_array_equal(first[0], second[0])
+    np.testing.assert_array_equal(first[1], second[1])
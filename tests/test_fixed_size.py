@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from fairdo.optimize.geneticoperators import (exchange_bits, fixed_size_initialization,
+                                              fixed_size_uniform_crossover, fractional_flip_mutation,
+                                              packed_operator, uniform_crossover)
+from fairdo.optimize.single import genetic_algorithm
+from fairdo.utils.helper import pack_bits, unpack_bits
+
+CASES = [(d, n_keep) for d in [1, 13, 64, 100] for n_keep in sorted({0, 1, d // 2, d - 1, d})]
+
+
+@pytest.mark.parametrize('d, n_keep', CASES)
+@pytest.mark.parametrize('packed', [False, True])
+def test_initialization_keeps_n_keep(d, n_keep, packed):
+    population = fixed_size_initialization(50, d, n_keep, packed=packed, random_state=0)
+    genes = unpack_bits(population, d) if packed else population
+    assert genes.shape == (50, d)
+    assert np.all(genes.sum(axis=1) == n_keep)
+    if packed:
+        np.testing.assert_array_equal(population, pack_bits(genes))
+
+
+@pytest.mark.parametrize('d, n_keep', CASES)
+@pytest.mark.parametrize('packed', [False, True])
+def test_crossover_keeps_n_keep(d, n_keep, packed):
+    rng = np.random.default_rng(d + n_keep)
+    for _ in range(5):
+        parents = fixed_size_initialization(2, d, n_keep, random_state=rng)
+        if packed:
+            offspring = fixed_size_uniform_crossover(pack_bits(parents), 30, n_keep, packed=True, d=d,
+                                                     random_state=rng)
+            np.testing.assert_array_equal(offspring, pack_bits(unpack_bits(offspring, d)))
+            offspring = unpack_bits(offspring, d)
+        else:
+            offspring = fixed_size_uniform_crossover(parents, 30, n_keep, random_state=rng)
+        assert offspring.shape == (30, d)
+        assert np.all(offspring.sum(axis=1) == n_keep)
+        # genes of both parents are inherited, all others come from one of the parents
+        assert np.all(offspring[:, (parents[0] == 1) & (parents[1] == 1)] == 1)
+        assert np.all(offspring[:, (parents[0] == 0) & (parents[1] == 0)] == 0)
+
+
+@pytest.mark.parametrize('packed', [False, True])
+def test_uniform_crossover_forwards_n_keep(packed):
+    d, n_keep = 70, 20
+    rng = np.random.default_rng(0)
+    parents = fixed_size_initialization(2, d, n_keep, random_state=rng)
+    crossover = packed_operator(uniform_crossover, d) if packed else uniform_crossover
+    offspring = crossover(parents=pack_bits(parents) if packed else parents, num_offspring=40, n_keep=n_keep,
+                          random_state=rng)
+    offspring = unpack_bits(offspring, d) if packed else offspring
+    assert np.all(offspring.sum(axis=1) == n_keep)
+
+
+@pytest.mark.parametrize('d, n_keep', CASES)
+@pytest.mark.parametrize('k', [0, 1, 3, 200])
+def test_exchange_bits(d, n_keep, k):
+    rng = np.random.default_rng(0)
+    offspring = fixed_size_initialization(20, d, n_keep, random_state=rng)
+    bits = exchange_bits(offspring, n_keep, k, random_state=rng)
+    k = min(k, n_keep, d - n_keep)
+    assert bits.shape == (20, 2 * k)
+    rows = np.arange(20)[:, np.newaxis]
+    assert np.all(offspring[rows, bits[:, :k]] == 1)
+    assert np.all(offspring[rows, bits[:, k:]] == 0)
+    assert all(len(np.unique(row)) == 2 * k for row in bits)
+
+
+def test_exchange_bits_rejects_wrong_sizes():
+    offspring = np.array([[1, 1, 0, 0], [1, 0, 0, 0]])
+    with pytest.raises(ValueError, match='n_keep=2'):
+        exchange_bits(offspring, 2, 1)
+
+
+@pytest.mark.parametrize('d, n_keep', CASES)
+@pytest.mark.parametrize('mutation_rate', [0.05, 0.3, 1.0])
+@pytest.mark.parametrize('packed', [False, True])
+def test_fractional_flip_mutation_keeps_n_keep(d, n_keep, mutation_rate, packed):
+    offspring = fixed_size_initialization(30, d, n_keep, random_state=0)
+    original = offspring.copy()
+    if packed:
+        mutated = fractional_flip_mutation(pack_bits(offspring), mutation_rate, packed=True, d=d, n_keep=n_keep,
+                                           random_state=1)
+        mutated = unpack_bits(mutated, d)
+    else:
+        mutated = fractional_flip_mutation(offspring, mutation_rate, n_keep=n_keep, random_state=1)
+    assert np.all(mutated.sum(axis=1) == n_keep)
+    k = min(int(mutation_rate * d) // 2, n_keep, d - n_keep)
+    assert np.all((mutated != original).sum(axis=1) == 2 * k)
+
+
+@pytest.mark.parametrize('packed', [False, True])
+def test_genetic_algorithm_keeps_n_keep(packed):
+    d, n_keep = 60, 17
+    weights = np.random.default_rng(0).random(d)
+    f = lambda x: abs(weights @ x - 4.)
+    solution, fitness = genetic_algorithm(f, d, pop_size=30, num_generations=20, n_keep=n_keep, packed=packed,
+                                          random_state=0)
+    assert solution.shape == (d,)
+    assert solution.sum() == n_keep
+    assert fitness == pytest.approx(f(solution))
+
+
+def test_genetic_algorithm_rejects_invalid_n_keep():
+    with pytest.raises(ValueError, match='n_keep'):
+        genetic_algorithm(lambda x: x.sum(), 10, n_keep=11)
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairdo.metrics import statistical_parity_abs_diff_multi
+from fairdo.optimize import greedy_method
+from fairdo.preprocessing.objective import DatasetObjective
+
+
+@pytest.fixture
+def objective():
+    rng = np.random.default_rng(0)
+    n = 1000
+    data = pd.DataFrame({'x': rng.random(n),
+                         'y': rng.integers(0, 2, n),
+                         'z': rng.integers(0, 3, n),
+                         'w': rng.integers(0, 2, n)})
+    return DatasetObjective(data, label='y', protected_attributes=['z', 'w'],
+                            fitness_function=statistical_parity_abs_diff_multi)
+
+
+@pytest.mark.parametrize('n_keep', [0, 1, 333, 800, 999, 1000])
+def test_greedy_method_keeps_n_keep_rows(objective, n_keep):
+    solution, fitness = greedy_method(objective, objective.dims, n_keep=n_keep, random_state=0)
+    assert solution.sum() == n_keep
+    if n_keep > 0:
+        assert fitness == pytest.approx(objective(solution))
+
+
+def test_greedy_method_keeps_n_keep_rows_from_initial_solution(objective):
+    rng = np.random.default_rng(1)
+    initial_solution = (rng.random(objective.dims) < 0.3).astype(int)
+    solution, fitness = greedy_method(objective, objective.dims, n_keep=700, initial_solution=initial_solution,
+                                      random_state=0)
+    assert solution.sum() == 700
+    assert fitness == pytest.approx(objective(solution))
+
+
+def test_greedy_method_improves_fitness(objective):
+    solution, fitness = greedy_method(objective, objective.dims, random_state=0)
+    assert fitness == pytest.approx(objective(solution))
+    assert fitness <= objective(np.ones(objective.dims))
+
+
+def test_greedy_method_rejects_infeasible_n_keep(objective):
+    with pytest.raises(ValueError):
+        greedy_method(objective, objective.dims, n_keep=objective.dims + 1)
@@ -0,0 +1,50 @@
+from functools import partial
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairdo.optimize.geneticoperators import (uniform_crossover, kpoint_crossover, fractional_flip_mutation,
+                                              bit_flip_mutation)
+from fairdo.optimize.single import genetic_algorithm
+from fairdo.preprocessing.objective import DatasetObjective
+
+
+@pytest.fixture
+def objective():
+    rng = np.random.default_rng(0)
+    n = 2000
+    data = pd.DataFrame({'x': rng.random(n), 'y': rng.integers(0, 2, n), 'z': rng.integers(0, 3, n)})
+    return DatasetObjective(data, label='y', protected_attributes='z')
+
+
+@pytest.mark.parametrize('crossover', [uniform_crossover, partial(uniform_crossover, p=0.9),
+                                       partial(uniform_crossover, p=0.99), partial(uniform_crossover, p=0.001),
+                                       kpoint_crossover])
+@pytest.mark.parametrize('mutation', [fractional_flip_mutation, bit_flip_mutation,
+                                      partial(fractional_flip_mutation, mutation_rate=0.002),
+                                      partial(bit_flip_mutation, mutation_rate=0.002)])
+def test_update_counts_matches_counts(objective, crossover, mutation):
+    rng = np.random.default_rng(1)
+    parents = rng.integers(0, 2, (4, objective.dims)).astype(float)
+    offspring, (origin, rows, positions) = crossover(parents, 20, return_lineage=True, random_state=rng)
+    offspring, mutated = mutation(offspring, return_lineage=True, random_state=rng)
+
+    counts = objective.update_counts(objective.counts(parents), origin, offspring, (rows, positions), mutated)
+    np.testing.assert_array_equal(counts, objective.counts(offspring))
+
+
+@pytest.mark.parametrize('p, mutation_rate', [(0.5, 0.05), (0.999, 0.001)])
+def test_incremental_genetic_algorithm_matches(objective, p, mutation_rate):
+    kwargs = dict(pop_size=20, num_generations=10, random_state=0, crossover=partial(uniform_crossover, p=p),
+                  mutation=partial(fractional_flip_mutation, mutation_rate=mutation_rate))
+    solution, fitness = genetic_algorithm(objective, objective.dims, **kwargs)
+    incremental_solution, incremental_fitness = genetic_algorithm(objective, objective.dims, incremental=True,
+                                                                  **kwargs)
+    np.testing.assert_array_equal(incremental_solution, solution)
+    assert incremental_fitness == pytest.approx(fitness)
+
+
+def test_incremental_requires_counts():
+    with pytest.raises(ValueError):
+        genetic_algorithm(lambda x: np.sum(x), 10, pop_size=4, num_generations=1, incremental=True)
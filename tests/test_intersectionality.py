@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from fairdo.metrics import statistical_parity_abs_diff_intersectionality
+from fairdo.metrics.dataset import intersectional_codes
+from fairdo.utils.helper import generate_pairs
+
+
+# string-key implementation before the introduction of intersectional_codes
+def reference_parity_intersectionality(y, z, agg_group=np.max):
+    z_subgroups = np.apply_along_axis(lambda x: ''.join(map(str, x)), axis=1, arr=z)
+    all_subgroups = list(set(z_subgroups))
+    parities = {i: np.sum(y & (z_subgroups == i)) / np.sum(z_subgroups == i) for i in all_subgroups}
+    pairs = generate_pairs(list(all_subgroups))
+    group_disparity = [np.abs(parities[i] - parities[j]) for i, j in pairs]
+    return agg_group(group_disparity)
+
+
+def reference_subgroups(z):
+    return np.apply_along_axis(lambda x: ''.join(map(str, x)), axis=1, arr=z)
+
+
+def make_data(n, values, seed=0):
+    rng = np.random.default_rng(seed)
+    # single-digit values keep the string keys of the reference free of collisions
+    z = np.column_stack([rng.choice(attribute_values, n) for attribute_values in values])
+    y = rng.integers(0, 2, n)
+    return y, z
+
+
+DATA = {
+    'binary': ([0, 1], [0, 1]),
+    'contiguous': ([0, 1, 2], [0, 1], [0, 1, 2, 3]),
+    'non-contiguous': ([1, 5, 9], [2, 7], [3, 8]),
+    'single attribute': ([4, 6, 9],),
+}
+
+
+@pytest.mark.parametrize('values', DATA.values(), ids=DATA.keys())
+@pytest.mark.parametrize('agg_group', [np.max, np.sum, np.mean])
+def test_parity_matches_string_keys(values, agg_group):
+    for seed in range(3):
+        y, z = make_data(300, values, seed=seed)
+        expected = reference_parity_intersectionality(y, z, agg_group=agg_group)
+        actual = statistical_parity_abs_diff_intersectionality(y, z, agg_group=agg_group)
+        assert actual == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('values', DATA.values(), ids=DATA.keys())
+def test_codes_match_string_keys(values):
+    y, z = make_data(300, values)
+    codes, n_codes = intersectional_codes(z)
+    assert codes.max() < n_codes
+    # the codes and the string keys partition the samples in the same way
+    _, expected = np.unique(reference_subgroups(z), return_inverse=True)
+    _, actual = np.unique(codes, return_inverse=True)
+    np.testing.assert_array_equal(actual, expected.reshape(-1))
+
+
+def test_codes_of_many_combinations_match_string_keys():
+    rng = np.random.default_rng(0)
+    n = 500
+    # more combinations than samples, only the present ones are numbered
+    z = np.column_stack([100 + 9 * rng.integers(0, 50, n) for _ in range(3)])
+    y = rng.integers(0, 2, n)
+    codes, n_codes = intersectional_codes(z)
+    assert n_codes <= n
+    _, expected = np.unique(reference_subgroups(z), return_inverse=True)
+    _, actual = np.unique(codes, return_inverse=True)
+    np.testing.assert_array_equal(actual, expected.reshape(-1))
+    assert statistical_parity_abs_diff_intersectionality(y, z) == pytest.approx(
+        reference_parity_intersectionality(y, z))
+
+
+def test_subgroups_with_colliding_string_keys_are_distinct():
+    # both subgroups have the string key '112'
+    z = np.array([[1, 12], [11, 2], [0, 0]])
+    y = np.array([1, 0, 0])
+    assert reference_parity_intersectionality(y, z) == 0.5
+    assert statistical_parity_abs_diff_intersectionality(y, z) == 1
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from fairdo.optimize import island
+from fairdo.optimize.island import island_genetic_algorithm, ring_migration
+
+D = 40
+WEIGHTS = np.random.default_rng(0).random(D)
+
+
+def f(x):
+    return abs(WEIGHTS @ x - 5.)
+
+
+KWARGS = dict(num_islands=3, pop_size=20, num_generations=30, migration_interval=5, patience=100)
+
+
+@pytest.mark.parametrize('backend', ['threads', 'processes'])
+def test_solution_is_consistent_with_f(backend):
+    solution, fitness = island_genetic_algorithm(f, D, backend=backend, random_state=0, **KWARGS)
+    assert solution.shape == (D,)
+    assert set(np.unique(solution)) <= {0, 1}
+    assert fitness == pytest.approx(f(solution))
+
+
+def test_packed_solution_is_consistent_with_f():
+    solution, fitness = island_genetic_algorithm(f, D, backend='threads', packed=True, random_state=0, **KWARGS)
+    assert solution.shape == (D,)
+    assert fitness == pytest.approx(f(solution))
+
+
+def test_reproducible_with_random_state(monkeypatch):
+    first = island_genetic_algorithm(f, D, backend='threads', random_state=1, **KWARGS)
+    second = island_genetic_algorithm(f, D, backend='threads', random_state=1, **KWARGS)
+    np.testing.assert_array_equal(first[0], second[0])
+    assert first[1] == second[1]
+
+    # the islands keep their random streams whatever the number of workers
+    monkeypatch.setattr(island.mp, 'cpu_count', lambda: 3)
+    third = island_genetic_algorithm(f, D, backend='threads', random_state=1, **KWARGS)
+    np.testing.assert_array_equal(first[0], third[0])
+    assert first[1] == third[1]
+
+    processes = island_genetic_algorithm(f, D, backend='processes', random_state=1, **KWARGS)
+    np.testing.assert_array_equal(first[0], processes[0])
+
+
+def test_ring_migration_replaces_worst_by_best_of_previous_island():
+    rng = np.random.default_rng(0)
+    islands = [(rng.integers(0, 2, (6, 5)), rng.permutation(6).astype(float), None) for _ in range(3)]
+    migrated = ring_migration(islands, num_migrants=2)
+    for i, (population, fitness, _) in enumerate(migrated):
+        previous_population, previous_fitness, _ = islands[i - 1]
+        old_population, old_fitness, _ = islands[i]
+        best = np.argsort(previous_fitness)[-2:]
+        worst = np.argsort(old_fitness)[:2]
+        np.testing.assert_array_equal(population[worst], previous_population[best])
+        np.testing.assert_array_equal(fitness[worst], previous_fitness[best])
+        keep = np.setdiff1d(np.arange(6), worst)
+        np.testing.assert_array_equal(population[keep], old_population[keep])
+    # the islands are not changed in place
+    assert not np.shares_memory(migrated[0][0], islands[0][0])
+
+
+def test_migration_exchanges_elites_during_run():
+    migrations = []
+
+    def recording_migration(islands, num_migrants):
+        migrated = ring_migration(islands, num_migrants)
+        migrations.append((islands, migrated))
+        return migrated
+
+    island_genetic_algorithm(f, D, backend='threads', migration=recording_migration, random_state=0, **KWARGS)
+    # one migration after each epoch but the last
+    assert len(migrations) == KWARGS['num_generations'] // KWARGS['migration_interval'] - 1
+    for islands, migrated in migrations:
+        for i, (population, fitness, _) in enumerate(migrated):
+            previous_population, previous_fitness, _ = islands[i - 1]
+            elite = previous_population[np.argmax(previous_fitness)]
+            assert np.any(np.all(population == elite, axis=1))
+            assert fitness.max() >= previous_fitness.max()
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from scipy.stats import chisquare
+
+from fairdo.optimize.geneticoperators import fractional_flip_mutation, swap_mutation
+from fairdo.optimize.geneticoperators.mutation import sample_without_replacement
+from fairdo.utils.helper import pack_bits, unpack_bits
+
+
+@pytest.mark.parametrize('d, mutation_rate', [(100, 0.05), (1000, 0.01), (64, 0.5), (10, 0.0)])
+@pytest.mark.parametrize('packed', [False, True])
+def test_fractional_flip_mutation_flips_exact_number(d, mutation_rate, packed):
+    rng = np.random.default_rng(0)
+    offspring = rng.integers(0, 2, (50, d)).astype(float)
+    if packed:
+        mutated = unpack_bits(fractional_flip_mutation(pack_bits(offspring), mutation_rate, packed=True, d=d,
+                                                       random_state=1), d)
+    else:
+        mutated = fractional_flip_mutation(offspring.copy(), mutation_rate, random_state=1)
+    assert np.all(np.count_nonzero(mutated != offspring, axis=1) == int(mutation_rate * d))
+
+
+def test_fractional_flip_mutation_reports_distinct_flips():
+    rng = np.random.default_rng(0)
+    offspring = rng.integers(0, 2, (30, 200)).astype(float)
+    mutated, (rows, positions) = fractional_flip_mutation(offspring.copy(), 0.1, return_lineage=True,
+                                                          random_state=1)
+    keys = np.sort(rows * 200 + positions)
+    assert len(np.unique(keys)) == len(keys) == 30 * 20
+    np.testing.assert_array_equal(np.flatnonzero(mutated != offspring), keys)
+
+
+def test_fractional_flip_mutation_positions_are_uniform():
+    d = 50
+    offspring = np.zeros((20000, d))
+    mutated = fractional_flip_mutation(offspring, 0.1, random_state=0)
+    assert chisquare(mutated.sum(axis=0)).pvalue > 1e-4
+
+
+@pytest.mark.parametrize('d, k', [(1000, 5), (100, 20), (100, 26), (100, 90), (10, 10), (10, 0), (0, 0)])
+def test_sample_without_replacement_is_distinct(d, k):
+    samples = sample_without_replacement(500, d, k, random_state=0)
+    assert samples.shape == (500, k)
+    assert np.all((samples >= 0) & (samples < max(d, 1)))
+    assert all(len(np.unique(row)) == k for row in samples)
+
+
+@pytest.mark.parametrize('d, k', [(40, 3), (40, 30)])
+def test_sample_without_replacement_is_uniform(d, k):
+    samples = sample_without_replacement(20000, d, k, random_state=0)
+    assert chisquare(np.bincount(samples.ravel(), minlength=d)).pvalue > 1e-4
+
+
+def test_sample_without_replacement_is_in_random_order():
+    # the first integers of a sample are a uniformly random subset, see uniform_crossover
+    samples = sample_without_replacement(20000, 40, 3, random_state=0)
+    assert chisquare(np.bincount(samples[:, 0], minlength=40)).pvalue > 1e-4
+
+
+def test_sample_without_replacement_rejects_large_samples():
+    with pytest.raises(ValueError):
+        sample_without_replacement(1, 5, 6)
+
+
+def test_swap_mutation_swaps_two_distinct_bits():
+    rng = np.random.default_rng(0)
+    offspring = rng.integers(0, 2, (1000, 30)).astype(float)
+    mutated = swap_mutation(offspring.copy(), random_state=1)
+    np.testing.assert_array_equal(mutated.sum(axis=1), offspring.sum(axis=1))
+    assert np.all(np.count_nonzero(mutated != offspring, axis=1) <= 2)
+
+    # with distinct values per row, every swap changes exactly two positions
+    d = 30
+    offspring = np.tile(np.arange(d, dtype=float), (20000, 1))
+    mutated = swap_mutation(offspring.copy(), random_state=1)
+    changed = mutated != offspring
+    assert np.all(changed.sum(axis=1) == 2)
+    np.testing.assert_array_equal(np.sort(mutated, axis=1), offspring)
+    assert chisquare(changed.sum(axis=0)).pvalue > 1e-4
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from fairdo.optimize.multi import (non_dominated_sort, non_dominated_sort_fast, non_dominated_sort_2d,
+                                   non_dominated_sort_3d, non_dominated_sort_efficient)
+
+
+def sorted_fronts(fronts):
+    return [sorted(np.asarray(front).tolist()) for front in fronts]
+
+
+def tie_heavy_fitness(rng, pop_size, num_objectives):
+    # few distinct values per objective, so that ties and duplicate individuals are common
+    return rng.integers(0, 5, (pop_size, num_objectives)).astype(float)
+
+
+@pytest.mark.parametrize('num_objectives, sort', [(2, non_dominated_sort_2d),
+                                                  (3, non_dominated_sort_3d),
+                                                  (2, non_dominated_sort_efficient),
+                                                  (3, non_dominated_sort_efficient),
+                                                  (4, non_dominated_sort_efficient),
+                                                  (2, non_dominated_sort_fast),
+                                                  (3, non_dominated_sort_fast),
+                                                  (5, non_dominated_sort_fast)])
+def test_sort_matches_non_dominated_sort(num_objectives, sort):
+    rng = np.random.default_rng(num_objectives)
+    for pop_size in [1, 2, 10, 50, 200]:
+        for fitness_values in [tie_heavy_fitness(rng, pop_size, num_objectives),
+                               rng.random((pop_size, num_objectives))]:
+            expected = sorted_fronts(non_dominated_sort(fitness_values))
+            assert sorted_fronts(sort(fitness_values)) == expected
+
+
+@pytest.mark.parametrize('sort', [non_dominated_sort_2d, non_dominated_sort_efficient])
+def test_duplicates_share_a_front(sort):
+    fitness_values = np.array([[1., 2.], [1., 2.], [2., 1.], [2., 2.], [2., 2.], [3., 3.]])
+    assert sorted_fronts(sort(fitness_values)) == [[0, 1, 2], [3, 4], [5]]
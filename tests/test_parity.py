@@ -0,0 +1,67 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from fairdo.metrics import statistical_parity_abs_diff_multi
+from fairdo.optimize import parity_method
+from fairdo.preprocessing.objective import DatasetObjective
+
+
+def make_objective(n, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({'x': rng.random(n),
+                         'y': rng.integers(0, 2, n),
+                         'z': rng.integers(0, 3, n),
+                         'w': rng.integers(0, 2, n)})
+    objective = DatasetObjective(data, label='y', protected_attributes=['z', 'w'],
+                                 fitness_function=statistical_parity_abs_diff_multi)
+    return data, objective
+
+
+def test_parity_method_reaches_parity():
+    data, objective = make_objective(200)
+    solution, fitness = parity_method(objective, objective.dims, random_state=0)
+    assert fitness == 0
+    assert objective(solution) == 0
+
+    # all groups of all protected attributes have the same positive rate
+    selected = data[solution == 1]
+    rates = np.concatenate([selected.groupby(attribute)['y'].mean().to_numpy() for attribute in ['z', 'w']])
+    np.testing.assert_allclose(rates, rates[0], rtol=0, atol=1e-12)
+
+
+def test_parity_method_is_largest_parity_subset():
+    rng = np.random.default_rng(1)
+    n = 14
+    data = pd.DataFrame({'y': rng.integers(0, 2, n), 'z': rng.integers(0, 2, n)})
+    objective = DatasetObjective(data, label='y', protected_attributes='z')
+    solution, fitness = parity_method(objective, objective.dims, random_state=0)
+
+    # all subsets of the rows
+    population = np.array(list(itertools.product([0, 1], repeat=n)))
+    population = population[population.sum(axis=1) > 0]
+    all_fitness = np.asarray(objective.evaluate_population(population))
+    assert fitness == all_fitness.min() == 0
+    assert solution.sum() == population[all_fitness == 0].sum(axis=1).max()
+
+
+@pytest.mark.parametrize('n_keep', [1, 50, 150, 200])
+def test_parity_method_keeps_n_keep_rows(n_keep):
+    _, objective = make_objective(200)
+    solution, fitness = parity_method(objective, objective.dims, n_keep=n_keep, random_state=0)
+    assert solution.sum() == n_keep
+    assert fitness == pytest.approx(objective(solution))
+
+
+def test_parity_method_is_restricted_to_small_denominators():
+    # the largest parity subset has the rate 3 / 4 and keeps 12 of the 13 rows
+    data = pd.DataFrame({'y': [1, 1, 1, 0] + [1] * 6 + [0] * 3, 'z': [0] * 4 + [1] * 9})
+    objective = DatasetObjective(data, label='y', protected_attributes='z')
+    solution, fitness = parity_method(objective, objective.dims, random_state=0)
+    assert fitness == 0 and solution.sum() == 12
+
+    # with denominators up to 2, only the positive rows remain
+    solution, fitness = parity_method(objective, objective.dims, max_denominator=2, random_state=0)
+    assert fitness == 0 and solution.sum() == 9
@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from fairdo.metrics.penalty import count_groups, group_missing_penalty, missing_groups_penalty
+
+
+# implementation before the introduction of count_groups and missing_groups_penalty
+def reference_nunique(a):
+    if a.ndim == 1:
+        a = a.reshape(-1, 1)
+    a_s = np.sort(a, axis=0)
+    return a.shape[0] - (a_s[:-1, :] == a_s[1:, :]).sum(axis=0)
+
+
+def reference_group_missing_penalty(z, n_groups, agg_attribute='max', agg_group='max'):
+    n_avail_groups = reference_nunique(z)
+    if agg_group == 'max':
+        if agg_attribute == 'max':
+            return int(np.any(n_avail_groups < n_groups))
+        elif agg_attribute == 'sum':
+            return np.sum(n_avail_groups < n_groups)
+    elif agg_group == 'sum':
+        n_missing_groups = n_groups - n_avail_groups
+        group_penalties = n_missing_groups * (2 * n_groups - n_missing_groups - 1) / 2
+        if agg_attribute == 'sum':
+            return np.sum(group_penalties)
+        elif agg_attribute == 'max':
+            return np.max(group_penalties)
+
+
+AGGREGATIONS = [('max', 'max'), ('max', 'sum'), ('sum', 'max'), ('sum', 'sum')]
+
+
+def protected_attributes():
+    rng = np.random.default_rng(0)
+    n = 200
+    yield 'small integers', np.column_stack([rng.integers(0, 3, n), rng.integers(0, 5, n)])
+    yield 'negative integers', np.column_stack([rng.integers(-4, 2, n), rng.integers(0, 2, n)])
+    yield 'large integers', np.column_stack([rng.choice([7, 10 ** 9, 3 * 10 ** 12], n), rng.integers(0, 4, n)])
+    yield 'floats', np.column_stack([rng.choice([0.5, 1.5, 2.], n), rng.integers(0, 3, n).astype(float)])
+    yield 'booleans', rng.random((n, 3)) < 0.5
+    yield 'one attribute', rng.integers(0, 6, n)
+    yield 'unsigned', rng.integers(0, 4, (n, 2)).astype(np.uint8)
+
+
+ATTRIBUTES = dict(protected_attributes())
+
+
+@pytest.mark.parametrize('z', ATTRIBUTES.values(), ids=ATTRIBUTES.keys())
+def test_count_groups_matches_nunique(z):
+    rng = np.random.default_rng(1)
+    for size in [0, 1, 5, 50, len(z)]:
+        subset = z[rng.choice(len(z), size, replace=False)]
+        np.testing.assert_array_equal(count_groups(subset), reference_nunique(subset))
+
+
+@pytest.mark.parametrize('z', ATTRIBUTES.values(), ids=ATTRIBUTES.keys())
+@pytest.mark.parametrize('agg_group, agg_attribute', AGGREGATIONS)
+def test_group_missing_penalty_matches_reference(z, agg_group, agg_attribute):
+    rng = np.random.default_rng(2)
+    n_groups = reference_nunique(z)
+    for size in [1, 3, 10, 50, len(z)]:
+        subset = z[rng.choice(len(z), size, replace=False)]
+        expected = reference_group_missing_penalty(subset, n_groups, agg_attribute=agg_attribute,
+                                                   agg_group=agg_group)
+        actual = group_missing_penalty(subset, n_groups, agg_attribute=agg_attribute, agg_group=agg_group)
+        assert actual == pytest.approx(expected)
+
+
+@pytest.mark.parametrize('z', ATTRIBUTES.values(), ids=ATTRIBUTES.keys())
+@pytest.mark.parametrize('agg_group, agg_attribute', AGGREGATIONS)
+def test_missing_groups_penalty_of_several_subsets(z, agg_group, agg_attribute):
+    rng = np.random.default_rng(3)
+    n_groups = reference_nunique(z)
+    subsets = [z[rng.choice(len(z), size, replace=False)] for size in [1, 2, 4, 8, 30, len(z)]]
+    expected = [reference_group_missing_penalty(subset, n_groups, agg_attribute=agg_attribute,
+                                                agg_group=agg_group) for subset in subsets]
+
+    # one row of available groups per subset
+    n_avail_groups = np.stack([count_groups(subset) for subset in subsets])
+    assert n_avail_groups.ndim == 2
+    actual = missing_groups_penalty(n_avail_groups, n_groups, agg_attribute=agg_attribute, agg_group=agg_group)
+    assert actual.shape == (len(subsets),)
+    np.testing.assert_allclose(actual, expected)
+
+    # a single subset gives a single penalty
+    for subset, expected_penalty in zip(subsets, expected):
+        actual = missing_groups_penalty(count_groups(subset), n_groups, agg_attribute=agg_attribute,
+                                        agg_group=agg_group)
+        assert np.ndim(actual) == 0
+        assert actual == pytest.approx(expected_penalty)
+
+
+def test_unknown_aggregation():
+    with pytest.raises(NotImplementedError):
+        missing_groups_penalty(np.array([1, 2]), np.array([2, 2]), agg_group='mean')
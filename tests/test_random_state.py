@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+import fairdo.optimize.single as single
+from fairdo.optimize.multi import nsga2
+from fairdo.optimize.single import genetic_algorithm
+from fairdo.utils.helper import check_random_state, spawn_random_states
+
+
+def weighted_sum(x):
+    return float(np.sum(x * np.arange(len(x)) % 7))
+
+
+def ones(x):
+    return float(np.sum(x))
+
+
+def zeros(x):
+    return float(len(x) - np.sum(x))
+
+
+def test_spawn_random_states_keeps_the_parent_stream():
+    rng = check_random_state(0)
+    children = spawn_random_states(rng, 2)
+    np.testing.assert_array_equal(rng.random(5), check_random_state(0).random(5))
+    # the children are independent of each other and of later spawns
+    assert children[0].random() != children[1].random()
+    assert spawn_random_states(rng, 1)[0].random() != spawn_random_states(check_random_state(0), 1)[0].random()
+
+
+def test_genetic_algorithm_is_independent_of_the_pool(monkeypatch):
+    kwargs = dict(pop_size=200, num_generations=3, random_state=0)
+    monkeypatch.setattr(single, 'open_pool', lambda *args, **kw: None)
+    solution, fitness = genetic_algorithm(weighted_sum, 50, **kwargs)
+    monkeypatch.undo()
+
+    opened = []
+    open_pool = single.open_pool
+
+    def spy(*args, **kw):
+        pool = open_pool(*args, **kw)
+        opened.append(pool)
+        return pool
+
+    # a pool is opened with more than one CPU
+    monkeypatch.setattr(single.mp, 'cpu_count', lambda: 2)
+    monkeypatch.setattr(single, 'open_pool', spy)
+    pool_solution, pool_fitness = genetic_algorithm(weighted_sum, 50, **kwargs)
+    assert opened[0] is not None
+    np.testing.assert_array_equal(pool_solution, solution)
+    assert pool_fitness == fitness
+
+
+@pytest.mark.parametrize('backend', ['processes', 'threads'])
+def test_nsga2_is_independent_of_the_pool(backend):
+    kwargs = dict(pop_size=20, num_generations=3, random_state=0)
+    solutions, fitness_values = nsga2([ones, zeros], 30, **kwargs)
+    pool_solutions, pool_fitness_values = nsga2([ones, zeros], 30, n_jobs=2, backend=backend, **kwargs)
+    np.testing.assert_array_equal(pool_solutions, solutions)
+    np.testing.assert_array_equal(pool_fitness_values, fitness_values)
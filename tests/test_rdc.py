@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from fairdo.metrics.independence import RandomizedDependence, rdc
+
+
+@pytest.fixture
+def data():
+    rng = np.random.default_rng(0)
+    n = 2000
+    x = rng.random(n)
+    return {'binary': rng.integers(0, 2, n),
+            'ternary': rng.integers(0, 3, n),
+            'x': x,
+            'sin_x': np.sin(6 * x) + 0.05 * rng.standard_normal(n),
+            'noise': rng.random(n)}
+
+
+def correlation_ratio(y, z):
+    # maximal correlation between a binary y and any function of a discrete z
+    y = y.astype(float)
+    groups, inverse = np.unique(z, return_inverse=True)
+    means = np.bincount(inverse, weights=y) / np.bincount(inverse)
+    return np.sqrt(np.sum((means[inverse] - y.mean()) ** 2) / np.sum((y - y.mean()) ** 2))
+
+
+@pytest.mark.parametrize('y, z, expected', [('binary', 'ternary', 0.0111833),
+                                            ('x', 'sin_x', 0.9944423),
+                                            ('x', 'noise', 0.0828)])
+def test_rdc_regression(data, y, z, expected):
+    assert rdc(data[y], data[z], random_state=0) == pytest.approx(expected, abs=1e-6)
+
+
+# values of the implementation before RandomizedDependence, which solved the canonical correlation with pinv.
+# It is numerically unstable for discrete inputs, whose random features are rank deficient.
+@pytest.mark.parametrize('y, z, expected', [('x', 'sin_x', 0.9945),
+                                            ('x', 'noise', 0.0828)])
+def test_rdc_matches_previous_implementation(data, y, z, expected):
+    values = [rdc(data[y], data[z], random_state=seed) for seed in range(4)]
+    np.testing.assert_allclose(values, expected, atol=1e-3)
+
+
+def test_rdc_of_discrete_inputs_is_maximal_correlation(data):
+    # tied values share one rank, so the copula of a discrete input has one value per category
+    expected = correlation_ratio(data['binary'], data['ternary'])
+    values = [rdc(data['binary'], data['ternary'], random_state=seed) for seed in range(4)]
+    np.testing.assert_allclose(values, expected, rtol=1e-6)
+
+
+@pytest.mark.parametrize('y, z', [('binary', 'ternary'), ('binary', 'x'), ('x', 'sin_x')])
+def test_rdc_does_not_depend_on_row_order(data, y, z):
+    y, z = data[y], data[z]
+    expected = rdc(y, z, random_state=0)
+    # rows sorted by the values, which ranked ties in row order before
+    order = np.lexsort((z, y))
+    assert rdc(y[order], z[order], random_state=0) == pytest.approx(expected, rel=1e-6)
+    order = np.random.default_rng(0).permutation(len(y))
+    assert rdc(y[order], z[order], random_state=0) == pytest.approx(expected, rel=1e-6)
+
+
+@pytest.mark.parametrize('y, z', [('x', 'sin_x'), ('binary', 'ternary')])
+def test_score_of_subsets_matches_rdc(data, y, z):
+    rng = np.random.default_rng(1)
+    dependence = RandomizedDependence(data[y], data[z], random_state=3)
+    masks = (rng.random((5, len(data[y]))) < 0.5).astype(int)
+    expected = [rdc(data[y][mask == 1], data[z][mask == 1], random_state=3) for mask in masks]
+    np.testing.assert_allclose([dependence.score(mask) for mask in masks], expected, rtol=1e-8)
+    np.testing.assert_allclose(dependence.score_population(masks), expected, rtol=1e-5)
@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+from fairdo.optimize import steadystate
+from fairdo.optimize.geneticoperators.mutation import fractional_flip_mutation
+from fairdo.optimize.geneticoperators.selection import tournament_selection
+from fairdo.optimize.steadystate import steady_state_genetic_algorithm
+
+D = 30
+WEIGHTS = np.random.default_rng(0).random(D)
+
+
+def counting_f():
+    def f(x):
+        f.calls += 1
+        return abs(WEIGHTS @ x - 4.)
+    f.calls = 0
+    return f
+
+
+def test_single_job_does_not_open_a_pool(monkeypatch):
+    def no_pool(*args, **kwargs):
+        raise AssertionError('EvaluationPool opened with n_jobs=1')
+
+    monkeypatch.setattr(steadystate, 'EvaluationPool', no_pool)
+    f = counting_f()
+    solution, fitness = steady_state_genetic_algorithm(f, D, pop_size=10, num_evaluations=50, n_jobs=1,
+                                                       random_state=0)
+    assert fitness == pytest.approx(f(solution))
+
+
+@pytest.mark.parametrize('n_jobs, backend', [(1, 'processes'), (2, 'threads')])
+def test_evaluation_count(n_jobs, backend):
+    f = counting_f()
+    steady_state_genetic_algorithm(f, D, pop_size=10, num_evaluations=50, n_jobs=n_jobs, backend=backend,
+                                   random_state=0)
+    assert f.calls == 10 + 50
+
+
+def test_offspring_replaces_the_worst_individual():
+    f = counting_f()
+    snapshots, children = [], []
+
+    def recording_selection(population, fitness, random_state=None):
+        snapshots.append((population.copy(), fitness.copy()))
+        return tournament_selection(population, fitness, random_state=random_state)
+
+    def recording_mutation(offspring, random_state=None):
+        mutated = fractional_flip_mutation(offspring, random_state=random_state)
+        children.append(mutated[0].copy())
+        return mutated
+
+    steady_state_genetic_algorithm(f, D, pop_size=8, num_evaluations=40, n_jobs=1, in_flight=1,
+                                   selection=recording_selection, mutation=recording_mutation,
+                                   random_state=0)
+    assert len(snapshots) == 40
+    replaced = 0
+    for (population, fitness), child, (next_population, next_fitness) in zip(snapshots, children, snapshots[1:]):
+        # fitness is negated because the run minimizes
+        child_fitness = -f(child)
+        worst = np.argmin(fitness)
+        expected_population, expected_fitness = population.copy(), fitness.copy()
+        if child_fitness > fitness[worst]:
+            expected_population[worst] = child
+            expected_fitness[worst] = child_fitness
+            replaced += 1
+        np.testing.assert_array_equal(next_population, expected_population)
+        np.testing.assert_allclose(next_fitness, expected_fitness)
+    assert replaced > 0